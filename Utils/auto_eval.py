@@ -1,24 +1,29 @@
 import os
 import re
 import threading
-import pandas as pd
 import concurrent.futures
 from pathlib import Path
-from typing import Callable, List, Tuple, Any
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple, Any
 from dotenv import load_dotenv
 from datetime import datetime
 
-from epam.auto_llm_eval.evaluator import (
-    read_file,
-    write_file,
-    evaluate_output,
-    grade_report,
-    Criteria,
-    CriteriaEvalStep,
-)
+# pandas and the evaluator library are imported by the functions using them, so importing this module is fast
+if TYPE_CHECKING:
+    from epam.auto_llm_eval.evaluator import CriteriaEvalStep
 from Utils.llm.ai_message import AIMessage, TextAIMessageContent
 from Utils.llm.config import Model
 from Utils.llm.api import ask_model
+from Utils.combined_judge import calibration_summary, evaluate_combined
+from Utils.judge_ensemble import (
+    DISAGREEMENT_THRESHOLD,
+    FIRST_JUDGES,
+    find_disagreement,
+    order_judges,
+    read_judges,
+    remove_judges,
+    write_judges,
+)
+from Utils.pre_judge import JUDGE, SCORE, pre_judge, read_verdict, remove_verdict
 
 load_dotenv()
 
@@ -131,6 +136,15 @@ def extract_content(file_path) -> str:
         return ""
 
 
+def passes_pre_judge(category_path: Path, category_name: str, experiment_type: str) -> bool:
+    """Run the pre-judge for the scenario, True when its output should be sent to the judges"""
+    verdict = pre_judge(category_path, category_name, experiment_type)
+    if verdict.decision == JUDGE:
+        return True
+    print_skip(f"Not judging {category_name} ({verdict.decision}): {'; '.join(verdict.reasons)}")
+    return False
+
+
 def get_completeness_filename(scenario_name: str, model_name: str) -> str:
     return f"{scenario_name}_{model_name}_completeness.json"
 
@@ -139,7 +153,53 @@ def get_accuracy_filename(scenario_name: str, model_name: str) -> str:
     return f"{scenario_name}_{model_name}_accuracy.json"
 
 
-def evaluate(model: Model, language: str = "JS", force_reevaluate: bool = False, summary_filename: str = "summary.csv"):
+def get_calibration_filename(scenario_name: str, model_name: str, metric: str) -> str:
+    return f"{scenario_name}_{model_name}_{metric}_combined.json"
+
+
+# Criteria sets judged for every scenario with the names of their reports
+metric_filenames: dict[str, Callable[[str, str], str]] = {
+    "accuracy": get_accuracy_filename,
+    "completeness": get_completeness_filename,
+}
+
+
+def has_reports(category_path: Path, category_name: str, evaluation_model: EvaluationModel) -> bool:
+    return all(
+        (category_path / get_filename(category_name, evaluation_model.name)).exists()
+        for get_filename in metric_filenames.values()
+    )
+
+
+def read_scores(
+    category_path: Path, category_name: str, judges: List[EvaluationModel]
+) -> dict[str, list[float | None]]:
+    """Scores of every metric by the judges, None for a report that is missing or can't be graded"""
+    from epam.auto_llm_eval.evaluator import read_file, grade_report
+
+    scores: dict[str, list[float | None]] = {}
+    for metric, get_filename in metric_filenames.items():
+        scores[metric] = []
+        for evaluation_model in judges:
+            report_path = category_path / get_filename(category_name, evaluation_model.name)
+            try:
+                scores[metric].append(grade_report(read_file(report_path)).get_score())
+            except Exception:
+                scores[metric].append(None)
+    return scores
+
+
+def evaluate(
+    model: Model,
+    language: str = "JS",
+    force_reevaluate: bool = False,
+    summary_filename: str = "summary.csv",
+    pre_judge_outputs: bool = True,
+    combined_criteria: bool = False,
+    adaptive_judges: bool = False,
+    judge_order: Optional[List[str]] = None,
+    disagreement_threshold: float = DISAGREEMENT_THRESHOLD,
+):
     """
     Main function to evaluate the scenarios.
 
@@ -150,10 +210,21 @@ def evaluate(model: Model, language: str = "JS", force_reevaluate: bool = False,
     Args:
         model (Model): Model to evaluate.
         language (str): The programming language of scenarios.
+        pre_judge_outputs (bool): Check the outputs with the static rules of pre_judge first and judge only
+            the sound ones, the others are scored by the rules or left for a re-run.
+        combined_criteria (bool): Ask every judge for accuracy and completeness in one request instead of two,
+            the reports are the same. Check it with calibrate_combined first.
+        adaptive_judges (bool): Run the first two judges of judge_order and the next one only when their scores
+            disagree by more than disagreement_threshold (a relative difference). The judges that ran are saved
+            in the _judges.json sidecar and grade averages over them.
+        judge_order (List[str]): Names of the judges, cheapest and fastest first, judge_ensemble.DEFAULT_JUDGE_ORDER
+            by default.
 
     Returns:
         None
     """
+    import pandas as pd
+    from epam.auto_llm_eval.evaluator import read_file, write_file, evaluate_output, Criteria
 
     evaluation_models = get_evaluation_models()
     base_path = results_path / "Output" / model.model_id / language
@@ -189,6 +260,12 @@ def evaluate(model: Model, language: str = "JS", force_reevaluate: bool = False,
                     print_error(f"ERROR: Unable to read or parse criteria from {category_criteria_path}: {e}")
                     continue
 
+                if not pre_judge_outputs:
+                    # A verdict of an earlier run must not override the judges in grade
+                    remove_verdict(category_path, category_name)
+                elif not passes_pre_judge(category_path, category_name, experiment_type):
+                    continue
+
                 output = extract_content(category_path / f"{category_name}_report_1.md")
                 if not output:
                     print_error(f"ERROR: Scenario {category_name} has no output. Skipping evaluation.")
@@ -198,7 +275,7 @@ def evaluate(model: Model, language: str = "JS", force_reevaluate: bool = False,
                 print_lock = threading.Lock()
 
                 def process_evaluation_model(
-                    evaluation_model: EvaluationModel, report_path: Path, eval_steps: List[CriteriaEvalStep]
+                    evaluation_model: EvaluationModel, report_path: Path, eval_steps: List["CriteriaEvalStep"]
                 ):
                     if report_path.exists() and not force_reevaluate:
                         with print_lock:
@@ -219,36 +296,358 @@ def evaluate(model: Model, language: str = "JS", force_reevaluate: bool = False,
                         with print_lock:
                             print_error(f"ERROR: unable to create or update {report_path.name}: {e}")
 
-                threads = []
-                # Accuracy evaluation threads
-                for evaluation_model in evaluation_models:
-                    thread = threading.Thread(
-                        target=process_evaluation_model,
-                        args=(
-                            evaluation_model,
-                            category_path / get_accuracy_filename(category_name, evaluation_model.name),
-                            criteria.evaluation_steps.accuracy,
-                        ),
-                    )
-                    threads.append(thread)
-                    thread.start()
-
-                # Completeness evaluation threads
-                for evaluation_model in evaluation_models:
-                    thread = threading.Thread(
-                        target=process_evaluation_model,
-                        args=(
-                            evaluation_model,
-                            category_path / get_completeness_filename(category_name, evaluation_model.name),
-                            criteria.evaluation_steps.completeness,
-                        ),
+                def process_combined_evaluation(evaluation_model: EvaluationModel):
+                    report_paths = {
+                        metric: category_path / get_filename(category_name, evaluation_model.name)
+                        for metric, get_filename in metric_filenames.items()
+                    }
+                    report_paths = {
+                        metric: report_path
+                        for metric, report_path in report_paths.items()
+                        if force_reevaluate or not report_path.exists()
+                    }
+                    if not report_paths:
+                        with print_lock:
+                            print_skip(f"Skipping {category_name} by {evaluation_model.name} as its reports exist.")
+                        return
+
+                    try:
+                        reports = evaluate_combined(
+                            evaluate_output,
+                            {metric: getattr(criteria.evaluation_steps, metric) for metric in report_paths},
+                            output,
+                            evaluation_model.execute_prompt,
+                        )
+                    except Exception as e:
+                        with print_lock:
+                            print_error(
+                                f"ERROR: combined evaluation of {category_name} by {evaluation_model.name} failed, "
+                                f"evaluating the criteria separately: {e}"
+                            )
+                        for metric, report_path in report_paths.items():
+                            process_evaluation_model(
+                                evaluation_model, report_path, getattr(criteria.evaluation_steps, metric)
+                            )
+                        return
+
+                    for metric, report_path in report_paths.items():
+                        write_file(report_path, reports[metric])
+                        with print_lock:
+                            print_success(f"File {'updated' if force_reevaluate else 'created'}: {report_path.name}")
+
+                def run_judges(judges: List[EvaluationModel]):
+                    threads = []
+                    if combined_criteria:
+                        # One thread per judge, each sends a single request for all criteria sets
+                        for evaluation_model in judges:
+                            thread = threading.Thread(target=process_combined_evaluation, args=(evaluation_model,))
+                            threads.append(thread)
+                            thread.start()
+                    else:
+                        # Accuracy evaluation threads
+                        for evaluation_model in judges:
+                            thread = threading.Thread(
+                                target=process_evaluation_model,
+                                args=(
+                                    evaluation_model,
+                                    category_path / get_accuracy_filename(category_name, evaluation_model.name),
+                                    criteria.evaluation_steps.accuracy,
+                                ),
+                            )
+                            threads.append(thread)
+                            thread.start()
+
+                        # Completeness evaluation threads
+                        for evaluation_model in judges:
+                            thread = threading.Thread(
+                                target=process_evaluation_model,
+                                args=(
+                                    evaluation_model,
+                                    category_path / get_completeness_filename(category_name, evaluation_model.name),
+                                    criteria.evaluation_steps.completeness,
+                                ),
+                            )
+                            threads.append(thread)
+                            thread.start()
+
+                    # Wait for all threads to complete
+                    for thread in threads:
+                        thread.join()
+
+                if adaptive_judges:
+                    # The first judges always run, the next one only while they disagree.
+                    # Reports of a judge that already exist are used anyway, they cost nothing
+                    ensemble = order_judges(evaluation_models, judge_order)
+                    ran = ensemble[:FIRST_JUDGES]
+                    run_judges(ran)
+                    reasons = find_disagreement(read_scores(category_path, category_name, ran), disagreement_threshold)
+                    tiebreak_reasons = reasons
+                    for evaluation_model in ensemble[FIRST_JUDGES:]:
+                        if reasons:
+                            print_regular(f"Asking {evaluation_model.name} about {category_name}: {'; '.join(reasons)}")
+                            run_judges([evaluation_model])
+                        elif not has_reports(category_path, category_name, evaluation_model):
+                            break
+                        ran.append(evaluation_model)
+                        reasons = find_disagreement(
+                            read_scores(category_path, category_name, ran), disagreement_threshold
+                        )
+                    write_judges(category_path, category_name, [judge.name for judge in ran], tiebreak_reasons)
+                    print_regular(f"{len(ran)} of {len(ensemble)} judges evaluated {category_name}.")
+                else:
+                    # All judges run, the judges of an earlier adaptive run no longer apply
+                    remove_judges(category_path, category_name)
+                    run_judges(evaluation_models)
+
+
+def enqueue_evaluations(
+    model: Model,
+    language: str = "JS",
+    force_reevaluate: bool = False,
+    summary_filename: str = "summary.csv",
+    queue_path: Path | None = None,
+    pre_judge_outputs: bool = True,
+    combined_criteria: bool = False,
+) -> int:
+    """
+    Put the judge evaluations of the scenarios into the shared work queue instead of running them.
+    Every judge and metric is a separate job run by workers started with execute_test.work(judge=True),
+    with combined_criteria every judge gets one job for all metrics, see evaluate.
+    All judges are queued: the adaptive mode of evaluate needs the scores of the first judges to queue the next one.
+    Returns the number of newly queued jobs.
+    """
+    import pandas as pd
+    from Utils.execute_test import get_queue
+
+    queue = get_queue(queue_path)
+    base_path = results_path / "Output" / model.model_id / language
+    summary_path = base_path / summary_filename
+
+    if not summary_path.exists():
+        print_error(f"ERROR: File {summary_path} does not exist.")
+        return 0
+
+    queued = 0
+    summary_report = pd.read_csv(summary_path)
+    for index, row in summary_report.iterrows():
+        experiment_type = row["Type"]
+        category = row["Category"]
+        dataset = row["Dataset"] if row["Dataset"] != "none" else ""
+        complexity = row["Complexity"] if row["Complexity"] != "none" else ""
+        size = row["Size"] if row["Size"] != "none" else ""
+        category_name = construct_category_name(category, dataset, complexity, size)
+
+        for root, dirs, files in os.walk(base_path / experiment_type):
+            if category_name in dirs:
+                category_path = Path(root) / category_name
+                category_criteria_path = criteria_path / experiment_type / f"{category_name}_criteria.yaml"
+
+                if not category_criteria_path.exists():
+                    print_error(f"ERROR: File {category_criteria_path} does not exist.")
+                    continue
+
+                if not pre_judge_outputs:
+                    # A verdict of an earlier run must not override the judges in grade
+                    remove_verdict(category_path, category_name)
+                elif not passes_pre_judge(category_path, category_name, experiment_type):
+                    continue
+
+                remove_judges(category_path, category_name)
+                for evaluation_model in get_evaluation_models():
+                    if combined_criteria:
+                        report_paths = {
+                            metric: str(category_path / get_filename(category_name, evaluation_model.name))
+                            for metric, get_filename in metric_filenames.items()
+                        }
+                        report_paths = {
+                            metric: report_path
+                            for metric, report_path in report_paths.items()
+                            if force_reevaluate or not Path(report_path).exists()
+                        }
+                        if not report_paths:
+                            continue
+                        payload = {
+                            "judge": evaluation_model.name,
+                            "metric": "combined",
+                            "category_name": category_name,
+                            "category_path": str(category_path),
+                            "criteria_path": str(category_criteria_path),
+                            "report_paths": report_paths,
+                        }
+                        job_id = f"judge:{category_path / category_name}_{evaluation_model.name}_combined"
+                        queued += queue.put(job_id, "judge", payload)
+                        continue
+
+                    for metric, get_filename in (
+                        ("accuracy", get_accuracy_filename),
+                        ("completeness", get_completeness_filename),
+                    ):
+                        report_path = category_path / get_filename(category_name, evaluation_model.name)
+                        if report_path.exists() and not force_reevaluate:
+                            continue
+                        payload = {
+                            "judge": evaluation_model.name,
+                            "metric": metric,
+                            "category_name": category_name,
+                            "category_path": str(category_path),
+                            "criteria_path": str(category_criteria_path),
+                            "report_path": str(report_path),
+                        }
+                        queued += queue.put(f"judge:{report_path}", "judge", payload)
+
+    print(f"Queued {queued} judge jobs to {queue.db_path}")
+    return queued
+
+
+def run_judge_job(payload: dict):
+    """Worker handler of a judge job, raises on failure so the queue retries it"""
+    from epam.auto_llm_eval.evaluator import read_file, write_file, evaluate_output, Criteria
+
+    evaluation_model = next(model for model in get_evaluation_models() if model.name == payload["judge"])
+    criteria = Criteria.from_yaml(read_file(Path(payload["criteria_path"])))
+    category_name = payload["category_name"]
+
+    output = extract_content(Path(payload["category_path"]) / f"{category_name}_report_1.md")
+    if not output:
+        raise ValueError(f"Scenario {category_name} has no output")
+
+    if payload["metric"] == "combined":
+        reports = evaluate_combined(
+            evaluate_output,
+            {metric: getattr(criteria.evaluation_steps, metric) for metric in payload["report_paths"]},
+            output,
+            evaluation_model.execute_prompt,
+        )
+        for metric, report_path in payload["report_paths"].items():
+            write_file(Path(report_path), reports[metric])
+            print_success(f"File created: {Path(report_path).name}")
+        return
+
+    eval_steps = getattr(criteria.evaluation_steps, payload["metric"])
+    report_json = evaluate_output(
+        evaluation_steps=eval_steps, output=output, execute_prompt=evaluation_model.execute_prompt
+    )
+    write_file(Path(payload["report_path"]), report_json)
+    print_success(f"File created: {Path(payload['report_path']).name}")
+
+
+def calibrate_combined(
+    model: Model,
+    language: str = "JS",
+    sample_size: int = 10,
+    force_reevaluate: bool = False,
+    summary_filename: str = "summary.csv",
+) -> dict | None:
+    """
+    Check the combined criteria mode of evaluate against the two-call mode.
+
+    The scenarios already judged in the two-call mode are judged again in the combined mode into separate
+    *_combined.json reports, both are graded and the scores compared. The scores of every judge and metric
+    are written to combined_calibration.csv next to the summary.
+
+    Args:
+        sample_size (int): Scenarios to judge again.
+
+    Returns:
+        The calibration summary, see combined_judge.calibration_summary
+    """
+    import pandas as pd
+    from epam.auto_llm_eval.evaluator import read_file, write_file, evaluate_output, grade_report, Criteria
+
+    evaluation_models = get_evaluation_models()
+    base_path = results_path / "Output" / model.model_id / language
+    summary_path = base_path / summary_filename
+
+    if not summary_path.exists():
+        print_error(f"ERROR: File {summary_path} does not exist.")
+        return None
+
+    records = []
+    scenarios = 0
+    summary_report = pd.read_csv(summary_path)
+    for index, row in summary_report.iterrows():
+        if scenarios >= sample_size:
+            break
+        experiment_type = row["Type"]
+        category = row["Category"]
+        dataset = row["Dataset"] if row["Dataset"] != "none" else ""
+        complexity = row["Complexity"] if row["Complexity"] != "none" else ""
+        size = row["Size"] if row["Size"] != "none" else ""
+        category_name = construct_category_name(category, dataset, complexity, size)
+
+        for root, dirs, files in os.walk(base_path / experiment_type):
+            if category_name not in dirs:
+                continue
+            category_path = Path(root) / category_name
+            separate_paths = {
+                (evaluation_model.name, metric): category_path / get_filename(category_name, evaluation_model.name)
+                for evaluation_model in evaluation_models
+                for metric, get_filename in metric_filenames.items()
+            }
+            if not all(report_path.exists() for report_path in separate_paths.values()):
+                continue
+
+            try:
+                criteria_yaml = read_file(criteria_path / experiment_type / f"{category_name}_criteria.yaml")
+                criteria = Criteria.from_yaml(criteria_yaml)
+            except Exception as e:
+                print_error(f"ERROR: Unable to read or parse criteria of {category_name}: {e}")
+                continue
+            output = extract_content(category_path / f"{category_name}_report_1.md")
+            scenarios += 1
+            print_regular(f"Calibrating the combined mode on {category_name} at {datetime.now()}...")
+
+            for evaluation_model in evaluation_models:
+                combined_paths = {
+                    metric: category_path / get_calibration_filename(category_name, evaluation_model.name, metric)
+                    for metric in metric_filenames
+                }
+                if force_reevaluate or not all(report_path.exists() for report_path in combined_paths.values()):
+                    try:
+                        reports = evaluate_combined(
+                            evaluate_output,
+                            {metric: getattr(criteria.evaluation_steps, metric) for metric in metric_filenames},
+                            output,
+                            evaluation_model.execute_prompt,
+                        )
+                    except Exception as e:
+                        print_error(f"ERROR: combined evaluation of {category_name} by {evaluation_model.name}: {e}")
+                        continue
+                    for metric, report_path in combined_paths.items():
+                        write_file(report_path, reports[metric])
+
+                for metric in metric_filenames:
+                    try:
+                        separate = grade_report(read_file(separate_paths[evaluation_model.name, metric]))
+                        combined = grade_report(read_file(combined_paths[metric]))
+                    except Exception as e:
+                        print_error(
+                            f"ERROR: Failed to grade {metric} of {category_name} by {evaluation_model.name}: {e}"
+                        )
+                        continue
+                    records.append(
+                        {
+                            "scenario": category_name,
+                            "judge": evaluation_model.name,
+                            "metric": metric,
+                            "separate": round(separate.get_score(), 2),
+                            "combined": round(combined.get_score(), 2),
+                        }
                     )
-                    threads.append(thread)
-                    thread.start()
 
-                # Wait for all threads to complete
-                for thread in threads:
-                    thread.join()
+    pd.DataFrame(records, columns=["scenario", "judge", "metric", "separate", "combined"]).to_csv(
+        base_path / "combined_calibration.csv", index=False
+    )
+    summary = calibration_summary(records)
+    message = (
+        f"Combined mode on {scenarios} scenarios: mean difference {summary['mean_abs_difference']} "
+        f"(bias {summary['bias']}), judges disagree by {summary['judge_disagreement']}"
+    )
+    if summary["calibrated"]:
+        print_success(f"{message}, calibrated.")
+    else:
+        print_error(f"{message}, NOT calibrated, keep the two-call mode.")
+    return summary
 
 
 def grade(model: Model, language: str = "JS", force_regrade: bool = False, summary_filename: str = "summary.csv"):
@@ -266,6 +665,8 @@ def grade(model: Model, language: str = "JS", force_regrade: bool = False, summa
     Returns:
         None
     """
+    import pandas as pd
+    from epam.auto_llm_eval.evaluator import read_file, grade_report
 
     evaluation_models = get_evaluation_models()
     base_path = results_path / "Output" / model.model_id / language
@@ -295,7 +696,29 @@ def grade(model: Model, language: str = "JS", force_regrade: bool = False, summa
                 category_path = Path(root) / category_name
                 errors = 0
 
-                for evaluation_model in evaluation_models:
+                verdict = read_verdict(category_path, category_name)
+                if verdict is not None and verdict.decision == SCORE:
+                    summary_report.at[index, "Accuracy"] = verdict.accuracy
+                    summary_report.at[index, "Completeness"] = verdict.completeness
+                    summary_report.to_csv(summary_path, index=False)
+                    print_success(f"Scored {category_name} by the pre-judge rules: {'; '.join(verdict.reasons)}")
+                    continue
+                if verdict is not None and verdict.decision != JUDGE:
+                    print_skip(f"Skipping {category_name}, it needs a re-run: {'; '.join(verdict.reasons)}")
+                    continue
+
+                # Judges that ran for the scenario, all of them unless the adaptive mode stopped early.
+                # A judge run later for the scenario counts too
+                judges = read_judges(category_path, category_name)
+                scenario_models = [
+                    evaluation_model
+                    for evaluation_model in evaluation_models
+                    if judges is None
+                    or evaluation_model.name in judges
+                    or has_reports(category_path, category_name, evaluation_model)
+                ]
+
+                for evaluation_model in scenario_models:
                     accuracy_cell_model_name = f"Accuracy_{evaluation_model.name}"
                     acc_value = row.get(accuracy_cell_model_name, None)
                     if pd.notna(acc_value) and not force_regrade:
@@ -355,11 +778,11 @@ def grade(model: Model, language: str = "JS", force_regrade: bool = False, summa
                 if errors == 0:
                     # calculate average accuracy and completeness by models evaluations
                     summary_report.at[index, "Accuracy"] = round(
-                        summary_report.loc[index, [f"Accuracy_{model.name}" for model in evaluation_models]].mean(), 2
+                        summary_report.loc[index, [f"Accuracy_{model.name}" for model in scenario_models]].mean(), 2
                     )
 
                     summary_report.at[index, "Completeness"] = round(
-                        summary_report.loc[index, [f"Completeness_{model.name}" for model in evaluation_models]].mean(),
+                        summary_report.loc[index, [f"Completeness_{model.name}" for model in scenario_models]].mean(),
                         2,
                     )
                     print_success(f"Average accuracy and completeness calculated for {category_name}.")
@@ -0,0 +1,251 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+from unittest import mock
+
+from Utils.enrich_tasks import enrich_task_content
+from Utils.llm.ai_message import AIMessage, AIMessageContentFactory
+from Utils.llm.ai_tool import AITool, AIToolParameter, AIToolSet, ToolProvider
+from Utils.llm.message_converter import ConverterProvider, get_converter
+
+repo_path = Path(__file__).resolve().parent.parent
+default_results_path = repo_path / ".benchmarks" / "harness.jsonl"
+
+# Sizes of the synthetic inputs, scale multiplies all of them
+CONVERSATION_TURNS = 100
+TOOL_RESULT_BYTES = 1_000_000
+TOOLS_COUNT = 40
+REPORTS_COUNT = 2000
+LARGEST_REPOS_COUNT = 3
+
+
+def long_conversation(turns: int, tool_result_bytes: int) -> List[AIMessage]:
+    """An agentic conversation: every turn calls a tool, the last tool result is MB-sized"""
+    messages = [AIMessage.create_user_message("Migrate the application to React. " * 200)]
+    for turn in range(turns):
+        tool_id = f"call_{turn}"
+        result_size = tool_result_bytes if turn == turns - 1 else 4000
+        messages.append(
+            AIMessage.create_assistant_message(
+                [
+                    AIMessageContentFactory.create_text(f"Reading the file number {turn}."),
+                    AIMessageContentFactory.create_tool_call("read_file", {"path": f"src/file_{turn}.js"}, tool_id),
+                ]
+            )
+        )
+        messages.append(
+            AIMessage.create_user_message(
+                [AIMessageContentFactory.create_tool_response("read_file", "x" * result_size, tool_id)]
+            )
+        )
+    messages.append(AIMessage.create_assistant_message("The migration is done."))
+    return messages
+
+
+def large_tool_set(tools_count: int) -> AIToolSet:
+    tool_set = AIToolSet()
+    for index in range(tools_count):
+        parameters = [
+            AIToolParameter("path", "string", "Path of the file relative to the project root", required=True),
+            AIToolParameter("encoding", "string", "File encoding", enum_values=["utf-8", "latin-1"]),
+            AIToolParameter("limit", "integer", "Maximal number of lines"),
+            AIToolParameter(
+                "files",
+                "array",
+                "Files to write",
+                items_properties=[
+                    AIToolParameter("path", "string", "Path of the file", required=True),
+                    AIToolParameter("content", "string", "Content of the file", required=True),
+                ],
+            ),
+        ]
+        tool_set.add_tool(AITool(f"tool_{index}", f"Synthetic tool number {index}", parameters))
+    return tool_set
+
+
+def write_reports(directory_path: Path, reports_count: int, answer_bytes: int = 2000):
+    """Answer reports in the layout process_directory reads: <category folder>/<task>_report_<attempt>.md"""
+    answer = "const value = 1;\n" * (answer_bytes // 17)
+    for index in range(reports_count):
+        category_path = directory_path / f"task_{index // 10}"
+        category_path.mkdir(parents=True, exist_ok=True)
+        report = (
+            f"# Task\n### Answer:\n{answer}\n"
+            f"### Tokens: {{'input_tokens': 1200, 'output_tokens': 800, 'reasoning_tokens': 300}}\n"
+            f"### Execution time: 12.34\n"
+        )
+        (category_path / f"task_ReactNavbar_low_low_report_{index % 10 + 1}.md").write_text(report)
+
+
+def largest_repos(datasets_category: Path, count: int) -> List[str]:
+    def repo_size(repo: Path) -> int:
+        return sum(file.stat().st_size for file in repo.rglob("*") if file.is_file())
+
+    repos = sorted((repo for repo in datasets_category.iterdir() if repo.is_dir()), key=repo_size, reverse=True)
+    return [repo.name for repo in repos[:count]]
+
+
+def measure(func: Callable[[], Any], repeat: int, min_time: float = 0.2) -> Dict[str, float]:
+    """Seconds per call, each of the repeat runs calls func enough times to last min_time"""
+    func()  # warm up caches and imports
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1000:
+            break
+        number *= 2
+
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return {"min": min(timings), "median": statistics.median(timings), "calls": number}
+
+
+def build_benchmarks(
+    work_dir: Path, scale: float = 1.0, names: Optional[List[str]] = None
+) -> Dict[str, Callable[[], Any]]:
+    """
+    Benchmark name to the call to measure, the inputs are prepared once in work_dir.
+    Only the inputs of benchmarks which may start with one of names are prepared.
+    """
+    benchmarks: Dict[str, Callable[[], Any]] = {}
+
+    def wanted(prefix: str) -> bool:
+        return not names or any(name.startswith(prefix) or prefix.startswith(name) for name in names)
+
+    if wanted("convert_"):
+        messages = long_conversation(max(int(CONVERSATION_TURNS * scale), 1), int(TOOL_RESULT_BYTES * scale))
+        for provider in ConverterProvider:
+            converter = get_converter(provider)
+            benchmarks[f"convert_{provider.value}"] = lambda converter=converter: converter.convert(messages)
+
+    if wanted("tools_"):
+        tool_set = large_tool_set(max(int(TOOLS_COUNT * scale), 1))
+        for provider in ToolProvider:
+            benchmarks[f"tools_{provider.value}"] = lambda provider=provider: tool_set.to_format(provider)
+
+    if wanted("enrich_"):
+        datasets_category = repo_path / "Dataset" / "JS"
+        for repo_name in largest_repos(datasets_category, LARGEST_REPOS_COUNT):
+            task_content = f'Migrate the application.\n<place_code_here repo="{repo_name}"/>\n'
+            benchmarks[f"enrich_{repo_name}"] = lambda task_content=task_content: enrich_task_content(
+                "benchmark", task_content, datasets_category
+            )
+
+    if wanted("process_directory_"):
+        reports_path = work_dir / "reports"
+        reports_count = max(int(REPORTS_COUNT * scale), 10)
+        write_reports(reports_path, reports_count)
+        # get_tokens_and_time reads the results repository location when imported,
+        # the temporary work_dir must not stay in the environment after it is deleted
+        results_repo_path = os.getenv("RESULTS_REPO_PATH") or str(work_dir)
+        with mock.patch.dict(os.environ, {"RESULTS_REPO_PATH": results_repo_path}):
+            from Utils.get_tokens_and_time import process_directory
+
+        benchmarks[f"process_directory_{reports_count}_reports"] = lambda: process_directory(
+            str(reports_path), "benchmark", "component_generation"
+        )
+
+    if not wanted("extract_content"):
+        return benchmarks
+    try:
+        from Utils.auto_eval import extract_content
+    except (ImportError, ValueError) as e:
+        # auto_eval needs the evaluation framework and its environment variables
+        print(f"Skipping extract_content: {e}")
+    else:
+        report_path = work_dir / "large_report.md"
+        answer = "const value = 1;\n" * int(TOOL_RESULT_BYTES * scale / 17)
+        report_path.write_text(f"# Task\n### Answer:\n{answer}\n### Tokens: {{'input_tokens': 1}}\n")
+        benchmarks["extract_content"] = lambda: extract_content(report_path)
+
+    return benchmarks
+
+
+def current_commit() -> Dict[str, Any]:
+    def git(*args: str) -> str:
+        return subprocess.run(["git", *args], cwd=repo_path, capture_output=True, text=True).stdout.strip()
+
+    return {"commit": git("rev-parse", "--short", "HEAD"), "dirty": bool(git("status", "--porcelain", "--", "Utils"))}
+
+
+def read_results(results_path: Path) -> List[Dict[str, Any]]:
+    if not results_path.exists():
+        return []
+    with open(results_path, "r", encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def compare(record: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.1) -> List[str]:
+    """Benchmarks whose median got slower or faster than the baseline by more than threshold"""
+    lines = []
+    for name, timing in record["results"].items():
+        if name not in baseline["results"]:
+            continue
+        change = timing["median"] / baseline["results"][name]["median"] - 1
+        if abs(change) > threshold:
+            lines.append(f"{name}: {'slower' if change > 0 else 'faster'} by {abs(change):.0%}")
+    return lines
+
+
+def run_benchmarks(
+    names: Optional[List[str]] = None,
+    results_path: Path = default_results_path,
+    repeat: int = 5,
+    scale: float = 1.0,
+    min_time: float = 0.2,
+) -> Dict[str, Any]:
+    """
+    Run the benchmarks (all, or those whose name starts with one of names) and append the results
+    with the commit to results_path. The results are compared with the latest run on another commit.
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        benchmarks = build_benchmarks(Path(work_dir), scale, names)
+        results = {}
+        for name, func in benchmarks.items():
+            if names and not any(name.startswith(prefix) for prefix in names):
+                continue
+            results[name] = measure(func, repeat, min_time)
+            print(f"{name}: {results[name]['median'] * 1000:.2f} ms")
+
+    record = {
+        **current_commit(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "scale": scale,
+        "results": results,
+    }
+
+    baseline = next(
+        (
+            previous
+            for previous in reversed(read_results(results_path))
+            if previous["commit"] != record["commit"] and previous.get("scale") == scale
+        ),
+        None,
+    )
+    if baseline:
+        changes = compare(record, baseline)
+        print(f"Compared with {baseline['commit']}: " + ("; ".join(changes) if changes else "no changes"))
+
+    results_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(results_path, "a", encoding="utf-8") as file:
+        file.write(json.dumps(record) + "\n")
+    return record
+
+
+if __name__ == "__main__":
+    run_benchmarks()
@@ -0,0 +1,113 @@
+"""
+Judging the accuracy and the completeness of an output in one request per judge.
+
+The evaluator library builds a prompt for each criteria set and parses the judge answer to it. Here the prompts
+are captured without calling the judge, joined into a single request carrying the output once, and the answers
+of the judge are replayed to the library, which returns the usual accuracy and completeness reports.
+"""
+
+import json
+from itertools import combinations
+from typing import Any, Callable, Dict, Iterable, List
+
+OUTPUT_PLACEHOLDER = "[OUTPUT]"
+
+
+class _PromptCaptured(Exception):
+    def __init__(self, prompt: str):
+        super().__init__("The prompt was captured")
+        self.prompt = prompt
+
+
+def capture_prompt(evaluate_output: Callable[..., Any], evaluation_steps: Any, output: str) -> str:
+    """Prompt the evaluator would send to a judge for the criteria set"""
+
+    def capture(prompt: str) -> str:
+        raise _PromptCaptured(prompt)
+
+    try:
+        evaluate_output(evaluation_steps=evaluation_steps, output=output, execute_prompt=capture)
+    except _PromptCaptured as captured:
+        return captured.prompt
+    raise ValueError("The evaluator returned without sending a prompt")
+
+
+def build_combined_prompt(prompts: Dict[str, str], output: str) -> str:
+    """One request answering every prompt, the output shared by them is sent once"""
+    shared = len(output) > len(OUTPUT_PLACEHOLDER) and all(output in prompt for prompt in prompts.values())
+    answer_format = json.dumps({name: "<answer>" for name in prompts})
+    parts = [
+        f"You are given {len(prompts)} independent evaluation requests: {', '.join(prompts)}. "
+        "Evaluate each of them exactly as if it was sent alone and answer it in the format it asks for.\n"
+        f"Return only a JSON object with the answer of every request under its name: {answer_format}"
+    ]
+    if shared:
+        parts.append(
+            f"All requests evaluate the same output. It is given once here and replaced by {OUTPUT_PLACEHOLDER} "
+            f"in the requests.\n<output>\n{output}\n</output>"
+        )
+    for name, prompt in prompts.items():
+        request = prompt.replace(output, OUTPUT_PLACEHOLDER) if shared else prompt
+        parts.append(f'<request name="{name}">\n{request}\n</request>')
+    return "\n\n".join(parts)
+
+
+def split_combined_answer(answer: str, names: Iterable[str]) -> Dict[str, str]:
+    """Answer of every request from the combined answer, JSON answers are dumped back to text"""
+    data = json.loads(answer)
+    if not isinstance(data, dict):
+        raise ValueError("The combined answer is not a JSON object")
+    missing = [name for name in names if name not in data]
+    if missing:
+        raise ValueError(f"The combined answer has no answer for {', '.join(missing)}")
+    return {name: data[name] if isinstance(data[name], str) else json.dumps(data[name]) for name in names}
+
+
+def evaluate_combined(
+    evaluate_output: Callable[..., Any],
+    evaluation_steps: Dict[str, Any],
+    output: str,
+    execute_prompt: Callable[[str], str],
+) -> Dict[str, Any]:
+    """
+    Reports of every criteria set by name, as returned by evaluate_output, from a single judge request.
+    A prompt the evaluator sends besides the captured one (a follow-up or a changed prompt) goes to the judge alone.
+    """
+    prompts = {name: capture_prompt(evaluate_output, steps, output) for name, steps in evaluation_steps.items()}
+    answers = split_combined_answer(execute_prompt(build_combined_prompt(prompts, output)), prompts)
+
+    reports = {}
+    for name, steps in evaluation_steps.items():
+
+        def replay(prompt: str, name: str = name) -> str:
+            return answers[name] if prompt == prompts[name] else execute_prompt(prompt)
+
+        reports[name] = evaluate_output(evaluation_steps=steps, output=output, execute_prompt=replay)
+    return reports
+
+
+def calibration_summary(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Agreement of the combined mode with the two-call mode.
+
+    records have the scenario, judge, metric and the scores of both modes (separate, combined). The combined mode
+    is calibrated when it moves the scores less on average than the judges disagree with each other
+    in the two-call mode, so no scale of the scores is assumed.
+    """
+    differences = [record["combined"] - record["separate"] for record in records]
+    by_scenario: Dict[tuple, List[float]] = {}
+    for record in records:
+        by_scenario.setdefault((record["scenario"], record["metric"]), []).append(record["separate"])
+    judge_differences = [
+        abs(first - second) for scores in by_scenario.values() for first, second in combinations(scores, 2)
+    ]
+
+    mean_difference = sum(abs(difference) for difference in differences) / len(differences) if differences else 0.0
+    judge_disagreement = sum(judge_differences) / len(judge_differences) if judge_differences else 0.0
+    return {
+        "scores": len(records),
+        "mean_abs_difference": round(mean_difference, 3),
+        "bias": round(sum(differences) / len(differences), 3) if differences else 0.0,
+        "judge_disagreement": round(judge_disagreement, 3),
+        "calibrated": bool(records) and mean_difference <= judge_disagreement,
+    }
@@ -61,3 +61,15 @@ repo_to_technology = {
     "AngularMeteo": "Angular",
     "ReactSearchJob": "React",
 }
+
+# Category: experiment type
+type_mapper = {
+    "code_analysis": "code_documentation",
+    "code_explanation": "code_documentation",
+    "solution_documentation": "code_documentation",
+    "component_generation": "code_generation",
+    "solution_template_generation": "code_generation",
+    "test_generation": "code_generation",
+    "solution_migration": "code_translation",
+    "multimodal": "multimodal",
+}
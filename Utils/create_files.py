@@ -1,63 +1,194 @@
-import os
+import json
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from Utils.llm.project_writer import ProjectWriter
 
-def create_file(output_dir, file_name, file_content):
-    full_path = os.path.join(root_path, output_dir, file_name)
-    os.makedirs(os.path.dirname(full_path), exist_ok=True)
-    with open(full_path, "w", encoding="utf-8") as file:
-        file.write(file_content.strip())
+ANSWER_MARKER = "### Answer:"
+END_MARKER = "### Tokens:"
+MANIFEST_NAME = "extraction_manifest.json"
 
+# Blocks of these types are not written, the applications reuse their original styles
+DEFAULT_SKIP_TYPES = frozenset({"css"})
 
-def process_react(answer_content, output_dir):
-    code_blocks = re.findall(r"```[\s\S]*?```", answer_content)
-    for block in code_blocks:
-        block_content = block[3:-3].strip()
-        type_of_file, first_line, file_content = block_content.split("\n", 2)
-        file_name = first_line.replace("// ", "")
-        if type_of_file == "css":
-            continue
-        if type_of_file == "html":
-            file_name = first_line.split(" ")[1]
+_path = r"([\w@.\-\[\]()]+(?:/[\w@.\-\[\]()]+)*\.[A-Za-z0-9]+)"
+# React answers name the file in a comment on the first line of the block: // src/App.tsx, <!-- index.html -->
+FILE_COMMENT_REGEX = re.compile(r"^\s*(?://|#|/\*|<!--)\s*(?:File:\s*)?" + _path + r"\s*(?:\*/|-->)?\s*$")
+# Angular answers name it in a line before the block: **src/app/app.component.ts**, ### `main.ts`
+FILE_HEADING_REGEX = re.compile(r"^\s*(?:#+\s*|[-*>]\s+|\d+\.\s+)*(?:File:\s*)?[*`]*" + _path + r"[*`:]*\s*$")
+
+
+class CodeBlock:
+    """A fenced code block of an answer with the file it belongs to, if the answer names one"""
 
-        create_file(output_dir, file_name, file_content)
+    file_type: str
+    file_name: Optional[str]
+    content: str
+    layout: Optional[str]
+    closed: bool
 
+    def __init__(
+        self, file_type: str, file_name: Optional[str], content: str, layout: Optional[str], closed: bool = True
+    ):
+        self.file_type = file_type
+        self.file_name = file_name
+        self.content = content
+        self.layout = layout
+        self.closed = closed
 
-def process_angular(answer_content, output_dir):
-    file_blocks = answer_content.split("\n\n**")[1:]
-    for block in file_blocks:
-        file_name, code = block.split("**\n", 1)
-        block_content = code[3:-3].strip()
-        type_of_file, file_content = block_content.split("\n", 1)
 
-        if type_of_file == "css":
+def answer_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Lines of the answer section of a report, read lazily"""
+    in_answer = False
+    for line in lines:
+        if not in_answer:
+            in_answer = line.startswith(ANSWER_MARKER)
             continue
-        create_file(output_dir, file_name, file_content)
+        if line.startswith(END_MARKER):
+            return
+        yield line
 
 
-def extract_and_write_files(md_file_path: str):
-    if not md_file_path:
-        return
-    directory_path = os.path.dirname(md_file_path)
-    output_dir = os.path.basename(directory_path)
-    with open(md_file_path, "r", encoding="utf-8") as md_file:
-        content = md_file.read()
-    answer_content = content.split("### Answer:")[-1]
+def iter_code_blocks(lines: Iterable[str]) -> Iterator[CodeBlock]:
+    """
+    Stream the fenced code blocks out of answer lines in a single pass, detecting for each block
+    whether the file name is given by a comment on its first line or by the line before it.
+    """
+    heading: Optional[str] = None
+    fence: Optional[str] = None
+    file_type = ""
+    block: List[str] = []
 
-    process_react(answer_content, output_dir)
-    # process_angular(answer_content, output_dir)
+    for line in lines:
+        line = line.rstrip("\n")
+        stripped = line.strip()
+        if fence is None:
+            if stripped.startswith("```"):
+                fence = stripped[: len(stripped) - len(stripped.lstrip("`"))]
+                file_type = stripped[len(fence) :].strip().lower()
+                block = []
+            elif stripped:
+                heading = stripped
+            continue
 
+        if stripped == fence:
+            yield make_code_block(file_type, block, heading)
+            fence, heading = None, None
+        else:
+            block.append(line)
 
-root_path = "<folder-name>"
+    if fence is not None:
+        # The answer was cut off inside a block, keep what was generated
+        code_block = make_code_block(file_type, block, heading)
+        code_block.closed = False
+        yield code_block
 
-paths = ["path-to-answer"]
 
-if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        extract_and_write_files(sys.argv[1])
+def make_code_block(file_type: str, lines: List[str], heading: Optional[str]) -> CodeBlock:
+    if lines:
+        match = FILE_COMMENT_REGEX.match(lines[0])
+        if match:
+            return CodeBlock(file_type, match.group(1), "\n".join(lines[1:]), "comment")
+    if heading:
+        match = FILE_HEADING_REGEX.match(heading)
+        if match:
+            return CodeBlock(file_type, match.group(1), "\n".join(lines), "heading")
+    return CodeBlock(file_type, None, "\n".join(lines), None)
+
+
+def extract_files(
+    lines: Iterable[str], skip_types: Iterable[str] = DEFAULT_SKIP_TYPES
+) -> Tuple[Dict[str, str], Dict[str, int]]:
+    """Files of an answer by name (a later block of the same file wins) and counts of the block layouts"""
+    skip_types = set(skip_types)
+    files: Dict[str, str] = {}
+    stats = {"comment": 0, "heading": 0, "unnamed": 0, "skipped": 0}
+    for block in iter_code_blocks(lines):
+        if block.file_type in skip_types:
+            stats["skipped"] += 1
+        elif block.file_name is None:
+            stats["unnamed"] += 1
+        else:
+            files[block.file_name] = block.content.strip()
+            stats[block.layout] += 1
+    return files, stats
+
+
+def extract_report(
+    report_path: Path, output_path: Path, skip_types: Iterable[str] = DEFAULT_SKIP_TYPES
+) -> Dict[str, Any]:
+    """Write the project tree of one answer report with its files manifest, returns the report summary"""
+    summary: Dict[str, Any] = {"report": str(report_path), "output": str(output_path)}
+    try:
+        with open(report_path, "r", encoding="utf-8") as report:
+            files, stats = extract_files(answer_lines(report), skip_types)
+        summary.update(stats)
+
+        writer = ProjectWriter(output_path)
+        valid_files = {}
+        for file_name, content in files.items():
+            try:
+                writer.normalize(file_name)
+                valid_files[file_name] = content
+            except ValueError:
+                summary["unnamed"] += 1
+        summary["files"] = writer.commit(valid_files) if valid_files else []
+    except (OSError, UnicodeDecodeError) as e:
+        summary["error"] = str(e)
+    return summary
+
+
+def _extract_report_job(job: Tuple[Path, Path, frozenset]) -> Dict[str, Any]:
+    return extract_report(*job)
+
+
+def find_reports(reports_path: Path) -> List[Path]:
+    if reports_path.is_file():
+        return [reports_path]
+    return sorted(reports_path.rglob("*_report_*.md"))
+
+
+def extract_run(
+    reports_path: Path,
+    output_path: Path,
+    workers: Optional[int] = None,
+    skip_types: Iterable[str] = DEFAULT_SKIP_TYPES,
+) -> List[Dict[str, Any]]:
+    """
+    Extract the code of every answer report under reports_path (or of a single report) in a process pool.
+    Each report gets its own project tree: output_path/<report folder relative to reports_path>/<report name>.
+    A manifest of all reports is written to output_path.
+    """
+    reports_path, output_path = Path(reports_path), Path(output_path)
+    root = reports_path.parent if reports_path.is_file() else reports_path
+    skip_types = frozenset(skip_types)
+    jobs = [
+        (report, output_path / report.parent.relative_to(root) / report.stem, skip_types)
+        for report in find_reports(reports_path)
+    ]
+
+    if workers == 1 or len(jobs) < 2:
+        summaries = [_extract_report_job(job) for job in jobs]
     else:
-        for path in paths:
-            extract_and_write_files(path)
-        print("Exit")
-        exit(1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            summaries = list(executor.map(_extract_report_job, jobs, chunksize=16))
+
+    output_path.mkdir(parents=True, exist_ok=True)
+    with open(output_path / MANIFEST_NAME, "w", encoding="utf-8") as manifest:
+        json.dump({"reports_path": str(reports_path), "reports": summaries}, manifest, indent=4)
+
+    files_count = sum(len(summary.get("files", [])) for summary in summaries)
+    errors = sum("error" in summary for summary in summaries)
+    print(f"Extracted {files_count} files from {len(summaries)} reports to {output_path}, {errors} reports failed")
+    return summaries
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python -m Utils.create_files <report or reports folder> [output folder]")
+        sys.exit(1)
+    source = Path(sys.argv[1])
+    extract_run(source, Path(sys.argv[2]) if len(sys.argv) > 2 else Path("extracted"))
@@ -1,13 +1,32 @@
 import os
+import re
 from pathlib import Path
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
 import concurrent.futures
 from Utils.enrich_tasks import enrich_task_content
 from Utils.llm.api import ask_model
-from Utils.llm.config import Model
+from Utils.llm.config import Model, ModelProvider
 from Utils.llm.ai_message import AIMessage, AIMessageContent, TextAIMessageContent, ImageAIMessageContent
-from typing import Optional
+from Utils.llm.image_pipeline import ImagePipeline, get_image_pipeline
+from Utils.llm.image_store import enable_image_uploads
+from Utils.llm.retry import RetryRecord
+from Utils.llm.latency import enable_adaptive_timeouts, enable_hedging, get_hedging_policy
+from Utils.llm.job_scheduler import DurationModel, longest_first, makespan
+from Utils.llm.work_queue import WorkQueue, run_worker
+from Utils.llm.token_estimator import TokenEstimator, get_input_token_limit, get_token_estimator
+from Utils.pre_judge import measure_text
+from typing import Optional, Union
+
+# Status of a report, written as its last line. Every status but ok means the answer has to be generated again
+REPORT_OK = "ok"
+REPORT_ERROR = "error"
+REPORT_EMPTY = "empty"
+REPORT_TRUNCATED = "truncated"
+FAILED_STATUSES = frozenset({REPORT_ERROR, REPORT_EMPTY, REPORT_TRUNCATED})
+STATUS_MARKER = "### Status:"
+CONTEXT_OVERFLOW_MODES = ("warn", "reject", "trim", "ignore")
+REPORT_NAME_REGEX = re.compile(r"^(.+)_report_(\d+)\.md$")
 
 
 def get_file_content(file_path):
@@ -30,6 +49,47 @@ def get_output_folder_name(answers_path, current_datetime, report_name):
     return os.path.join(answers_path, "result_" + formatted_datetime, report_name)
 
 
+def get_run_datetime(run_folder: str) -> datetime:
+    """Datetime of a run from its folder name, the inverse of get_output_folder_name"""
+    date, time = run_folder.removeprefix("result_").split("_", 1)
+    return datetime.fromisoformat(f"{date} {time.replace('-', ':')}")
+
+
+def get_report_status(data: str) -> str:
+    """Status of the run part of a report: ok, or the reason the answer has to be generated again"""
+    metrics = measure_text(data)
+    if metrics.error:
+        return REPORT_ERROR
+    if metrics.answer_chars == 0:
+        return REPORT_EMPTY
+    if metrics.truncated:
+        return REPORT_TRUNCATED
+    return REPORT_OK
+
+
+def read_report_status(report_path: Path) -> str:
+    with open(report_path, "r", encoding="utf-8") as report:
+        text = report.read()
+    last_line = text.rstrip().rsplit("\n", 1)[-1]
+    if last_line.startswith(STATUS_MARKER):
+        return last_line[len(STATUS_MARKER) :].strip()
+    # Reports written before the status marker was added
+    return get_report_status(text)
+
+
+def find_failed_reports(run_path: Path) -> list[tuple[str, int, str]]:
+    """Task, attempt and status of every report of a category run that is not ok"""
+    failures = []
+    for report_path in sorted(Path(run_path).glob("*/*_report_*.md")):
+        match = REPORT_NAME_REGEX.match(report_path.name)
+        if not match:
+            continue
+        status = read_report_status(report_path)
+        if status != REPORT_OK:
+            failures.append((match.group(1), int(match.group(2)), status))
+    return failures
+
+
 def generate_report(
     answers_path: Path,
     content: list[AIMessageContent],
@@ -44,8 +104,9 @@ def generate_report(
     output_file_path = (
         os.path.join(str(current_output_path), name_without_extension(report_name)) + f"_report_{attempt}.md"
     )
+    status_line = ("" if data.endswith("\n") else "\n") + f"{STATUS_MARKER} {get_report_status(data)}\n"
     with open(output_file_path, "w", encoding="utf-8") as output_file:
-        output_file.write("\n".join([str_content.__str__() for str_content in content]) + "\n\n" + data)
+        output_file.write("\n".join([str_content.__str__() for str_content in content]) + "\n\n" + data + status_line)
 
 
 def get_answer_from_model(task_name: str, content: list[AIMessageContent], system_prompt: str, model, attempt: int = 1):
@@ -61,13 +122,22 @@ def get_answer_from_model(task_name: str, content: list[AIMessageContent], syste
         return data["error"]
 
     thoughts = f'### Thoughts:\n{data["thoughts"]}\n\n' if data["thoughts"] else ""
-    print(f"[{task_name}] Completed attempt #{attempt} in {data['execute_time']} seconds")
+    retries = (
+        f" after retries: {[RetryRecord.from_dict(retry) for retry in data['retries']]}" if data.get("retries") else ""
+    )
+    # After a failover the answer and its timing belong to another deployment, the report says which
+    served_by = data.get("served_by")
+    failover = f"### Served by: {served_by}\n" if served_by and served_by != model.model_id else ""
+    print(f"[{task_name}] Completed attempt #{attempt} in {data['execute_time']} seconds{retries}")
+    if failover:
+        print(f"[{task_name}] Attempt #{attempt} was answered by {served_by} instead of {model.model_id}")
 
     return (
         f"{thoughts}"
         f'### Answer:\n{data["content"]}\n\n'
         f'### Tokens: {str(data["tokens"])}\n'
         f'### Execution time: {data["execute_time"]}\n'
+        f"{failover}"
     )
 
 
@@ -85,16 +155,102 @@ def get_tasks_by_path(directory_path):
     return files
 
 
-def get_task_images(images_category: Path) -> list[ImageAIMessageContent]:
-    images = []
-    if not images_category.exists() or not images_category.is_dir():
-        return images
+def get_task_images(images_category: Path, pipeline: Optional[ImagePipeline] = None) -> list[ImageAIMessageContent]:
+    # Images are loaded once per folder and shared by all attempts
+    pipeline = pipeline or get_image_pipeline()
+    return list(pipeline.load(images_category))
+
+
+class TaskJob:
+    """One attempt of a task, annotated with its estimated prompt size and predicted duration"""
+
+    task_name: str
+    attempt: int
+    message_content: list[AIMessageContent]
+    experiment: str
+    system_prompt: str
+    output_dir: Optional[Path]
+    model: Optional[Model]
+    estimated_input_tokens: int
+    predicted_duration: float
+
+    def __init__(
+        self,
+        task_name: str,
+        attempt: int,
+        message_content: list[AIMessageContent],
+        experiment: str = "",
+        system_prompt: str = "",
+        output_dir: Optional[Path] = None,
+        model: Optional[Model] = None,
+        estimated_input_tokens: int = 0,
+    ):
+        self.task_name = task_name
+        self.attempt = attempt
+        self.message_content = message_content
+        self.experiment = experiment
+        self.system_prompt = system_prompt
+        self.output_dir = output_dir
+        self.model = model
+        self.estimated_input_tokens = estimated_input_tokens
+        self.predicted_duration = 0.0
+
+
+def trim_job(job: TaskJob, system_prompt: str, estimator: TokenEstimator, input_token_limit: int):
+    """Trim the task text of the job so the whole prompt fits the input token limit"""
+    other_content = [content for content in job.message_content if not isinstance(content, TextAIMessageContent)]
+    available_tokens = input_token_limit - estimator.estimate(system_prompt, other_content)
+    texts = [content for content in job.message_content if isinstance(content, TextAIMessageContent)]
+    for content in texts:
+        text_tokens = max(available_tokens // len(texts), 0)
+        job.message_content[job.message_content.index(content)] = TextAIMessageContent(
+            text=estimator.trim_text(content.text, text_tokens)
+        )
+    job.estimated_input_tokens = estimator.estimate(system_prompt, job.message_content)
+
 
-    for image_file in images_category.iterdir():
-        if image_file.is_file():
-            with open(image_file, "rb") as img_file:
-                images.append(ImageAIMessageContent(binary_content=img_file.read(), file_name=image_file.name))
-    return images
+def preflight_jobs(
+    task_jobs: list[TaskJob],
+    system_prompt: str,
+    model: Model,
+    context_overflow: str,
+) -> tuple[list[TaskJob], list[TaskJob]]:
+    """
+    Estimate input tokens of every job and check them against the model context window.
+    Returns the jobs to run and the rejected ones.
+    """
+    if context_overflow not in CONTEXT_OVERFLOW_MODES:
+        raise ValueError(
+            f"Unknown context_overflow {context_overflow!r}, expected one of {', '.join(CONTEXT_OVERFLOW_MODES)}"
+        )
+    estimator = get_token_estimator(model)
+    input_token_limit = get_input_token_limit(model)
+    accepted, rejected = [], []
+    for job in task_jobs:
+        job.estimated_input_tokens = estimator.estimate(system_prompt, job.message_content)
+        if job.estimated_input_tokens <= input_token_limit or context_overflow == "ignore":
+            accepted.append(job)
+        elif context_overflow == "warn":
+            # The estimate is offline and approximate, the provider decides whether the prompt fits
+            print(
+                f"[{job.task_name}] Warning: attempt #{job.attempt} has ~{job.estimated_input_tokens} input tokens, "
+                f"over the input limit of {input_token_limit} tokens"
+            )
+            accepted.append(job)
+        elif context_overflow == "trim":
+            print(
+                f"[{job.task_name}] Trimming prompt of ~{job.estimated_input_tokens} tokens "
+                f"to the input limit of {input_token_limit} tokens"
+            )
+            trim_job(job, system_prompt, estimator, input_token_limit)
+            accepted.append(job)
+        elif context_overflow == "reject":
+            print(
+                f"[{job.task_name}] Skipping attempt #{job.attempt}: ~{job.estimated_input_tokens} input tokens "
+                f"exceed the input limit of {input_token_limit} tokens"
+            )
+            rejected.append(job)
+    return accepted, rejected
 
 
 def get_model_answer_task(
@@ -109,7 +265,7 @@ def get_model_answer_task(
     return task_name, attempt, message_content, data
 
 
-def generate_answers_from_files(
+def prepare_task_jobs(
     task_category: Path,
     datasets_category: Path,
     output_dir: Path,
@@ -118,12 +274,21 @@ def generate_answers_from_files(
     attempts_count: int,
     launch_list: list[str],
     skip_list: list[str],
-):
+    preprocess_images: bool = False,
+    context_overflow: str = "warn",
+    attempts: Optional[list[int]] = None,
+) -> list[TaskJob]:
+    """
+    Build the jobs of every task attempt in the category, jobs rejected by the preflight get an error report.
+    attempts selects specific attempt numbers instead of 1..attempts_count.
+    """
     system_prompt = get_file_content(task_category / "system.txt")
     if system_prompt is None:
         print(f"System prompt not found in {task_category}, continue without system prompt...")
         system_prompt = ""
     tasks = get_tasks_by_path(task_category)
+    image_pipeline = get_image_pipeline(model.provider if preprocess_images else None)
+    images_count = len(image_pipeline.stats)
 
     # Prepare all tasks and their message content
     task_jobs = []
@@ -133,57 +298,145 @@ def generate_answers_from_files(
         if skip_list and task_name in skip_list:
             continue
 
-        for attempt in range(1, attempts_count + 1):
-            task_content = get_file_content(task_category / task_name)
-            if task_content is None:
-                print(f"Skipping task {task_name} due to read error.")
-                break
-
-            task_content = enrich_task_content(task_name, task_content, datasets_category)
-            message_content: list[AIMessageContent] = [TextAIMessageContent(text=task_content)]
-            images_category = task_category / task_name.replace(".md", "_images")
-            message_content.extend(get_task_images(images_category))
-
-            task_jobs.append((message_content, task_name, attempt))
-
-    if len(task_jobs) > 0:
-        # Execute all get_answer_from_model calls in parallel
-        with ThreadPoolExecutor(max_workers=6) as executor:
-            futures = []
-            for message_content, task_name, attempt in task_jobs:
-                future = executor.submit(
-                    get_model_answer_task,
-                    message_content,
-                    system_prompt,
-                    model,
-                    task_name,
-                    attempt,
-                )
-                futures.append(future)
-
-            # Collect results and generate reports
-            for future in concurrent.futures.as_completed(futures):
-                task_name, attempt, message_content, data = future.result()
-                generate_report(output_dir, message_content, data, task_name, attempt, current_datetime)
+        task_content = get_file_content(task_category / task_name)
+        if task_content is None:
+            print(f"Skipping task {task_name} due to read error.")
+            continue
+
+        task_content = enrich_task_content(task_name, task_content, datasets_category)
+        images_category = task_category / task_name.replace(".md", "_images")
+        task_images = get_task_images(images_category, image_pipeline)
+
+        for attempt in attempts or range(1, attempts_count + 1):
+            # Every attempt gets its own list, trimming replaces items of it
+            message_content: list[AIMessageContent] = [TextAIMessageContent(text=task_content), *task_images]
+            task_jobs.append(
+                TaskJob(task_name, attempt, message_content, task_category.name, system_prompt, output_dir, model)
+            )
+
+    if len(image_pipeline.stats) > images_count:
+        print(image_pipeline.report())
+
+    task_jobs, rejected_jobs = preflight_jobs(task_jobs, system_prompt, model, context_overflow)
+    for job in rejected_jobs:
+        data = (
+            f"## Run {job.attempt}:\n"
+            f"### Error: Estimated {job.estimated_input_tokens} input tokens exceed "
+            f"the input limit of {get_input_token_limit(model)} tokens\n"
+        )
+        generate_report(output_dir, job.message_content, data, job.task_name, job.attempt, current_datetime)
+    return task_jobs
 
 
-def main(
+def get_duration_model(model: Model, lang: str) -> DurationModel:
+    """Duration model fitted on the previous summaries of the model for the language"""
+    results_path = Path(str(os.getenv("RESULTS_REPO_PATH"))).resolve()
+    return DurationModel.from_summaries([results_path / "Output" / f"{model}" / lang / "summary.csv"])
+
+
+def submit_task_jobs(
+    executor: ThreadPoolExecutor, task_jobs: list[TaskJob]
+) -> dict[concurrent.futures.Future, TaskJob]:
+    futures = {}
+    for job in task_jobs:
+        future = executor.submit(
+            get_model_answer_task,
+            job.message_content,
+            job.system_prompt,
+            job.model,
+            job.task_name,
+            job.attempt,
+        )
+        futures[future] = job
+    return futures
+
+
+def collect_reports(futures: dict[concurrent.futures.Future, TaskJob], current_datetime: datetime):
+    """Write the report of every job as soon as its answer is received"""
+    for future in concurrent.futures.as_completed(futures):
+        task_name, attempt, message_content, data = future.result()
+        generate_report(futures[future].output_dir, message_content, data, task_name, attempt, current_datetime)
+
+
+def schedule_summary(task_jobs: list[TaskJob], max_workers: int) -> str:
+    predicted_total = sum(job.predicted_duration for job in task_jobs)
+    return (
+        f"{len(task_jobs)} jobs longest first, predicted makespan "
+        f"{makespan([job.predicted_duration for job in task_jobs], max_workers):.0f}s "
+        f"of {predicted_total:.0f}s total work"
+    )
+
+
+def run_task_jobs(
+    task_jobs: list[TaskJob],
+    model: Model,
+    current_datetime: datetime,
+    duration_model: Optional[DurationModel] = None,
+    max_workers: int = 6,
+):
+    """Run the jobs longest first and write a report for each of them as it completes"""
+    if len(task_jobs) == 0:
+        return
+
+    for job in task_jobs:
+        job.model = job.model or model
+    task_jobs = longest_first(task_jobs, duration_model or DurationModel())
+    print(f"Scheduled {schedule_summary(task_jobs, max_workers)}")
+
+    # Execute all get_answer_from_model calls in parallel
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        collect_reports(submit_task_jobs(executor, task_jobs), current_datetime)
+
+
+def generate_answers_from_files(
+    task_category: Path,
+    datasets_category: Path,
+    output_dir: Path,
+    model: Model,
+    current_datetime: datetime,
+    attempts_count: int,
+    launch_list: list[str],
+    skip_list: list[str],
+    preprocess_images: bool = False,
+    context_overflow: str = "warn",
+    duration_model: Optional[DurationModel] = None,
+):
+    task_jobs = prepare_task_jobs(
+        task_category,
+        datasets_category,
+        output_dir,
+        model,
+        current_datetime,
+        attempts_count,
+        launch_list,
+        skip_list,
+        preprocess_images,
+        context_overflow,
+    )
+    run_task_jobs(task_jobs, model, current_datetime, duration_model)
+
+
+def prepare_model_jobs(
     model: Model,
     lang: str,
     attempts_count: int,
+    current_datetime: datetime,
     launch_list: Optional[list[str]] = None,
     skip_list: Optional[list[str]] = None,
     categories_launch_list: Optional[list[str]] = None,
     categories_skip_list: Optional[list[str]] = None,
-):
-    print(f"Starting answers generation for {model}")
-    current_datetime = datetime.now()
+    preprocess_images: bool = False,
+    context_overflow: str = "warn",
+) -> list[TaskJob]:
+    """Jobs of every task attempt in every category of the language for the model"""
     base_path = Path(__file__).resolve().parent.parent
     results_path = Path(str(os.getenv("RESULTS_REPO_PATH"))).resolve()
 
     tasks_category = base_path / "Scenarios" / "Tasks" / lang
     datasets_category = base_path / "Dataset" / lang
 
+    # Jobs of all categories are scheduled together, so long tasks of the last category start first too
+    task_jobs: list[TaskJob] = []
     for task_category in tasks_category.iterdir():
         if not task_category.is_dir():
             continue
@@ -194,7 +447,7 @@ def main(
 
         output_dir: Path = results_path / "Output" / f"{model}" / lang / task_category.name
 
-        generate_answers_from_files(
+        task_jobs += prepare_task_jobs(
             task_category,
             datasets_category,
             output_dir,
@@ -203,7 +456,330 @@ def main(
             attempts_count,
             launch_list,
             skip_list,
+            preprocess_images,
+            context_overflow,
+        )
+    return task_jobs
+
+
+def main(
+    model: Model,
+    lang: str,
+    attempts_count: int,
+    launch_list: Optional[list[str]] = None,
+    skip_list: Optional[list[str]] = None,
+    categories_launch_list: Optional[list[str]] = None,
+    categories_skip_list: Optional[list[str]] = None,
+    preprocess_images: bool = False,
+    upload_images: bool = False,
+    context_overflow: str = "warn",
+    hedge: bool = False,
+    adaptive_timeouts: bool = False,
+):
+    """
+    Generate answers of the model for every task of the language.
+
+    Args:
+        preprocess_images: Downscale and recompress task images to the provider budget before sending them
+        upload_images: Upload every unique image once to the provider file API and send file references
+        context_overflow: What to do with prompts estimated to exceed the model context window:
+            "warn" prints a warning and sends them, "reject" writes an error report without calling the model,
+            "trim" cuts the task text to fit, "ignore" sends them silently
+        hedge: Send a duplicate of requests slower than the model's p95 latency and keep the first answer
+        adaptive_timeouts: Derive request timeouts from the model's p99 latency instead of the configured ones
+    """
+    print(f"Starting answers generation for {model}")
+    if upload_images:
+        enable_image_uploads(model.provider)
+    if hedge:
+        enable_hedging()
+    if adaptive_timeouts:
+        enable_adaptive_timeouts()
+    current_datetime = datetime.now()
+
+    task_jobs = prepare_model_jobs(
+        model,
+        lang,
+        attempts_count,
+        current_datetime,
+        launch_list,
+        skip_list,
+        categories_launch_list,
+        categories_skip_list,
+        preprocess_images,
+        context_overflow,
+    )
+    run_task_jobs(task_jobs, model, current_datetime, get_duration_model(model, lang))
+    if get_hedging_policy():
+        print(get_hedging_policy().stats.report())
+
+
+def rerun_failures(
+    model: Model,
+    lang: str,
+    run: Optional[Union[datetime, str]] = None,
+    categories_launch_list: Optional[list[str]] = None,
+    categories_skip_list: Optional[list[str]] = None,
+    statuses: frozenset[str] = FAILED_STATUSES,
+    preprocess_images: bool = False,
+    context_overflow: str = "warn",
+) -> int:
+    """
+    Generate again the answers of a run whose reports failed, are empty or were cut off.
+    Only those task attempts are sent, their reports are overwritten in place in the original run folder,
+    so get_tokens_and_time and auto_eval pick them up with the rest of the run. Returns the number of jobs.
+
+    Args:
+        run: Datetime or folder name (result_...) of the run, the latest run of the model by default
+        statuses: Report statuses to generate again
+    """
+    base_path = Path(__file__).resolve().parent.parent
+    results_path = Path(str(os.getenv("RESULTS_REPO_PATH"))).resolve()
+    tasks_category = base_path / "Scenarios" / "Tasks" / lang
+    datasets_category = base_path / "Dataset" / lang
+    model_output = results_path / "Output" / f"{model}" / lang
+
+    if run is None:
+        runs = [get_run_datetime(path.name) for path in model_output.glob("*/result_*") if path.is_dir()]
+        if not runs:
+            print(f"No runs of {model} found in {model_output}")
+            return 0
+        run = max(runs)
+    current_datetime = run if isinstance(run, datetime) else get_run_datetime(run)
+
+    task_jobs: list[TaskJob] = []
+    for task_category in sorted(tasks_category.iterdir()):
+        if not task_category.is_dir():
+            continue
+        if categories_launch_list and task_category.name not in categories_launch_list:
+            continue
+        if categories_skip_list and task_category.name in categories_skip_list:
+            continue
+
+        output_dir = model_output / task_category.name
+        run_path = Path(get_output_folder_name(output_dir, current_datetime, ""))
+        if not run_path.is_dir():
+            continue
+
+        attempts_by_task: dict[str, list[int]] = {}
+        for task, attempt, status in find_failed_reports(run_path):
+            if status in statuses:
+                print(f"[{task}] Attempt #{attempt} is {status}, generating it again")
+                attempts_by_task.setdefault(task, []).append(attempt)
+
+        task_names = {name_without_extension(task_name): task_name for task_name in get_tasks_by_path(task_category)}
+        for task, attempts in attempts_by_task.items():
+            if task not in task_names:
+                print(f"[{task}] Task not found in {task_category}, skipping its failed attempts")
+                continue
+            task_jobs += prepare_task_jobs(
+                task_category,
+                datasets_category,
+                output_dir,
+                model,
+                current_datetime,
+                max(attempts),
+                [task_names[task]],
+                [],
+                preprocess_images,
+                context_overflow,
+                attempts=sorted(attempts),
+            )
+
+    print(f"Generating {len(task_jobs)} failed answers of {model} again")
+    run_task_jobs(task_jobs, model, current_datetime, get_duration_model(model, lang))
+    return len(task_jobs)
+
+
+# Concurrent requests per provider during a sweep, lower where default quotas are tighter.
+# Providers missing here get DEFAULT_PROVIDER_WORKERS
+provider_workers: dict[ModelProvider, int] = {
+    ModelProvider.VERTEXAI_ANTHROPIC: 4,
+    ModelProvider.AMAZON: 4,
+}
+DEFAULT_PROVIDER_WORKERS = 6
+
+
+def sweep(
+    models: list[Model],
+    lang: str,
+    attempts_count: int,
+    launch_list: Optional[list[str]] = None,
+    skip_list: Optional[list[str]] = None,
+    categories_launch_list: Optional[list[str]] = None,
+    categories_skip_list: Optional[list[str]] = None,
+    preprocess_images: bool = False,
+    upload_images: bool = False,
+    context_overflow: str = "warn",
+    workers: Optional[dict[ModelProvider, int]] = None,
+    hedge: bool = False,
+    adaptive_timeouts: bool = False,
+):
+    """
+    Generate answers of several models in one run.
+
+    Jobs of every model, category, task and attempt form one job list. Each provider gets its own
+    pool, so requests to different providers overlap instead of queueing behind each other, and
+    within a provider the jobs of all its models are dispatched longest first.
+
+    Args:
+        workers: Concurrent requests per provider, overrides provider_workers
+        Other arguments are the same as for main
+    """
+    current_datetime = datetime.now()
+    workers = {**provider_workers, **(workers or {})}
+    if hedge:
+        enable_hedging()
+    if adaptive_timeouts:
+        enable_adaptive_timeouts()
+
+    jobs_by_provider: dict[ModelProvider, list[TaskJob]] = {}
+    for model in models:
+        print(f"Preparing answers generation for {model}")
+        if upload_images:
+            enable_image_uploads(model.provider)
+        task_jobs = prepare_model_jobs(
+            model,
+            lang,
+            attempts_count,
+            current_datetime,
+            launch_list,
+            skip_list,
+            categories_launch_list,
+            categories_skip_list,
+            preprocess_images,
+            context_overflow,
+        )
+        jobs_by_provider.setdefault(model.provider, []).extend(
+            longest_first(task_jobs, get_duration_model(model, lang))
+        )
+
+    executors = {
+        provider: ThreadPoolExecutor(
+            max_workers=workers.get(provider, DEFAULT_PROVIDER_WORKERS), thread_name_prefix=provider.value
+        )
+        for provider in jobs_by_provider
+    }
+    try:
+        futures = {}
+        for provider, task_jobs in jobs_by_provider.items():
+            task_jobs.sort(key=lambda job: job.predicted_duration, reverse=True)
+            max_workers = workers.get(provider, DEFAULT_PROVIDER_WORKERS)
+            print(f"[{provider.value}] Scheduled {schedule_summary(task_jobs, max_workers)}")
+            futures.update(submit_task_jobs(executors[provider], task_jobs))
+        collect_reports(futures, current_datetime)
+    finally:
+        for executor in executors.values():
+            executor.shutdown(wait=True)
+    if get_hedging_policy():
+        print(get_hedging_policy().stats.report())
+
+
+def get_queue(queue_path: Optional[Path] = None) -> WorkQueue:
+    """Work queue shared by all workers, by default stored in the results repository"""
+    if queue_path is None:
+        queue_path = Path(str(os.getenv("RESULTS_REPO_PATH"))).resolve() / "queue.sqlite3"
+    return WorkQueue(queue_path)
+
+
+def enqueue(
+    models: list[Model],
+    lang: str,
+    attempts_count: int,
+    launch_list: Optional[list[str]] = None,
+    skip_list: Optional[list[str]] = None,
+    categories_launch_list: Optional[list[str]] = None,
+    categories_skip_list: Optional[list[str]] = None,
+    preprocess_images: bool = False,
+    context_overflow: str = "warn",
+    queue_path: Optional[Path] = None,
+) -> int:
+    """
+    Put the jobs of the models into the shared work queue instead of running them, see work().
+    Jobs are prioritized longest first. Returns the number of newly queued jobs.
+    """
+    queue = get_queue(queue_path)
+    current_datetime = datetime.now()
+    queued = 0
+    for model in models:
+        task_jobs = prepare_model_jobs(
+            model,
+            lang,
+            attempts_count,
+            current_datetime,
+            launch_list,
+            skip_list,
+            categories_launch_list,
+            categories_skip_list,
+            preprocess_images,
+            context_overflow,
+        )
+        for job in longest_first(task_jobs, get_duration_model(model, lang)):
+            payload = {
+                "model": model.model_id,
+                "lang": lang,
+                "experiment": job.experiment,
+                "task_name": job.task_name,
+                "attempt": job.attempt,
+                "datetime": current_datetime.isoformat(),
+                "preprocess_images": preprocess_images,
+                "context_overflow": context_overflow,
+            }
+            job_id = f"answer:{model}:{lang}:{job.experiment}:{job.task_name}:{job.attempt}:{payload['datetime']}"
+            queued += queue.put(job_id, "answer", payload, priority=job.predicted_duration)
+    print(f"Queued {queued} jobs to {queue.db_path}")
+    return queued
+
+
+def run_answer_job(payload: dict):
+    """Worker handler of an answer job, writes the report into the same layout as main"""
+    model = Model.from_id(payload["model"])
+    lang, experiment = payload["lang"], payload["experiment"]
+    current_datetime = datetime.fromisoformat(payload["datetime"])
+    base_path = Path(__file__).resolve().parent.parent
+    results_path = Path(str(os.getenv("RESULTS_REPO_PATH"))).resolve()
+
+    task_jobs = prepare_task_jobs(
+        base_path / "Scenarios" / "Tasks" / lang / experiment,
+        base_path / "Dataset" / lang,
+        results_path / "Output" / f"{model}" / lang / experiment,
+        model,
+        current_datetime,
+        payload["attempt"],
+        [payload["task_name"]],
+        [],
+        payload["preprocess_images"],
+        payload["context_overflow"],
+        attempts=[payload["attempt"]],
+    )
+    for job in task_jobs:
+        _, _, message_content, data = get_model_answer_task(
+            job.message_content, job.system_prompt, model, job.task_name, job.attempt
         )
+        generate_report(job.output_dir, message_content, data, job.task_name, job.attempt, current_datetime)
+
+
+def work(queue_path: Optional[Path] = None, judge: bool = False, workers: int = 6, stop_when_empty: bool = True):
+    """
+    Worker mode: claim jobs from the shared work queue and run them until it is drained.
+    Start it on any number of machines sharing RESULTS_REPO_PATH.
+
+    Args:
+        judge: Also run auto_eval judge jobs, see auto_eval.enqueue_evaluations
+        workers: Jobs run concurrently by this process
+    """
+    handlers = {"answer": run_answer_job}
+    if judge:
+        # auto_eval requires the evaluation environment, so it is imported only by judging workers
+        from Utils.auto_eval import run_judge_job
+
+        handlers["judge"] = run_judge_job
+
+    queue = get_queue(queue_path)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_worker, queue, handlers, None, 5, stop_when_empty) for _ in range(workers)]
+        completed = sum(future.result() for future in futures)
+    print(f"Worker finished, {completed} jobs completed, queue: {queue.counts()}")
 
 
 if __name__ == "__main__":
@@ -5,23 +5,12 @@ from typing import List
 
 from dotenv import load_dotenv
 
-from Utils.constants import repo_to_technology
+from Utils.constants import repo_to_technology, type_mapper
 from Utils.llm.config import Model
 
 load_dotenv()
 results_path = Path(os.getenv("RESULTS_REPO_PATH")).resolve()
 
-type_mapper = {
-    "code_analysis": "code_documentation",
-    "code_explanation": "code_documentation",
-    "solution_documentation": "code_documentation",
-    "component_generation": "code_generation",
-    "solution_template_generation": "code_generation",
-    "test_generation": "code_generation",
-    "solution_migration": "code_translation",
-    "multimodal": "multimodal",
-}
-
 
 def extract_and_write_data(file_path, model, experiment):
     try:
@@ -22,11 +22,49 @@ tool_set.add_tool(list_files_tool)
 # Add read_file tool
 read_file_tool = AITool(
     name="read_file",
-    description="Read the content of a file from the legacy application",
-    parameters=[AIToolParameter("file_path", "string", "Path to the file to read", required=True)],
+    description=(
+        "Read the content of a file from the legacy application. "
+        "Large files are returned in pages, the response header shows the total size and the offset to continue from"
+    ),
+    parameters=[
+        AIToolParameter("file_path", "string", "Path to the file to read", required=True),
+        AIToolParameter("offset", "integer", "Number of lines or bytes to skip from the start of the file"),
+        AIToolParameter("limit", "integer", "Maximum number of lines or bytes to return"),
+        AIToolParameter(
+            "unit", "string", "Unit of offset and limit, defaults to lines", enum_values=["lines", "bytes"]
+        ),
+    ],
 )
 tool_set.add_tool(read_file_tool)
 
+# Add read_files tool
+read_files_tool = AITool(
+    name="read_files",
+    description=(
+        "Read the content of several files from the legacy application in one call. "
+        "Files are returned in order until the byte budget is exhausted, the rest must be requested again"
+    ),
+    parameters=[
+        AIToolParameter("file_paths", "array", "Paths of the files to read", required=True, items_type="string"),
+        AIToolParameter("max_bytes", "integer", "Byte budget for the whole response, defaults to 262144"),
+    ],
+)
+tool_set.add_tool(read_files_tool)
+
+# Add search_files tool
+search_files_tool = AITool(
+    name="search_files",
+    description="Search the content of the legacy application files and return matching lines with their locations",
+    parameters=[
+        AIToolParameter("pattern", "string", "Text or regular expression to search for", required=True),
+        AIToolParameter("regex", "boolean", "Treat pattern as a regular expression, defaults to false"),
+        AIToolParameter("glob", "string", "Only search files matching this glob pattern, e.g. *.js or src/**/*.ts"),
+        AIToolParameter("case_sensitive", "boolean", "Match case, defaults to false"),
+        AIToolParameter("max_results", "integer", "Maximum number of matching lines to return, defaults to 50"),
+    ],
+)
+tool_set.add_tool(search_files_tool)
+
 # Add file_structure tool
 file_structure_tool = AITool(
     name="file_structure",
@@ -50,6 +88,25 @@ write_file_tool = AITool(
 )
 tool_set.add_tool(write_file_tool)
 
+# Add write_files tool
+write_files_tool = AITool(
+    name="write_files",
+    description="Write several converted files of the new application at once, either all of them are written or none",
+    parameters=[
+        AIToolParameter(
+            "files",
+            "array",
+            "Files to write",
+            required=True,
+            items_properties=[
+                AIToolParameter("file_path", "string", "Path where the file should be written", required=True),
+                AIToolParameter("content", "string", "The converted code content", required=True),
+            ],
+        )
+    ],
+)
+tool_set.add_tool(write_files_tool)
+
 # Add end_task tool
 end_task_tool = AITool(name="end_task", description="End the translation task when complete")
 tool_set.add_tool(end_task_tool)
@@ -61,9 +118,9 @@ your objective is to resolve the provided development tasks.
 Use the provided tools to interact with the legacy application files and create the new React application.
 Use the tools in the following order:
 1. Use list_files to get the complete file structure of the legacy application
-2. Use read_file to read and analyze each legacy file
+2. Use read_files (or read_file for a single or large file) to read and analyze the legacy files, use search_files to locate code across files
 3. Use file_structure to return the new React application structure  
-4. Use write_file for each file when requested
+4. Use write_files to write as many converted files as possible in one call, or write_file for a single file
 5. Use end_task when the translation is complete
 """
 
@@ -72,14 +129,14 @@ TASK = """
 
 Your task is to:
 1. First use the list_files tool to get the complete file structure of legacy application
-2. Request content of each file and analyze its implementation using the read_file tool
+2. Request content of the files and analyze their implementation using the read_files tool, batching as many files as possible in one call
 3. After getting and analyzing all files content - think thoroughly and use the file_structure tool to return the new file structure of translated application
 
 Do not provide any images, application will reuse previous.
 Do not provide any configs.
 
 After you return the file structure of the updated application, 
-You need to provide the converted code for each file in the new application structure using write_file tool to give me converted file.
+You need to provide the converted code for each file in the new application structure using write_files tool (or write_file for a single file) to give me converted files.
 {instructions}
 
 Do not add any comments in generated code and follow the instructions precisely. Once you finish the whole task, please use the end_task tool.
@@ -90,6 +147,7 @@ def run_experiment(task, model, dataset_path, output_path, start_time):
     messages: List[AIMessage] = []
     input_tokens = output_tokens = reasoning_tokens = 0
     requests_list = [AIMessage.create_user_message(task)]
+    tool_handlers = ToolHandlerFactory(dataset_path, output_path)
 
     task_in_progress = True
     while task_in_progress:
@@ -127,9 +185,9 @@ def run_experiment(task, model, dataset_path, output_path, start_time):
                 tool_id = tool_call["id"]
                 tool_signature = tool_call.get("signature")
 
-                # Add tool call to the message
+                # Add tool call to the message, messages are immutable so the assistant message is replaced
                 tool_call_content = AIMessageContentFactory.create_tool_call(tool_name, tool_args, tool_id, tool_signature)
-                messages[-1].content.append(tool_call_content)
+                messages[-1] = messages[-1].with_content(tool_call_content)
 
                 # Handle end_task specially
                 if tool_name == "end_task":
@@ -139,12 +197,12 @@ def run_experiment(task, model, dataset_path, output_path, start_time):
 
                 # Use the tool handler factory to get appropriate handler
                 try:
-                    handler = ToolHandlerFactory.create_handler(tool_name, dataset_path, output_path)
+                    handler = tool_handlers.get_handler(tool_name)
                     response_messages = handler.handle(tool_name, tool_args, tool_id)
                     tools_content.append(response_messages)
                 except ValueError as e:
                     # Handle unknown tools
-                    error_message = f"Unknown tool: {tool_name}. Please use only supported tools: read_file, write_file, file_structure, list_files, end_task"
+                    error_message = f"Unknown tool: {tool_name}. Please use only supported tools: read_file, read_files, search_files, write_file, write_files, file_structure, list_files, end_task"
                     error_response = AIMessageContentFactory.create_text(error_message)
                     tools_content.append(error_response)
         else:
@@ -159,7 +217,7 @@ def run_experiment(task, model, dataset_path, output_path, start_time):
 
     end_time = int(time.time())
     output = {
-        "messages": [message.__dict__ for message in messages],
+        "messages": [message.to_dict() for message in messages],
         "time": end_time - start_time,
         "total_tokens": {
             "input_tokens": input_tokens,
@@ -167,7 +225,7 @@ def run_experiment(task, model, dataset_path, output_path, start_time):
             "reasoning_tokens": reasoning_tokens,
         },
     }
-    messages_log = json.dumps(output, indent=4, default=str)
+    messages_log = json.dumps(output, indent=4)
     messages_log_path = Path(output_path, "message_log.json")
     with open(messages_log_path, "w") as file:
         file.write(messages_log)
@@ -0,0 +1,68 @@
+import json
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, TypeVar
+
+SIDECAR_SUFFIX = "_judges.json"
+
+# Judges of the adaptive mode, cheapest and fastest first. The first two always run, the rest break ties
+DEFAULT_JUDGE_ORDER = ["Gemini-2.5-Pro", "GPT-5", "Sonnet-4"]
+FIRST_JUDGES = 2
+# Relative difference of two scores above which they disagree, so no scale of the scores is assumed
+DISAGREEMENT_THRESHOLD = 0.15
+
+T = TypeVar("T")
+
+
+def order_judges(judges: Sequence[T], order: Optional[List[str]] = None) -> List[T]:
+    """Judges in the given order of names, judges missing from it go last in their original order"""
+    order = order or DEFAULT_JUDGE_ORDER
+    rank = {name: index for index, name in enumerate(order)}
+    return sorted(judges, key=lambda judge: rank.get(getattr(judge, "name", judge), len(order)))
+
+
+def relative_difference(first: float, second: float) -> float:
+    largest = max(abs(first), abs(second))
+    return abs(first - second) / largest if largest else 0.0
+
+
+def find_disagreement(scores: Dict[str, List[Optional[float]]], threshold: float = DISAGREEMENT_THRESHOLD) -> List[str]:
+    """
+    Reasons to ask the next judge: metrics whose scores differ by more than the threshold
+    or lack the score of a judge, whose report failed.
+    """
+    reasons = []
+    for metric, metric_scores in scores.items():
+        if any(score is None for score in metric_scores):
+            reasons.append(f"{metric} is missing a score")
+            continue
+        difference = max(
+            (relative_difference(first, second) for first, second in combinations(metric_scores, 2)), default=0.0
+        )
+        if difference > threshold:
+            reasons.append(f"{metric} scores differ by {difference:.0%}")
+    return reasons
+
+
+def get_sidecar_path(category_path: Path, category_name: str) -> Path:
+    return Path(category_path) / f"{category_name}{SIDECAR_SUFFIX}"
+
+
+def write_judges(category_path: Path, category_name: str, judges: List[str], reasons: List[str]):
+    """Save the judges that ran for the scenario, grade averages over them only"""
+    with open(get_sidecar_path(category_path, category_name), "w", encoding="utf-8") as sidecar:
+        json.dump({"judges": judges, "reasons": reasons}, sidecar, indent=4)
+
+
+def read_judges(category_path: Path, category_name: str) -> Optional[List[str]]:
+    """Judges that ran for the scenario in the adaptive mode, None when all judges ran"""
+    sidecar_path = get_sidecar_path(category_path, category_name)
+    if not sidecar_path.exists():
+        return None
+    with open(sidecar_path, "r", encoding="utf-8") as sidecar:
+        return json.load(sidecar)["judges"]
+
+
+def remove_judges(category_path: Path, category_name: str):
+    """Forget the judges of an adaptive run, when all judges run for the scenario"""
+    get_sidecar_path(category_path, category_name).unlink(missing_ok=True)
@@ -1,13 +1,59 @@
 import base64
 import json
-from typing import Literal, List, Union, Sequence
+from typing import Any, Dict, Literal, List, Optional, Tuple, Union, Sequence
 from abc import ABC, abstractmethod
 
 MediaType = Literal["image/jpeg", "image/png", "image/gif"]
 
 
 class AIMessageContent(ABC):
-    """Abstract base class for all AI message content types"""
+    """
+    Abstract base class for all AI message content types.
+
+    Contents are slotted and immutable, so long agent sessions keep no per-object dicts, and they
+    compare and hash by value, so equal messages can be cached and deduplicated.
+    """
+
+    __slots__ = ("_hash",)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def _init(self, **fields: Any):
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+
+    @abstractmethod
+    def _key(self) -> tuple:
+        """Values which identify the content"""
+
+    def __eq__(self, other: object) -> bool:
+        return type(other) is type(self) and self._key() == other._key()  # type: ignore[attr-defined]
+
+    def __hash__(self) -> int:
+        content_hash = getattr(self, "_hash", None)
+        if content_hash is None:
+            content_hash = hash((type(self).__name__, self._key()))
+            object.__setattr__(self, "_hash", content_hash)
+        return content_hash
+
+    def __reduce__(self):
+        # The default reduction restores slots with setattr, which immutable contents refuse
+        return type(self).from_dict, (self.to_dict(),)
+
+    @abstractmethod
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON serializable representation, binary data is base64 encoded"""
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "AIMessageContent":
+        content_type = content_types.get(data.get("type", ""))
+        if content_type is None:
+            raise ValueError(f"Unknown message content type: {data.get('type')}")
+        return content_type.from_dict(data)
 
     @abstractmethod
     def __str__(self) -> str:
@@ -39,19 +85,32 @@ class AIMessageContentFactory:
 
 
 class TextAIMessageContent(AIMessageContent):
+    __slots__ = ("text",)
     text: str
 
     def __init__(self, text: str):
-        super().__init__()
-        self.text = text
+        self._init(text=text)
+
+    def _key(self) -> tuple:
+        return (self.text,)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": "text", "text": self.text}
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "TextAIMessageContent":
+        return TextAIMessageContent(data["text"])
 
     def __str__(self):
         return self.text
 
 
 class ImageAIMessageContent(AIMessageContent):
+    __slots__ = ("file_name", "binary_content", "_base64", "_base64_url")
     file_name: str
     binary_content: bytes
+    _base64: Union[str, None]
+    _base64_url: Union[str, None]
     SUPPORTED_FORMATS: dict[str, MediaType] = {
         "jpg": "image/jpeg",
         "jpeg": "image/jpeg",
@@ -64,9 +123,7 @@ class ImageAIMessageContent(AIMessageContent):
         file_name: str,
         binary_content: bytes,
     ):
-        super().__init__()
-        self.file_name = file_name
-        self.binary_content = binary_content
+        self._init(file_name=file_name, binary_content=binary_content, _base64=None, _base64_url=None)
 
     def media_type(self) -> MediaType:
         file_extension = self.file_name.split(".")[-1].lower()
@@ -76,27 +133,57 @@ class ImageAIMessageContent(AIMessageContent):
         return self.SUPPORTED_FORMATS[file_extension]
 
     def to_base64(self) -> str:
-        return base64.b64encode(self.binary_content).decode("utf-8")
+        # Images are shared between attempts and converters, so encode the binary only once
+        if self._base64 is None:
+            self._init(_base64=base64.b64encode(self.binary_content).decode("utf-8"))
+        return self._base64  # type: ignore[return-value]
 
     def to_base64_url(self) -> str:
-        return f"data:{self.media_type()};base64,{self.to_base64()}"
+        if self._base64_url is None:
+            self._init(_base64_url=f"data:{self.media_type()};base64,{self.to_base64()}")
+        return self._base64_url  # type: ignore[return-value]
+
+    def _key(self) -> tuple:
+        return self.file_name, self.binary_content
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": "image", "file_name": self.file_name, "data": self.to_base64()}
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "ImageAIMessageContent":
+        image = ImageAIMessageContent(data["file_name"], base64.b64decode(data["data"]))
+        image._init(_base64=data["data"])
+        return image
 
     def __str__(self):
         return f"[image: {self.file_name}]"
 
 
 class ToolCallAIMessageContent(AIMessageContent):
+    """The arguments dict is shared with the model answer, it must not be changed after the call is created"""
+
+    __slots__ = ("name", "arguments", "id", "signature")
     name: str
     arguments: dict
     id: str
     signature: Union[bytes, None]
 
     def __init__(self, name: str, arguments: dict, id: str, signature: Union[bytes, None] = None):
-        super().__init__()
-        self.name = name
-        self.arguments = arguments
-        self.id = id
-        self.signature = signature
+        self._init(name=name, arguments=arguments, id=id, signature=signature)
+
+    def _key(self) -> tuple:
+        return self.name, json.dumps(self.arguments, sort_keys=True, default=str), self.id, self.signature
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {"type": "tool_call", "name": self.name, "arguments": self.arguments, "id": self.id}
+        if self.signature:
+            result["signature"] = base64.b64encode(self.signature).decode("utf-8")
+        return result
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "ToolCallAIMessageContent":
+        signature = base64.b64decode(data["signature"]) if data.get("signature") else None
+        return ToolCallAIMessageContent(data["name"], data["arguments"], data["id"], signature)
 
     def __str__(self):
         result = {"name": self.name, "arguments": self.arguments, "id": self.id}
@@ -107,33 +194,72 @@ class ToolCallAIMessageContent(AIMessageContent):
 
 
 class ToolResponseAIMessageContent(AIMessageContent):
+    __slots__ = ("name", "result", "id")
     name: str
     result: str
     id: str
 
     def __init__(self, name: str, result: str, id: str):
-        super().__init__()
-        self.name = name
-        self.result = result
-        self.id = id
+        self._init(name=name, result=result, id=id)
+
+    def _key(self) -> tuple:
+        return self.name, self.result, self.id
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": "tool_response", "name": self.name, "result": self.result, "id": self.id}
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> "ToolResponseAIMessageContent":
+        return ToolResponseAIMessageContent(data["name"], data["result"], data["id"])
 
     def __str__(self):
         return json.dumps({"name": self.name, "result": self.result, "id": self.id})
 
 
+content_types = {
+    "text": TextAIMessageContent,
+    "image": ImageAIMessageContent,
+    "tool_call": ToolCallAIMessageContent,
+    "tool_response": ToolResponseAIMessageContent,
+}
+
+
 class AIMessage:
-    """AI Message with proper type safety and factory pattern support"""
+    """AI Message with proper type safety and factory pattern support, immutable like its contents"""
+
+    __slots__ = ("role", "content", "_hash")
+    role: str
+    content: Tuple[AIMessageContent, ...]
 
-    def __init__(self, role: str, content: List[AIMessageContent]):
-        self.role = role
-        self.content = content
+    def __init__(self, role: str, content: Sequence[AIMessageContent]):
+        object.__setattr__(self, "role", role)
+        object.__setattr__(self, "content", tuple(content))
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError("AIMessage is immutable")
+
+    def __delattr__(self, name: str):
+        raise AttributeError("AIMessage is immutable")
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, AIMessage) and (self.role, self.content) == (other.role, other.content)
+
+    def __hash__(self) -> int:
+        message_hash = getattr(self, "_hash", None)
+        if message_hash is None:
+            message_hash = hash((self.role, self.content))
+            object.__setattr__(self, "_hash", message_hash)
+        return message_hash
+
+    def __reduce__(self):
+        return AIMessage, (self.role, self.content)
 
     @classmethod
     def create_user_message(cls, content: Union[str, Sequence[AIMessageContent]]) -> "AIMessage":
         """Factory method to create user messages"""
         if isinstance(content, str):
             return cls("user", [AIMessageContentFactory.create_text(content)])
-        return cls("user", list(content))
+        return cls("user", content)
 
     @classmethod
     def create_assistant_message(
@@ -143,7 +269,121 @@ class AIMessage:
         role = "model" if use_model_role else "assistant"
         if isinstance(content, str):
             return cls(role, [AIMessageContentFactory.create_text(content)])
-        return cls(role, list(content))
+        return cls(role, content)
+
+    def with_content(self, *content: AIMessageContent) -> "AIMessage":
+        """A copy of the message with content appended"""
+        return AIMessage(self.role, self.content + content)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"role": self.role, "content": [item.to_dict() for item in self.content]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AIMessage":
+        return cls(data["role"], [AIMessageContent.from_dict(item) for item in data["content"]])
 
     def __str__(self):
         return json.dumps({"role": self.role, "content": [c.__str__() for c in self.content]}, indent=4)
+
+
+def dump_messages(messages: Sequence[AIMessage]) -> str:
+    """Compact lossless JSON of the messages, images and signatures included"""
+    return json.dumps([message.to_dict() for message in messages], separators=(",", ":"), ensure_ascii=False)
+
+
+def load_messages(data: Union[str, List[Dict[str, Any]]]) -> List[AIMessage]:
+    """Messages from dump_messages JSON or the already parsed list"""
+    if isinstance(data, str):
+        data = json.loads(data)
+    return [AIMessage.from_dict(item) for item in data]
+
+
+class ModelResponse(dict):
+    """
+    Answer of ask_model: either the answer with its tokens and timing or an error.
+
+    It stays a dict, so callers indexing it by key, checking "error" in response and dumping it to
+    JSON keep working, while the properties give typed access.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def answer(
+        cls,
+        content: Any,
+        tokens: Dict[str, int],
+        execute_time: float,
+        thoughts: Optional[str] = None,
+        tool_calls: Optional[List[Dict[str, Any]]] = None,
+        retries: Optional[list] = None,
+        served_by: Optional[str] = None,
+    ) -> "ModelResponse":
+        return cls(
+            thoughts=thoughts,
+            content=content,
+            tokens=tokens,
+            tool_calls=tool_calls or [],
+            execute_time=execute_time,
+            retries=retries or [],
+            served_by=served_by,
+        )
+
+    @classmethod
+    def failure(cls, error: str, retries: Optional[list] = None) -> "ModelResponse":
+        return cls(error=error, retries=retries or [])
+
+    @property
+    def ok(self) -> bool:
+        return "error" not in self
+
+    @property
+    def error(self) -> Optional[str]:
+        return self.get("error")
+
+    @property
+    def content(self) -> Any:
+        return self.get("content")
+
+    @property
+    def thoughts(self) -> Optional[str]:
+        return self.get("thoughts")
+
+    @property
+    def tokens(self) -> Dict[str, int]:
+        return self.get("tokens", {})
+
+    @property
+    def tool_calls(self) -> List[Dict[str, Any]]:
+        return self.get("tool_calls", [])
+
+    @property
+    def execute_time(self) -> Optional[float]:
+        return self.get("execute_time")
+
+    @property
+    def retries(self) -> list:
+        return self.get("retries", [])
+
+    @property
+    def served_by(self) -> Optional[str]:
+        """Id of the model which answered, another deployment than the requested one after a failover"""
+        return self.get("served_by")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON serializable copy: retries become dicts and tool call signatures base64"""
+
+        def serializable(value: Any) -> Any:
+            if isinstance(value, bytes):
+                return base64.b64encode(value).decode("utf-8")
+            if isinstance(value, dict):
+                return {key: serializable(item) for key, item in value.items()}
+            if isinstance(value, (list, tuple)):
+                return [serializable(item) for item in value]
+            if isinstance(value, AIMessageContent):
+                return value.to_dict()
+            if hasattr(value, "__dict__"):
+                return serializable(vars(value))
+            return value
+
+        return serializable(dict(self))
@@ -1,10 +1,12 @@
-from typing import Dict, List, Any, Optional, cast
+from typing import TYPE_CHECKING, Dict, List, Any, Optional, Tuple, cast
 from enum import Enum
 
-from anthropic.types import ToolParam as AnthropicToolParam
-from openai.types.responses import FunctionToolParam as OpenAIResponsesToolParam
-from openai.types.chat import ChatCompletionFunctionToolParam as OpenAIToolParam
-from google.genai import types
+# Provider SDKs are imported by the conversions that need them, so importing tools stays fast
+if TYPE_CHECKING:
+    from anthropic.types import ToolParam as AnthropicToolParam
+    from openai.types.responses import FunctionToolParam as OpenAIResponsesToolParam
+    from openai.types.chat import ChatCompletionFunctionToolParam as OpenAIToolParam
+    from google.genai import types
 
 
 class ToolProvider(Enum):
@@ -24,6 +26,7 @@ class AIToolParameter:
         required: bool = False,
         enum_values: Optional[List[str]] = None,
         items_type: Optional[str] = None,
+        items_properties: Optional[List["AIToolParameter"]] = None,
     ):
         self.name = name
         self.param_type = param_type
@@ -31,35 +34,61 @@ class AIToolParameter:
         self.required = required
         self.enum_values = enum_values
         self.items_type = items_type
+        self.items_properties = items_properties
 
-    def to_schema_property(self) -> Dict[str, Any]:
+    def to_schema_property(self, strict: bool = False) -> Dict[str, Any]:
         """Convert to JSON schema property format"""
         prop: Dict[str, Any] = {"type": self.param_type, "description": self.description}
 
+        # Strict mode requires every property to be listed as required, so optional ones accept null instead
+        nullable = strict and not self.required
+        if nullable:
+            prop["type"] = [self.param_type, "null"]
+
         if self.enum_values:
-            prop["enum"] = self.enum_values
+            prop["enum"] = self.enum_values + [None] if nullable else self.enum_values
 
-        if self.param_type == "array" and self.items_type:
+        if self.param_type == "array" and self.items_properties:
+            prop["items"] = object_schema(self.items_properties, strict)
+        elif self.param_type == "array" and self.items_type:
             prop["items"] = {"type": self.items_type}
 
         return prop
 
 
+def object_schema(parameters: List[AIToolParameter], strict: bool = False) -> Dict[str, Any]:
+    """Build JSON schema of an object with the given properties"""
+    schema: Dict[str, Any] = {
+        "type": "object",
+        "properties": {param.name: param.to_schema_property(strict) for param in parameters},
+        "required": [param.name for param in parameters if param.required or strict],
+    }
+    if strict:
+        schema["additionalProperties"] = False
+    return schema
+
+
 class AITool:
     def __init__(self, name: str, description: str, parameters: Optional[List[AIToolParameter]] = None):
         self.name = name
         self.description = description
         self.parameters = parameters or []
-
-    def to_anthropic_format(self) -> AnthropicToolParam:
+        self._schema_properties: Dict[bool, Tuple[Dict[str, Any], List[str]]] = {}
+
+    def schema_properties(self, strict: bool = False) -> Tuple[Dict[str, Any], List[str]]:
+        """JSON schema properties and required names of the parameters, built once for each strictness"""
+        if strict not in self._schema_properties:
+            self._schema_properties[strict] = (
+                {param.name: param.to_schema_property(strict) for param in self.parameters},
+                [param.name for param in self.parameters if param.required or strict],
+            )
+        return self._schema_properties[strict]
+
+    def to_anthropic_format(self) -> "AnthropicToolParam":
         """Convert to Anthropic/Claude tool format"""
-        properties = {}
-        required = []
+        from anthropic.types import ToolParam as AnthropicToolParam
 
-        for param in self.parameters:
-            properties[param.name] = param.to_schema_property()
-            if param.required:
-                required.append(param.name)
+        properties, required = self.schema_properties()
 
         return AnthropicToolParam(
             name=self.name,
@@ -67,15 +96,11 @@ class AITool:
             input_schema={"type": "object", "properties": properties, "required": required},
         )
 
-    def to_openai_responses_format(self) -> OpenAIResponsesToolParam:
+    def to_openai_responses_format(self) -> "OpenAIResponsesToolParam":
         """Convert to OpenAI tool format"""
-        properties = {}
-        required = []
+        from openai.types.responses import FunctionToolParam as OpenAIResponsesToolParam
 
-        for param in self.parameters:
-            properties[param.name] = param.to_schema_property()
-            if param.required:
-                required.append(param.name)
+        properties, required = self.schema_properties(strict=True)
 
         return OpenAIResponsesToolParam(
             name=self.name,
@@ -90,15 +115,11 @@ class AITool:
             },
         )
 
-    def to_openai_completions_format(self) -> OpenAIToolParam:
+    def to_openai_completions_format(self) -> "OpenAIToolParam":
         """Convert to OpenAI Chat Completions tool format"""
-        properties = {}
-        required = []
+        from openai.types.chat import ChatCompletionFunctionToolParam as OpenAIToolParam
 
-        for param in self.parameters:
-            properties[param.name] = param.to_schema_property()
-            if param.required:
-                required.append(param.name)
+        properties, required = self.schema_properties()
 
         return OpenAIToolParam(
             type="function",
@@ -114,15 +135,11 @@ class AITool:
             },
         )
 
-    def to_gemini_format(self) -> types.FunctionDeclaration:
+    def to_gemini_format(self) -> "types.FunctionDeclaration":
         """Convert to Gemini tool format"""
-        properties = {}
-        required = []
+        from google.genai import types
 
-        for param in self.parameters:
-            properties[param.name] = param.to_schema_property()
-            if param.required:
-                required.append(param.name)
+        properties, required = self.schema_properties()
 
         return types.FunctionDeclaration(
             name=self.name,
@@ -132,13 +149,7 @@ class AITool:
 
     def to_amazon_nova_format(self) -> Dict[str, Any]:
         """Convert to Amazon Nova tool format"""
-        properties = {}
-        required = []
-
-        for param in self.parameters:
-            properties[param.name] = param.to_schema_property()
-            if param.required:
-                required.append(param.name)
+        properties, required = self.schema_properties()
 
         return {
             "toolSpec": {
@@ -160,14 +171,22 @@ class AIToolSet:
 
     def __init__(self, tools: Optional[List[AITool]] = None):
         self.tools = tools or []
+        # The same tool set is sent with every turn of an agent session, so each format is converted once
+        self._formats: Dict[ToolProvider, list] = {}
 
     def add_tool(self, tool: AITool) -> "AIToolSet":
         """Add a tool to the set"""
         self.tools.append(tool)
+        self._formats.clear()
         return self
 
     def to_format(self, provider: ToolProvider):
-        """Convert all tools to specified provider format"""
+        """Convert all tools to specified provider format, the result is shared and must not be changed"""
+        if provider not in self._formats:
+            self._formats[provider] = self._convert(provider)
+        return self._formats[provider]
+
+    def _convert(self, provider: ToolProvider) -> list:
         if provider == ToolProvider.ANTHROPIC:
             return [tool.to_anthropic_format() for tool in self.tools]
         elif provider == ToolProvider.OPENAI_RESPONSES:
@@ -175,27 +194,29 @@ class AIToolSet:
         elif provider == ToolProvider.OPENAI_COMPLETIONS:
             return [tool.to_openai_completions_format() for tool in self.tools]
         elif provider == ToolProvider.GEMINI:
+            from google.genai import types
+
             return [types.Tool(function_declarations=[tool.to_gemini_format() for tool in self.tools])]
         elif provider == ToolProvider.AMAZON_NOVA:
             return [tool.to_amazon_nova_format() for tool in self.tools]
         else:
             raise ValueError(f"Unsupported provider: {provider}")
 
-    def to_anthropic_format(self) -> List[AnthropicToolParam]:
+    def to_anthropic_format(self) -> "List[AnthropicToolParam]":
         """Convert all tools to Anthropic format"""
-        return cast(List[AnthropicToolParam], self.to_format(ToolProvider.ANTHROPIC))
+        return cast("List[AnthropicToolParam]", self.to_format(ToolProvider.ANTHROPIC))
 
-    def to_openai_responses_format(self) -> List[OpenAIResponsesToolParam]:
+    def to_openai_responses_format(self) -> "List[OpenAIResponsesToolParam]":
         """Convert all tools to OpenAI Responses format"""
-        return cast(List[OpenAIResponsesToolParam], self.to_format(ToolProvider.OPENAI_RESPONSES))
+        return cast("List[OpenAIResponsesToolParam]", self.to_format(ToolProvider.OPENAI_RESPONSES))
 
-    def to_openai_completions_format(self) -> List[OpenAIToolParam]:
+    def to_openai_completions_format(self) -> "List[OpenAIToolParam]":
         """Convert all tools to OpenAI Chat Completions format"""
-        return cast(List[OpenAIToolParam], self.to_format(ToolProvider.OPENAI_COMPLETIONS))
+        return cast("List[OpenAIToolParam]", self.to_format(ToolProvider.OPENAI_COMPLETIONS))
 
-    def to_gemini_format(self) -> List[types.Tool]:
+    def to_gemini_format(self) -> "List[types.Tool]":
         """Convert all tools to Gemini format"""
-        return cast(List[types.Tool], self.to_format(ToolProvider.GEMINI))
+        return cast("List[types.Tool]", self.to_format(ToolProvider.GEMINI))
 
     def to_amazon_nova_format(self) -> List[Dict[str, Any]]:
         """Convert all tools to Amazon Nova format"""
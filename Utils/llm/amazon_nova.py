@@ -1,11 +1,13 @@
 # Before use - authorize via amazon aws cli https://docs.aws.amazon.com/cli/latest/userguide/cli-configure-sso.html#cli-configure-sso-configure
 # docs on API https://docs.aws.amazon.com/nova/latest/userguide/using-converse-api.html
 import boto3
+from botocore.config import Config
 from typing import List, Dict, Any, Optional
 from Utils.llm.config import Model, default_temperature
 from Utils.llm.ai_message import AIMessage
 from Utils.llm.ai_tool import AIToolSet
 from Utils.llm.message_converter import get_converter, ConverterProvider
+from Utils.llm.latency import get_request_timeouts
 
 
 def request_data(
@@ -23,7 +25,12 @@ def request_data(
     Returns:
         Dictionary containing response content, thoughts, tool calls, and token usage
     """
-    client = boto3.client("bedrock-runtime", region_name="us-east-1")
+    timeouts = get_request_timeouts(model)
+    client = boto3.client(
+        "bedrock-runtime",
+        region_name="us-east-1",
+        config=Config(connect_timeout=timeouts.connect, read_timeout=timeouts.total),
+    )
     config = model()
 
     # Use converter for message formatting
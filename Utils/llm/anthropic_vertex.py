@@ -1,3 +1,4 @@
+import time
 from typing import List, Dict, Any, Optional
 from anthropic import AnthropicVertex
 
@@ -5,6 +6,9 @@ from Utils.llm.ai_tool import AIToolSet
 from Utils.llm.config import Model
 from Utils.llm.ai_message import AIMessage
 from Utils.llm.message_converter import get_converter, ConverterProvider
+from Utils.llm.image_store import get_image_store
+from Utils.llm.latency import get_request_timeouts
+from Utils.llm.errors import map_exception
 
 
 def request_data(
@@ -27,15 +31,18 @@ def request_data(
     """
     try:
         config = model()
-        client = AnthropicVertex(region=config["region"], project_id=config["project_id"])
+        timeouts = get_request_timeouts(model)
+        client = AnthropicVertex(
+            region=config["region"], project_id=config["project_id"], timeout=timeouts.http_timeout(streaming=True)
+        )
     except Exception as e:
-        raise Exception(f"Failed to initialize Anthropic Vertex client: {e}")
+        raise map_exception(e, "Failed to initialize Anthropic Vertex client") from e
 
     text_content: Optional[str] = None
     thinking_content: Optional[str] = None
     tool_calls: List[Any] = []
 
-    converter = get_converter(ConverterProvider.ANTHROPIC)
+    converter = get_converter(ConverterProvider.ANTHROPIC, get_image_store(model.provider))
     api_messages = converter.convert(messages)
 
     with client.messages.stream(
@@ -47,6 +54,11 @@ def request_data(
         model=config["model_id"],
         tools=tools.to_anthropic_format() if tools else [],
     ) as stream:
+        # The read timeout bounds the wait for each chunk, the total timeout is checked between chunks
+        deadline = time.time() + timeouts.total
+        for _ in stream:
+            if time.time() > deadline:
+                raise TimeoutError(f"Response is not complete after {timeouts.total} seconds")
         message = stream.get_final_message()
 
         # Extract content from message
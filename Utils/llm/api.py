@@ -1,23 +1,47 @@
 import time
-import requests
 from datetime import datetime
 from typing import Any, List, Dict
 
 from Utils.llm.ai_tool import AIToolSet
 from Utils.llm.config import Model, ModelProvider
-from Utils.llm.anthropic_vertex import request_data as request_anthropic_vertex_data
-from Utils.llm.amazon_nova import request_data as request_amazon_nova_data
-from Utils.llm.gemini_ai_studio import request_data as request_gemini_aistudio_data
-from Utils.llm.responses_api import request_data as request_openai_responses_data
-from Utils.llm.openai_completions import request_data as request_openai_completions_data
-from Utils.llm.ai_message import AIMessage
+from Utils.llm.ai_message import AIMessage, ModelResponse
+from Utils.llm.latency import get_hedging_policy, get_latency_history
+from Utils.llm.errors import APIException, RateLimitError, RequestTimeoutError, map_exception
+from Utils.llm.retry import RetryRecord, get_retry_policy
+from Utils.llm import circuit_breaker
 
+# APIException moved to Utils.llm.errors, it is re-exported here for existing imports
+__all__ = ["APIException", "ask_model", "request_model_data"]
 
-class APIException(Exception):
-    def __init__(self, status_code, content):
-        self.status_code = status_code
-        self.content = content
-        super().__init__(self.content)
+
+def request_model_data(
+    system_prompt: str, messages: List[AIMessage], model: Model, tools: AIToolSet | None = None
+) -> Dict[str, Any]:
+    # Adapters and their SDKs are imported on the first request to the provider,
+    # so entry points which do not call a provider, or call only one, start fast
+    match model.provider:
+        case ModelProvider.AISTUDIO:
+            from Utils.llm.gemini_ai_studio import request_data as request_gemini_aistudio_data
+
+            return request_gemini_aistudio_data(system_prompt, messages, model, tools)
+        case ModelProvider.VERTEXAI_ANTHROPIC:
+            from Utils.llm.anthropic_vertex import request_data as request_anthropic_vertex_data
+
+            return request_anthropic_vertex_data(system_prompt, messages, model, tools)
+        case ModelProvider.AMAZON:
+            from Utils.llm.amazon_nova import request_data as request_amazon_nova_data
+
+            return request_amazon_nova_data(system_prompt, messages, model, tools)
+        case ModelProvider.OPENAI | ModelProvider.AZURE | ModelProvider.XAI | ModelProvider.FIREWORKS:
+            from Utils.llm.openai_completions import request_data as request_openai_completions_data
+
+            return request_openai_completions_data(system_prompt, messages, model, tools)
+        case ModelProvider.OPENAI_RESPONSES:
+            from Utils.llm.responses_api import request_data as request_openai_responses_data
+
+            return request_openai_responses_data(system_prompt, messages, model, tools)
+        case _:
+            raise Exception(f"Unknown model provider: {model.provider}")
 
 
 def ask_model(
@@ -27,66 +51,74 @@ def ask_model(
     attempt: int = 1,
     tools: AIToolSet | None = None,
     verbose: bool = True,
-) -> Dict[str, Any]:
-    start_time = time.time()
-    if verbose:
-        print(f"\tAttempt {attempt} at {datetime.now()}")
-
-    try:
-        data = None
-
-        match model.provider:
-            case ModelProvider.AISTUDIO:
-                data = request_gemini_aistudio_data(system_prompt, messages, model, tools)
-            case ModelProvider.VERTEXAI_ANTHROPIC:
-                data = request_anthropic_vertex_data(system_prompt, messages, model, tools)
-            case ModelProvider.AMAZON:
-                data = request_amazon_nova_data(system_prompt, messages, model, tools)
-            case ModelProvider.OPENAI | ModelProvider.AZURE | ModelProvider.XAI | ModelProvider.FIREWORKS:
-                data = request_openai_completions_data(system_prompt, messages, model, tools)
-            case ModelProvider.OPENAI_RESPONSES:
-                data = request_openai_responses_data(system_prompt, messages, model, tools)
-            case _:
-                raise Exception(f"Unknown model provider: {model.provider}")
-
-        execute_time = time.time() - start_time
-        return {
-            "thoughts": data.get("thoughts", None),
-            "content": data["content"],
-            "tokens": data["tokens"],
-            "tool_calls": data.get("tool_calls", []),
-            "execute_time": execute_time,
-        }
-    except APIException as e:
+) -> ModelResponse:
+    """
+    Request an answer of the model, retrying failed requests with the provider retry policy.
+    attempt only labels the request in the log, retries are counted separately.
+    """
+    retry_policy = get_retry_policy(model.provider)
+    retries: List[Dict[str, Any]] = []
+    rate_limit_retries = 0
+
+    while True:
+        # While the endpoint circuit is open the request fails over to an equivalent deployment or waits
+        request_model, breaker = circuit_breaker.route(model)
+        if request_model is None:
+            if circuit_breaker.fail_fast:
+                return ModelResponse.failure(f"### Error: Circuit of {breaker.name} is open\n", retries)
+            time.sleep(breaker.retry_in())
+            continue
+
+        start_time = time.time()
         if verbose:
-            print(f"Error: {e.status_code}")
-            print(f"Error: {e.content}")
-        if e.status_code == 429:
-            if verbose:
-                print("Will try in 1 minute...")
-            time.sleep(60)
-            return ask_model(messages, system_prompt, model, attempt + 1, tools, verbose=verbose)
-        else:
-            if attempt > 2:
-                return {"error": f"### Error: {e.content}\n"}
+            print(f"\tAttempt {attempt} at {datetime.now()}")
+
+        try:
+            hedging_policy = get_hedging_policy()
+            if hedging_policy:
+                data = hedging_policy.call(
+                    request_model, lambda: request_model_data(system_prompt, messages, request_model, tools)
+                )
             else:
-                if verbose:
-                    print("\tTrying again...")
-                time.sleep(10)
-                return ask_model(messages, system_prompt, model, attempt + 1, tools, verbose=verbose)
-    except requests.exceptions.Timeout:
-        if attempt > 2:
-            return {"error": f"### Error: Timeout error\n"}
+                data = request_model_data(system_prompt, messages, request_model, tools)
+
+            execute_time = time.time() - start_time
+            breaker.record(True)
+            # Agent turns with tools are much shorter than task answers and would skew the model latency history
+            if tools is None:
+                get_latency_history().record(request_model, execute_time)
+            return ModelResponse.answer(
+                content=data["content"],
+                tokens=data["tokens"],
+                execute_time=execute_time,
+                thoughts=data.get("thoughts", None),
+                tool_calls=data.get("tool_calls", []),
+                retries=retries,
+                served_by=request_model.model_id,
+            )
+        except Exception as e:
+            error = map_exception(e)
+            breaker.record(circuit_breaker.request_outcome(error))
+
         if verbose:
-            print("\tRequest timed out. Trying again...")
-        return ask_model(messages, system_prompt, model, attempt + 1, tools, verbose=verbose)
-    except Exception as e:
+            print(f"\tError: {type(error).__name__} {error.status_code or ''}")
+            print(f"\tError: {error.content}")
+
+        is_rate_limit = isinstance(error, RateLimitError)
+        if not retry_policy.should_retry(error, len(retries) - rate_limit_retries, rate_limit_retries):
+            if isinstance(error, RequestTimeoutError):
+                return ModelResponse.failure("### Error: Timeout error\n", retries)
+            if error.status_code is None and type(error) is APIException:
+                return ModelResponse.failure("### Error: can not get the content\n", retries)
+            return ModelResponse.failure(f"### Error: {error.content}\n", retries)
+
+        retry_number = rate_limit_retries + 1 if is_rate_limit else len(retries) - rate_limit_retries + 1
+        delay = retry_policy.delay(error, retry_number)
+        retries.append(RetryRecord(type(error).__name__, error.status_code, delay).to_dict())
+        rate_limit_retries += is_rate_limit
         if verbose:
-            print(f"\tError: {str(e)}")
-        if attempt > 2:
-            return {"error": f"### Error: can not get the content\n"}
-        else:
-            if verbose:
-                print("\tTrying again...")
-            time.sleep(5)
-            return ask_model(messages, system_prompt, model, attempt + 1, tools, verbose=verbose)
+            print(f"\tTrying again in {delay:.0f} seconds...")
+        time.sleep(delay)
+        # Rate limited requests keep their attempt number, they were not answered
+        if not is_rate_limit:
+            attempt += 1
@@ -0,0 +1,157 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from Utils.llm.config import Model
+from Utils.llm.errors import APIConnectionError, APIException, RequestTimeoutError, ServerError
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Tracks the outcomes of the recent requests to one endpoint.
+
+    Once failure_rate of the last window requests failed, the circuit opens and no requests are sent
+    for cooldown seconds. Then a single probe request is let through: its success closes the circuit,
+    its failure opens it for another cooldown.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: float = 0.5,
+        window: int = 20,
+        min_requests: int = 5,
+        cooldown: float = 60,
+        probe_interval: float = 5,
+    ):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_requests = min_requests
+        self.cooldown = cooldown
+        self.probe_interval = probe_interval
+        self.state = CLOSED
+        self.opened = 0
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == OPEN and time.time() >= self._opened_at + self.cooldown:
+                self.state = HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return self.state == CLOSED
+
+    def retry_in(self) -> float:
+        """Seconds until a request may be allowed again"""
+        with self._lock:
+            if self.state == OPEN:
+                return max(self._opened_at + self.cooldown - time.time(), 0.0) + 0.1
+            return self.probe_interval if self.state == HALF_OPEN else 0.0
+
+    def record(self, success: Optional[bool]):
+        """Record a request outcome, None for errors which say nothing about the endpoint health"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                if success:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                    print(f"Circuit of {self.name} closed")
+                elif success is False:
+                    self._open()
+                return
+
+            if success is None:
+                return
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if (
+                self.state == CLOSED
+                and len(self._outcomes) >= self.min_requests
+                and failures / len(self._outcomes) >= self.failure_rate
+            ):
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened += 1
+        self._opened_at = time.time()
+        self._outcomes.clear()
+        print(f"Circuit of {self.name} opened for {self.cooldown} seconds")
+
+
+def request_outcome(error: APIException) -> Optional[bool]:
+    """Server errors, timeouts and connection failures count against the endpoint, request specific errors do not"""
+    if isinstance(error, (ServerError, RequestTimeoutError, APIConnectionError)):
+        return False
+    if error.status_code is not None and not error.retryable:
+        # The endpoint answered, the request itself was wrong
+        return True
+    return None
+
+
+def endpoint_key(model: Model) -> str:
+    """Models of one provider can be served by different endpoints, e.g. OpenAI compatible servers"""
+    config = model()
+    endpoint = (config.get("url") or config.get("region") or "") if isinstance(config, dict) else ""
+    return f"{model.provider.value}:{endpoint}" if endpoint else model.provider.value
+
+
+# Equivalent deployments to use while the circuit of a model is open, e.g. an Azure deployment of an OpenAI model
+failover_models: Dict[Model, List[Model]] = {}
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+_breaker_settings: Dict[str, float] = {}
+fail_fast = False
+
+
+def configure_circuit_breakers(fail_fast_when_open: bool = False, **settings):
+    """
+    fail_fast_when_open returns an error at once while a circuit is open, by default requests wait
+    for the circuit, pausing that provider's jobs only. settings are passed to new CircuitBreakers.
+    """
+    global fail_fast
+    fail_fast = fail_fast_when_open
+    with _breakers_lock:
+        _breaker_settings.clear()
+        _breaker_settings.update(settings)
+        _breakers.clear()
+
+
+def register_failover(model: Model, *alternatives: Model):
+    failover_models[model] = list(alternatives)
+
+
+def get_circuit_breaker(model: Model) -> CircuitBreaker:
+    key = endpoint_key(model)
+    with _breakers_lock:
+        if key not in _breakers:
+            _breakers[key] = CircuitBreaker(key, **_breaker_settings)
+        return _breakers[key]
+
+
+def route(model: Model) -> Tuple[Optional[Model], CircuitBreaker]:
+    """
+    Model to send the request to and its circuit breaker: the model itself while its circuit allows
+    requests, else the first failover model whose circuit does. None when no deployment is available.
+    """
+    breaker = get_circuit_breaker(model)
+    if breaker.allow():
+        return model, breaker
+    for alternative in failover_models.get(model, []):
+        alternative_breaker = get_circuit_breaker(alternative)
+        if alternative_breaker.allow():
+            print(f"Circuit of {breaker.name} is open, failing over {model} to {alternative}")
+            return alternative, alternative_breaker
+    return None, breaker
@@ -1,9 +1,12 @@
 import os
 from dotenv import load_dotenv
 from enum import Enum
+from typing import TYPE_CHECKING
 
-from google.genai.types import ThinkingLevel
-from openai.types import ReasoningEffort
+# Provider SDKs are imported when a model of the provider is used, see api.request_model_data
+if TYPE_CHECKING:
+    from google.genai.types import ThinkingLevel
+    from openai.types import ReasoningEffort
 
 load_dotenv()
 
@@ -57,7 +60,7 @@ def get_open_ai_config(
     return config
 
 
-def get_open_ai_responses_config(model, effort: ReasoningEffort = "high", verbosity=None, max_tokens=None, background=False):
+def get_open_ai_responses_config(model, effort: "ReasoningEffort" = "high", verbosity=None, max_tokens=None, background=False):
     config = {
         "api_key": openai_api_key,
         "max_tokens": max_tokens,
@@ -100,7 +103,11 @@ def get_cerebras_config(model, max_tokens, reasoning_effort):
 
 
 # thinking_level is supported only for Gemini 3 and above
-def get_gemini_ai_studio_config(model, max_tokens=None, thinking_level: ThinkingLevel = None):
+def get_gemini_ai_studio_config(model, max_tokens=None, thinking_level: "ThinkingLevel | str | None" = None):
+    if thinking_level is not None:
+        from google.genai.types import ThinkingLevel
+
+        thinking_level = ThinkingLevel(thinking_level)
     return {"model_id": model, "max_tokens": max_tokens, "thinking_level": thinking_level}
 
 
@@ -130,6 +137,32 @@ def get_amazon_nova_model_config(model):
     return {"model_id": MODEL_ID}
 
 
+class RequestTimeouts:
+    """
+    Request timeouts in seconds: connect to the endpoint, wait for the first byte
+    (of a streamed response, or of the whole response otherwise) and the whole request.
+    """
+
+    connect: float
+    first_byte: float
+    total: float
+
+    def __init__(self, connect: float = 10, first_byte: float = 300, total: float = 1800):
+        self.connect = connect
+        self.first_byte = first_byte
+        self.total = total
+
+    def http_timeout(self, streaming: bool = False):
+        """httpx timeout for the OpenAI and Anthropic SDK clients"""
+        import httpx
+
+        # A non streamed response arrives at once, so the read timeout has to cover the whole request
+        return httpx.Timeout(self.first_byte if streaming else self.total, connect=self.connect)
+
+    def __repr__(self):
+        return f"RequestTimeouts(connect={self.connect}, first_byte={self.first_byte}, total={self.total})"
+
+
 class ModelProvider(Enum):
     AISTUDIO = "aistudio"
     VERTEXAI = "vertexai"
@@ -147,18 +180,18 @@ class Model(Enum):
     # Gemini models
     Gemini_25_Pro = ("Gemini_25_Pro", ModelProvider.AISTUDIO, lambda: get_gemini_ai_studio_config("gemini-2.5-pro", max_tokens=65536))
     Gemini_25_Flash = ("Gemini_25_Flash", ModelProvider.AISTUDIO, lambda: get_gemini_ai_studio_config("gemini-2.5-flash", max_tokens=65536))
-    Gemini_3_Pro_Preview = ("Gemini_3_Pro_Preview", ModelProvider.AISTUDIO, lambda: get_gemini_ai_studio_config("gemini-3-pro-preview", max_tokens=60000, thinking_level=ThinkingLevel.HIGH))
+    Gemini_3_Pro_Preview = ("Gemini_3_Pro_Preview", ModelProvider.AISTUDIO, lambda: get_gemini_ai_studio_config("gemini-3-pro-preview", max_tokens=60000, thinking_level="HIGH"))
 
     # OpenAI models
     GPT41_0414 = ("GPT41_0414", ModelProvider.OPENAI, lambda: get_open_ai_config("gpt-4.1-2025-04-14", system_role_name="developer"))
     GPT41mini_0414 = ("GPT41mini_0414", ModelProvider.OPENAI, lambda: get_open_ai_config("gpt-4.1-mini-2025-04-14", system_role_name="developer"))
-    GPT41nano_0414 = ("GPT41nano_0414", ModelProvider.OPENAI, lambda: get_open_ai_config("gpt-4.1-nano-2025-04-14"))
+    GPT41nano_0414 = ("GPT41nano_0414", ModelProvider.OPENAI, lambda: get_open_ai_config("gpt-4.1-nano-2025-04-14"), RequestTimeouts(connect=10, first_byte=180, total=180))
     GPT_OSS_120B = ("GPT_OSS_120B", ModelProvider.OPENAI, lambda: get_cerebras_config("gpt-oss-120b", max_tokens=65536, reasoning_effort="low"))
     GPT_OSS_20B = ("GPT_OSS_20B", ModelProvider.OPENAI, lambda: get_open_ai_config("openai/gpt-oss-20b", max_tokens=-1, reasoning_effort="low", base_url="http://localhost:1234/v1"))
 
     Codex_Mini_Latest = ("Codex_Mini_Latest", ModelProvider.OPENAI_RESPONSES, lambda: get_open_ai_responses_config("codex-mini-latest", max_tokens=100000))
     GPT5_0807 = ("GPT5_0807", ModelProvider.OPENAI_RESPONSES, lambda: get_open_ai_responses_config("gpt-5-2025-08-07", effort="low", verbosity="high", max_tokens=128000))
-    GPT5_Pro_1006 = ("GPT5_Pro_1006", ModelProvider.OPENAI_RESPONSES, lambda: get_open_ai_responses_config("gpt-5-pro-2025-10-06", verbosity="high", max_tokens=272000, background=True))
+    GPT5_Pro_1006 = ("GPT5_Pro_1006", ModelProvider.OPENAI_RESPONSES, lambda: get_open_ai_responses_config("gpt-5-pro-2025-10-06", verbosity="high", max_tokens=272000, background=True), RequestTimeouts(connect=10, first_byte=120, total=4 * 3600))
     GPT5_Codex = ("GPT5_Codex", ModelProvider.OPENAI_RESPONSES, lambda: get_open_ai_responses_config("gpt-5-codex", effort="low", verbosity="medium", max_tokens=128000))
     GPT5_Nano_high = ("GPT5_Nano_high", ModelProvider.OPENAI_RESPONSES, lambda: get_open_ai_responses_config("gpt-5-nano-2025-08-07", effort="high", verbosity="high", max_tokens=128000))
     GPT5_Mini_high = ("GPT5_Mini_high", ModelProvider.OPENAI_RESPONSES, lambda: get_open_ai_responses_config("gpt-5-mini-2025-08-07", effort="high", verbosity="high", max_tokens=128000))
@@ -176,7 +209,7 @@ class Model(Enum):
     Opus_41 = ("Claude_Opus_41", ModelProvider.VERTEXAI_ANTHROPIC, lambda: get_anthropic_vertexai_config("claude-opus-4-1@20250805", False, 32000))
     Opus_41_Thinking = ("Claude_Opus_41_Thinking", ModelProvider.VERTEXAI_ANTHROPIC, lambda: get_anthropic_vertexai_config("claude-opus-4-1@20250805", True, 32000))
     Opus_45 = ("Claude_Opus_45", ModelProvider.VERTEXAI_ANTHROPIC, lambda: get_anthropic_vertexai_config("claude-opus-4-5@20251101", False, 32000))
-    Haiku_45 = ("Claude_Haiku_45", ModelProvider.VERTEXAI_ANTHROPIC, lambda: get_anthropic_vertexai_config("claude-haiku-4-5@20251001"))
+    Haiku_45 = ("Claude_Haiku_45", ModelProvider.VERTEXAI_ANTHROPIC, lambda: get_anthropic_vertexai_config("claude-haiku-4-5@20251001"), RequestTimeouts(connect=10, first_byte=60, total=600))
 
     # Other models
     Grok4_0709 = ("Grok4_0709", ModelProvider.XAI, lambda: get_xai_config("grok-4-0709")) # reasoning effort is not supported for Grok4
@@ -191,11 +224,14 @@ class Model(Enum):
     Kimi_K2 = ("Kimi_K2", ModelProvider.FIREWORKS, lambda: get_fireworks_config("accounts/fireworks/models/kimi-k2-thinking", max_tokens=60000))
     # fmt: on
 
-    def __init__(self, model_id: str, provider: ModelProvider, config_func: callable):
-        """Initialize the model"""
+    def __init__(
+        self, model_id: str, provider: ModelProvider, config_func: callable, timeouts: RequestTimeouts | None = None
+    ):
+        """Initialize the model, timeouts override the defaults of latency.get_request_timeouts"""
         self.model_id = model_id
         self.provider = provider
         self.config_func = config_func
+        self.timeouts = timeouts
 
     def __call__(self):
         """Get the configuration for this model"""
@@ -204,3 +240,11 @@ class Model(Enum):
     def __str__(self):
         """Return the model ID"""
         return self.model_id
+
+    @classmethod
+    def from_id(cls, model_id: str) -> "Model":
+        """Find the model by its ID, raises ValueError for unknown IDs"""
+        for model in cls:
+            if model.model_id == model_id:
+                return model
+        raise ValueError(f"Unknown model {model_id}")
@@ -0,0 +1,99 @@
+import re
+from fnmatch import fnmatchcase
+from typing import Dict, List, Optional, Set, Tuple
+
+from Utils.llm.dataset_vfs import DatasetFileSystem
+
+REGEX_SPECIAL_CHARACTERS = set(".^$*+?{}[]\\|()")
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def matches_glob(file_path: str, glob: Optional[str]) -> bool:
+    """Match a path against a glob pattern, patterns without "/" are also matched against the file name"""
+    if not glob:
+        return True
+    if fnmatchcase(file_path, glob):
+        return True
+    return "/" not in glob and fnmatchcase(file_path.rsplit("/", 1)[-1], glob)
+
+
+class SearchMatch:
+    file_path: str
+    line_number: int
+    line: str
+
+    def __init__(self, file_path: str, line_number: int, line: str):
+        self.file_path = file_path
+        self.line_number = line_number
+        self.line = line
+
+
+class DatasetSearchIndex:
+    """
+    Case-insensitive trigram inverted index over the text files of a dataset snapshot.
+
+    The index narrows a query down to the files containing every trigram of its literal text,
+    only those candidates are scanned line by line.
+    """
+
+    def __init__(self, dataset: DatasetFileSystem):
+        self.dataset = dataset
+        self._lines: Dict[str, List[str]] = {}
+        self._postings: Dict[str, Set[str]] = {}
+        self._build()
+
+    def _build(self):
+        for file_path in self.dataset.list_files():
+            try:
+                text = self.dataset.read_text(file_path)
+            except UnicodeDecodeError:
+                continue
+            self._lines[file_path] = text.splitlines()
+            for trigram in trigrams(text.lower()):
+                self._postings.setdefault(trigram, set()).add(file_path)
+
+    def candidates(self, literal: Optional[str]) -> List[str]:
+        """Files which may contain the literal, all indexed files when the literal is too short to use the index"""
+        if not literal or len(literal) < 3:
+            return list(self._lines)
+
+        result: Optional[Set[str]] = None
+        for trigram in trigrams(literal.lower()):
+            postings = self._postings.get(trigram)
+            if not postings:
+                return []
+            result = set(postings) if result is None else result & postings
+            if not result:
+                return []
+        return sorted(result or [])
+
+    def search(
+        self,
+        pattern: str,
+        regex: bool = False,
+        glob: Optional[str] = None,
+        case_sensitive: bool = False,
+        max_results: int = 50,
+    ) -> Tuple[List[SearchMatch], bool]:
+        """
+        Search the indexed files line by line.
+
+        Returns matches in path order and a flag telling whether more matches were left out.
+        Raises re.error for invalid regular expressions.
+        """
+        literal = None if regex and set(pattern) & REGEX_SPECIAL_CHARACTERS else pattern
+        compiled = re.compile(pattern if regex else re.escape(pattern), 0 if case_sensitive else re.IGNORECASE)
+
+        matches: List[SearchMatch] = []
+        for file_path in self.candidates(literal):
+            if not matches_glob(file_path, glob):
+                continue
+            for line_number, line in enumerate(self._lines[file_path], start=1):
+                if compiled.search(line):
+                    if len(matches) == max_results:
+                        return matches, True
+                    matches.append(SearchMatch(file_path, line_number, line))
+        return matches, False
@@ -0,0 +1,104 @@
+import posixpath
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+class DatasetFileSystem:
+    """Read-only in-memory snapshot of a dataset directory shared by tool handlers"""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self._files: Dict[str, bytes] = {}
+        self._line_offsets: Dict[str, List[int]] = {}
+        self._snapshot()
+        self._file_list: List[str] = sorted(self._files)
+
+    def _snapshot(self):
+        """Load every file of the dataset tree into memory once"""
+        if not self.root.is_dir():
+            return
+        for file_path in self.root.rglob("*"):
+            if file_path.is_file():
+                self._files[file_path.relative_to(self.root).as_posix()] = file_path.read_bytes()
+
+    def normalize(self, file_path: str) -> Optional[str]:
+        """
+        Normalize a path received from the model to the snapshot key format.
+
+        Accepts Windows separators, leading "/" or "./" and paths prefixed with the dataset folder name.
+        Returns None for paths escaping the dataset root.
+        """
+        path = posixpath.normpath(str(file_path).strip().replace("\\", "/")).lstrip("/")
+        if path == "." or path == ".." or path.startswith("../"):
+            return None
+        if path not in self._files:
+            prefix = f"{self.root.name}/"
+            if path.startswith(prefix):
+                path = path[len(prefix) :]
+        return path
+
+    def list_files(self) -> List[str]:
+        """List relative paths of all files in the snapshot"""
+        return list(self._file_list)
+
+    def exists(self, file_path: str) -> bool:
+        path = self.normalize(file_path)
+        return path is not None and path in self._files
+
+    def read_bytes(self, file_path: str) -> bytes:
+        path = self.normalize(file_path)
+        if path is None or path not in self._files:
+            raise FileNotFoundError(file_path)
+        return self._files[path]
+
+    def read_text(self, file_path: str) -> str:
+        return self.read_bytes(file_path).decode("utf-8")
+
+    def size(self, file_path: str) -> int:
+        return len(self.read_bytes(file_path))
+
+    def line_offsets(self, file_path: str) -> List[int]:
+        """
+        Start offsets of every line of the file followed by the file size as a sentinel.
+        The index is built once per file, so ranged reads are plain slices of the snapshot.
+        """
+        path = self.normalize(file_path)
+        content = self.read_bytes(file_path)
+        if path not in self._line_offsets:
+            offsets = [0]
+            position = content.find(b"\n")
+            while position != -1:
+                offsets.append(position + 1)
+                position = content.find(b"\n", position + 1)
+            if offsets[-1] != len(content):
+                offsets.append(len(content))
+            self._line_offsets[path] = offsets
+        return self._line_offsets[path]
+
+    def line_count(self, file_path: str) -> int:
+        return len(self.line_offsets(file_path)) - 1
+
+    def read_range(self, file_path: str, offset: int, limit: int) -> bytes:
+        """Read up to limit bytes starting at byte offset"""
+        content = self.read_bytes(file_path)
+        return content[offset : offset + limit]
+
+    def read_lines(self, file_path: str, start: int, count: int, max_bytes: Optional[int] = None) -> Tuple[bytes, int]:
+        """
+        Read up to count lines starting at 0-based line start, keeping whole lines within max_bytes.
+        Returns the content and the number of lines read (at least one line if any is left).
+        """
+        offsets = self.line_offsets(file_path)
+        total_lines = len(offsets) - 1
+        start = min(start, total_lines)
+        end = min(start + count, total_lines)
+        if max_bytes is not None and end > start:
+            end = max(start + 1, min(end, bisect_right(offsets, offsets[start] + max_bytes) - 1))
+        return self.read_bytes(file_path)[offsets[start] : offsets[end]], end - start
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def __contains__(self, file_path: str) -> bool:
+        return self.exists(file_path)
@@ -0,0 +1,127 @@
+import re
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional, Type
+
+
+class APIException(Exception):
+    """Error of a provider request, status_code is None when the request got no HTTP response"""
+
+    retryable = True
+
+    def __init__(self, status_code, content, retry_after: Optional[float] = None):
+        self.status_code = status_code
+        self.content = content
+        # Seconds the server asked to wait before retrying, from Retry-After or similar hints
+        self.retry_after = retry_after
+        super().__init__(self.content)
+
+
+class RateLimitError(APIException):
+    """429, or a Bedrock throttling error"""
+
+
+class ServerError(APIException):
+    """5xx errors, including 529 for an overloaded Anthropic API"""
+
+
+class RequestTimeoutError(APIException):
+    """Connect, read or total timeout"""
+
+
+class APIConnectionError(APIException):
+    """The endpoint could not be reached"""
+
+
+class AuthenticationError(APIException):
+    """401 and 403, retrying does not help"""
+
+    retryable = False
+
+
+class BadRequestError(APIException):
+    """4xx errors caused by the request itself, e.g. a prompt over the context window"""
+
+    retryable = False
+
+
+def status_error_class(status_code: int) -> Type[APIException]:
+    if status_code == 429:
+        return RateLimitError
+    if status_code in (401, 403):
+        return AuthenticationError
+    if status_code in (408, 409):
+        return ServerError
+    if 400 <= status_code < 500:
+        return BadRequestError
+    return ServerError
+
+
+def parse_retry_after(value: Any) -> Optional[float]:
+    """Seconds from a Retry-After header value, given either as seconds or as an HTTP date"""
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(parsedate_to_datetime(str(value)).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def retry_after_from_headers(headers: Any) -> Optional[float]:
+    if not headers:
+        return None
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms is not None:
+        seconds = parse_retry_after(retry_after_ms)
+        return seconds / 1000 if seconds is not None else None
+    return parse_retry_after(headers.get("retry-after"))
+
+
+# Gemini reports the hint in the error details as RetryInfo, e.g. 'retryDelay': '37s'
+RETRY_DELAY_REGEX = re.compile(r"""['"]retryDelay['"]:\s*['"](\d+(?:\.\d+)?)s['"]""")
+
+
+def _class_names(error: BaseException):
+    return {cls.__name__ for cls in type(error).__mro__}
+
+
+def map_exception(error: BaseException, message: Optional[str] = None) -> APIException:
+    """
+    Map an exception of any provider SDK to the error taxonomy.
+    SDKs are inspected by attributes and class names, so none of them has to be importable.
+    """
+    if isinstance(error, APIException):
+        return error
+
+    content = f"{message}: {error}" if message else str(error)
+    names = _class_names(error)
+
+    # OpenAI, Anthropic and httpx based SDKs: status_code and response headers
+    status_code = getattr(error, "status_code", None)
+    # google-genai APIError
+    if status_code is None and isinstance(getattr(error, "code", None), int):
+        status_code = error.code
+    # botocore ClientError
+    boto_response = getattr(error, "response", None)
+    if status_code is None and isinstance(boto_response, dict):
+        status_code = boto_response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+        if boto_response.get("Error", {}).get("Code") in ("ThrottlingException", "TooManyRequestsException"):
+            status_code = 429
+
+    if isinstance(status_code, int):
+        response = getattr(error, "response", None)
+        retry_after = retry_after_from_headers(getattr(response, "headers", None))
+        if retry_after is None:
+            match = RETRY_DELAY_REGEX.search(str(getattr(error, "details", "") or error))
+            retry_after = float(match.group(1)) if match else None
+        return status_error_class(status_code)(status_code, content, retry_after)
+
+    if isinstance(error, TimeoutError) or any("Timeout" in name for name in names):
+        return RequestTimeoutError(None, content)
+    if isinstance(error, ConnectionError) or names & {"APIConnectionError", "ConnectError", "EndpointConnectionError"}:
+        return APIConnectionError(None, content)
+    return APIException(None, content)
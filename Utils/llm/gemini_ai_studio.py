@@ -7,6 +7,9 @@ from Utils.llm.ai_tool import AIToolSet
 from Utils.llm.config import google_ai_api_key, Model, default_temperature
 from Utils.llm.ai_message import AIMessage
 from Utils.llm.message_converter import get_converter, ConverterProvider
+from Utils.llm.image_store import get_image_store
+from Utils.llm.latency import get_request_timeouts
+from Utils.llm.errors import map_exception
 
 recommended_temperature = 1
 
@@ -27,11 +30,13 @@ def request_data(
     config = model()
 
     try:
-        client = genai.Client(api_key=google_ai_api_key)
+        # The SDK takes a single timeout in milliseconds for the whole request
+        timeout = int(get_request_timeouts(model).total * 1000)
+        client = genai.Client(api_key=google_ai_api_key, http_options=types.HttpOptions(timeout=timeout))
     except Exception as e:
-        raise Exception(f"Failed to initialize Gemini Vertex client: {e}")
+        raise map_exception(e, "Failed to initialize Gemini Vertex client") from e
 
-    converter = get_converter(ConverterProvider.GEMINI)
+    converter = get_converter(ConverterProvider.GEMINI, get_image_store(model.provider))
     contents = converter.convert(messages)
 
     response = client.models.generate_content(
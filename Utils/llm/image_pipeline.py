@@ -0,0 +1,215 @@
+import io
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from Utils.llm.ai_message import ImageAIMessageContent
+from Utils.llm.config import ModelProvider
+
+
+class ImageBudget:
+    """Largest image a provider accepts without downscaling it on its side"""
+
+    max_long_edge: int
+    max_bytes: int
+
+    def __init__(self, max_long_edge: int, max_bytes: int):
+        self.max_long_edge = max_long_edge
+        self.max_bytes = max_bytes
+
+
+# Docs: https://docs.anthropic.com/en/docs/build-with-claude/vision#evaluate-image-size
+# Docs: https://platform.openai.com/docs/guides/images-vision#calculating-costs
+# Docs: https://ai.google.dev/gemini-api/docs/image-understanding
+# Docs: https://docs.aws.amazon.com/nova/latest/userguide/modalities-image.html
+provider_image_budgets: Dict[ModelProvider, ImageBudget] = {
+    ModelProvider.VERTEXAI_ANTHROPIC: ImageBudget(1568, 5 * 1024 * 1024),
+    ModelProvider.OPENAI: ImageBudget(2048, 20 * 1024 * 1024),
+    ModelProvider.OPENAI_RESPONSES: ImageBudget(2048, 20 * 1024 * 1024),
+    ModelProvider.AZURE: ImageBudget(2048, 20 * 1024 * 1024),
+    ModelProvider.XAI: ImageBudget(2048, 10 * 1024 * 1024),
+    ModelProvider.FIREWORKS: ImageBudget(2048, 10 * 1024 * 1024),
+    ModelProvider.AISTUDIO: ImageBudget(3072, 20 * 1024 * 1024),
+    ModelProvider.VERTEXAI: ImageBudget(3072, 20 * 1024 * 1024),
+    ModelProvider.AMAZON: ImageBudget(8000, 3750 * 1024),
+}
+
+
+def image_dimensions(binary_content: bytes) -> Optional[Tuple[int, int]]:
+    """Read (width, height) from PNG, GIF or JPEG headers without decoding the image"""
+    if binary_content.startswith(b"\x89PNG\r\n\x1a\n") and len(binary_content) >= 24:
+        return struct.unpack(">II", binary_content[16:24])
+    if binary_content[:6] in (b"GIF87a", b"GIF89a") and len(binary_content) >= 10:
+        return struct.unpack("<HH", binary_content[6:10])
+    if binary_content.startswith(b"\xff\xd8"):
+        position = 2
+        while position + 9 < len(binary_content):
+            if binary_content[position] != 0xFF:
+                return None
+            marker = binary_content[position + 1]
+            segment_length = struct.unpack(">H", binary_content[position + 2 : position + 4])[0]
+            # SOF0-SOF15 markers except DHT (C4), JPG (C8) and DAC (CC) hold the frame size
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">HH", binary_content[position + 5 : position + 9])
+                return width, height
+            position += 2 + segment_length
+    return None
+
+
+class ImagePayloadStats:
+    file_name: str
+    original_bytes: int
+    payload_bytes: int
+    original_size: Optional[Tuple[int, int]]
+    payload_size: Optional[Tuple[int, int]]
+
+    def __init__(
+        self,
+        file_name: str,
+        original_bytes: int,
+        payload_bytes: int,
+        original_size: Optional[Tuple[int, int]],
+        payload_size: Optional[Tuple[int, int]],
+    ):
+        self.file_name = file_name
+        self.original_bytes = original_bytes
+        self.payload_bytes = payload_bytes
+        self.original_size = original_size
+        self.payload_size = payload_size
+
+
+class ImagePipeline:
+    """
+    Loads task images once and shares them between all attempts and requests.
+
+    Loaded images keep their base64 and data URL encodings after the first conversion. When a budget
+    is given, images exceeding it are downscaled and, if still too large, recompressed as JPEG in a
+    worker pool. Resizing requires Pillow; without it images are sent unchanged.
+    """
+
+    def __init__(self, budget: Optional[ImageBudget] = None, max_workers: int = 4):
+        self.budget = budget
+        self.max_workers = max_workers
+        self.stats: Dict[str, ImagePayloadStats] = {}
+        self._cache: Dict[Path, List[ImageAIMessageContent]] = {}
+        self._cache_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+    def load(self, images_category: Path) -> List[ImageAIMessageContent]:
+        images_category = Path(images_category).resolve()
+        with self._cache_lock:
+            if images_category not in self._cache:
+                self._cache[images_category] = self._load(images_category)
+            return self._cache[images_category]
+
+    def _load(self, images_category: Path) -> List[ImageAIMessageContent]:
+        if not images_category.exists() or not images_category.is_dir():
+            return []
+
+        image_files = sorted(image_file for image_file in images_category.iterdir() if image_file.is_file())
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self._process, image_files))
+
+    def _process(self, image_file: Path) -> ImageAIMessageContent:
+        binary_content = image_file.read_bytes()
+        original_size = image_dimensions(binary_content)
+        image = ImageAIMessageContent(file_name=image_file.name, binary_content=binary_content)
+
+        if self.budget and not self._fits_budget(binary_content, original_size):
+            image = fit_to_budget(image, self.budget)
+
+        with self._stats_lock:
+            self.stats[str(image_file)] = ImagePayloadStats(
+                image_file.name,
+                len(binary_content),
+                len(image.binary_content),
+                original_size,
+                image_dimensions(image.binary_content),
+            )
+        return image
+
+    def _fits_budget(self, binary_content: bytes, size: Optional[Tuple[int, int]]) -> bool:
+        if len(binary_content) > self.budget.max_bytes:
+            return False
+        return size is not None and max(size) <= self.budget.max_long_edge
+
+    def report(self) -> str:
+        """Summary of image payload sizes for the loaded images"""
+        original_bytes = sum(stats.original_bytes for stats in self.stats.values())
+        payload_bytes = sum(stats.payload_bytes for stats in self.stats.values())
+        return (
+            f"Images: {len(self.stats)} files, {original_bytes / 1024:.0f} KB on disk, "
+            f"{payload_bytes / 1024:.0f} KB payload"
+        )
+
+
+_pillow_warning_shown = False
+
+
+def fit_to_budget(image: ImageAIMessageContent, budget: ImageBudget) -> ImageAIMessageContent:
+    """Downscale the image to the budget long edge and recompress it as JPEG if PNG is too large"""
+    global _pillow_warning_shown
+    try:
+        from PIL import Image
+    except ImportError:
+        if not _pillow_warning_shown:
+            _pillow_warning_shown = True
+            print("Pillow is not installed, images are sent without resizing. Install it with: pip install pillow")
+        return image
+
+    with Image.open(io.BytesIO(image.binary_content)) as source:
+        source.load()
+        picture = source.copy()
+
+    picture.thumbnail((budget.max_long_edge, budget.max_long_edge), Image.Resampling.LANCZOS)
+
+    # Prefer lossless PNG, then lower JPEG qualities, until the payload fits the budget and is smaller than the source
+    original_bytes = len(image.binary_content)
+    byte_limit = min(budget.max_bytes, original_bytes)
+    encodings = [("JPEG", quality) for quality in (90, 75, 60)]
+    if image.media_type() != "image/jpeg":
+        encodings.insert(0, ("PNG", None))
+
+    smallest: Optional[Tuple[bytes, str]] = None
+    for image_format, quality in encodings:
+        binary_content = _encode(picture, image_format, quality)
+        if smallest is None or len(binary_content) < len(smallest[0]):
+            smallest = (binary_content, image_format)
+        if len(binary_content) <= byte_limit:
+            break
+    else:
+        if original_bytes <= budget.max_bytes:
+            return image
+        binary_content, image_format = smallest
+
+    # The media type is derived from the extension, so keep it in sync with the new encoding
+    file_name = image.file_name
+    if image.media_type() != f"image/{image_format.lower()}":
+        file_name = f"{file_name.rsplit('.', 1)[0]}.{'jpg' if image_format == 'JPEG' else 'png'}"
+    return ImageAIMessageContent(file_name=file_name, binary_content=binary_content)
+
+
+def _encode(picture, image_format: str, quality: Optional[int] = None) -> bytes:
+    output = io.BytesIO()
+    if image_format == "JPEG":
+        picture.convert("RGB").save(output, format="JPEG", quality=quality or 90, optimize=True)
+    else:
+        picture.save(output, format=image_format)
+    return output.getvalue()
+
+
+_pipelines: Dict[Optional[ModelProvider], ImagePipeline] = {}
+_pipelines_lock = threading.Lock()
+
+
+def get_image_pipeline(provider: Optional[ModelProvider] = None) -> ImagePipeline:
+    """
+    Shared pipeline per provider, so every task and attempt reuses the same loaded images.
+    Without a provider images are only cached, not resized.
+    """
+    with _pipelines_lock:
+        if provider not in _pipelines:
+            _pipelines[provider] = ImagePipeline(provider_image_budgets.get(provider) if provider else None)
+        return _pipelines[provider]
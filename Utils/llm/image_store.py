@@ -0,0 +1,167 @@
+import hashlib
+import io
+import threading
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from Utils.llm.ai_message import ImageAIMessageContent
+from Utils.llm.config import ModelProvider, google_ai_api_key
+
+
+class UploadedFile:
+    """Reference to an image uploaded to a provider, id for id based APIs and uri for uri based ones"""
+
+    id: str
+    uri: Optional[str]
+    media_type: str
+
+    def __init__(self, id: str, media_type: str, uri: Optional[str] = None):
+        self.id = id
+        self.uri = uri
+        self.media_type = media_type
+
+
+class FileUploader(ABC):
+    """Abstract base class for provider file APIs"""
+
+    @abstractmethod
+    def upload(self, file_name: str, binary_content: bytes, media_type: str) -> UploadedFile:
+        """Upload the file and return a reference usable in requests"""
+        pass
+
+
+class GeminiFileUploader(FileUploader):
+    """Docs: https://ai.google.dev/gemini-api/docs/files"""
+
+    def __init__(self):
+        from google import genai
+
+        self.client = genai.Client(api_key=google_ai_api_key)
+
+    def upload(self, file_name: str, binary_content: bytes, media_type: str) -> UploadedFile:
+        file = self.client.files.upload(
+            file=io.BytesIO(binary_content), config={"mime_type": media_type, "display_name": file_name}
+        )
+        return UploadedFile(id=file.name, uri=file.uri, media_type=media_type)
+
+
+class OpenAIFileUploader(FileUploader):
+    """Docs: https://platform.openai.com/docs/guides/images-vision#giving-a-model-images-as-input"""
+
+    def __init__(self):
+        from openai import OpenAI
+
+        self.client = OpenAI()
+
+    def upload(self, file_name: str, binary_content: bytes, media_type: str) -> UploadedFile:
+        file = self.client.files.create(file=(file_name, binary_content, media_type), purpose="vision")
+        return UploadedFile(id=file.id, media_type=media_type)
+
+
+class LocalFileServer(FileUploader):
+    """
+    Stand-in file API serving uploaded files over HTTP on localhost.
+    Works for tests and for OpenAI compatible servers running locally which accept image URLs.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.files: Dict[str, UploadedFile] = {}
+        self.contents: Dict[str, bytes] = {}
+        server = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                file_id = self.path.rsplit("/", 1)[-1]
+                if file_id not in server.contents:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", server.files[file_id].media_type)
+                self.send_header("Content-Length", str(len(server.contents[file_id])))
+                self.end_headers()
+                self.wfile.write(server.contents[file_id])
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), RequestHandler)
+        self.base_url = f"http://{host}:{self.httpd.server_address[1]}/files"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def upload(self, file_name: str, binary_content: bytes, media_type: str) -> UploadedFile:
+        file_id = f"file-{hashlib.sha256(binary_content).hexdigest()[:24]}"
+        self.contents[file_id] = binary_content
+        self.files[file_id] = UploadedFile(id=file_id, uri=f"{self.base_url}/{file_id}", media_type=media_type)
+        return self.files[file_id]
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class ImageStore:
+    """
+    Uploads every unique image once (keyed by content hash) and hands out file references,
+    so converters can send a reference instead of inlining the same base64 bytes in every request.
+    """
+
+    def __init__(self, uploader: FileUploader):
+        self.uploader = uploader
+        self.uploads = 0
+        self.hits = 0
+        self._files: Dict[str, UploadedFile] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def reference(self, image: ImageAIMessageContent) -> UploadedFile:
+        key = hashlib.sha256(image.binary_content).hexdigest()
+        with self._lock:
+            key_lock = self._locks.setdefault(key, threading.Lock())
+
+        # Concurrent requests for the same image wait for a single upload
+        with key_lock:
+            if key in self._files:
+                self.hits += 1
+            else:
+                self._files[key] = self.uploader.upload(image.file_name, image.binary_content, image.media_type())
+                self.uploads += 1
+            return self._files[key]
+
+
+_uploader_factories = {
+    ModelProvider.AISTUDIO: GeminiFileUploader,
+    ModelProvider.OPENAI_RESPONSES: OpenAIFileUploader,
+}
+# Claude on Vertex AI has no Files API, so file sources of its requests would fail
+_providers_without_file_api = {ModelProvider.VERTEXAI_ANTHROPIC}
+_stores: Dict[ModelProvider, ImageStore] = {}
+_stores_lock = threading.Lock()
+
+
+def enable_image_uploads(provider: ModelProvider, uploader: Optional[FileUploader] = None) -> Optional[ImageStore]:
+    """
+    Send images of the provider requests as uploaded file references.
+    Providers without a supported file API keep inlining images.
+    """
+    if provider in _providers_without_file_api:
+        print(f"{provider.value} has no file API, images will be sent inline")
+        return None
+    with _stores_lock:
+        if provider not in _stores:
+            if uploader is None and provider not in _uploader_factories:
+                print(f"Image uploads are not supported for {provider.value}, images will be sent inline")
+                return None
+            _stores[provider] = ImageStore(uploader or _uploader_factories[provider]())
+        return _stores[provider]
+
+
+def disable_image_uploads(provider: ModelProvider):
+    with _stores_lock:
+        _stores.pop(provider, None)
+
+
+def get_image_store(provider: ModelProvider) -> Optional[ImageStore]:
+    """Image store of the provider, None when uploads are not enabled"""
+    return _stores.get(provider)
@@ -0,0 +1,99 @@
+import csv
+import statistics
+from pathlib import Path
+from typing import Dict, List, Optional, Protocol, Tuple, TypeVar
+
+# Used when there is neither history for the task nor enough history to fit a rate
+DEFAULT_BASE_SECONDS = 30.0
+DEFAULT_SECONDS_PER_INPUT_TOKEN = 0.002
+
+
+def task_key(experiment: str, task_name: str) -> Tuple[str, str]:
+    """History key of a task, the task file name without extension within its experiment (category folder)"""
+    return experiment, task_name.split(".", 1)[0]
+
+
+def summary_task_name(row: Dict[str, str]) -> str:
+    """Rebuild the task name from the Category, Dataset, Complexity and Size columns of a summary row"""
+    if row.get("Dataset", "none") == "none":
+        return row["Category"]
+    return f"{row['Category']}_{row['Dataset']}_{row['Complexity']}_{row['Size']}"
+
+
+class Schedulable(Protocol):
+    experiment: str
+    task_name: str
+    estimated_input_tokens: int
+    predicted_duration: float
+
+
+Job = TypeVar("Job", bound=Schedulable)
+
+
+class DurationModel:
+    """
+    Predicts how long a job will take from the "Time" column of previous summaries of the model.
+    Tasks without history fall back to a rate per estimated input token fitted on the same summaries.
+    """
+
+    def __init__(
+        self,
+        history: Optional[Dict[Tuple[str, str], List[float]]] = None,
+        base_seconds: float = DEFAULT_BASE_SECONDS,
+        seconds_per_input_token: float = DEFAULT_SECONDS_PER_INPUT_TOKEN,
+    ):
+        self.history = history or {}
+        self.base_seconds = base_seconds
+        self.seconds_per_input_token = seconds_per_input_token
+
+    @classmethod
+    def from_summaries(cls, summary_paths: List[Path]) -> "DurationModel":
+        history: Dict[Tuple[str, str], List[float]] = {}
+        total_time = total_input = 0.0
+        for summary_path in summary_paths:
+            if not summary_path.is_file():
+                continue
+            with open(summary_path, "r", encoding="utf-8", newline="") as file:
+                for row in csv.DictReader(file):
+                    try:
+                        execution_time = float(row["Time"])
+                        input_tokens = float(row["Input"])
+                    except (KeyError, TypeError, ValueError):
+                        continue
+                    # Failed attempts are recorded with zero time and tell nothing about duration
+                    if execution_time <= 0:
+                        continue
+                    # The Type column holds the category folder name, e.g. component_generation
+                    key = task_key(row["Type"], summary_task_name(row))
+                    history.setdefault(key, []).append(execution_time)
+                    total_time += execution_time
+                    total_input += input_tokens
+
+        if total_input > 0:
+            return cls(history, base_seconds=0.0, seconds_per_input_token=total_time / total_input)
+        return cls(history)
+
+    def predict(self, experiment: str, task_name: str, estimated_input_tokens: int = 0) -> float:
+        durations = self.history.get(task_key(experiment, task_name))
+        if durations:
+            return statistics.median(durations)
+        return self.base_seconds + estimated_input_tokens * self.seconds_per_input_token
+
+
+def longest_first(jobs: List[Job], duration_model: DurationModel) -> List[Job]:
+    """
+    Annotate jobs with their predicted duration and order them longest first.
+    Starting the longest jobs first keeps a single slow task from stretching the end of the run.
+    """
+    for job in jobs:
+        job.predicted_duration = duration_model.predict(job.experiment, job.task_name, job.estimated_input_tokens)
+    return sorted(jobs, key=lambda job: job.predicted_duration, reverse=True)
+
+
+def makespan(durations: List[float], workers: int) -> float:
+    """Run length when the durations are dispatched in the given order to the first free worker"""
+    finish_times = [0.0] * max(workers, 1)
+    for duration in durations:
+        index = finish_times.index(min(finish_times))
+        finish_times[index] += duration
+    return max(finish_times)
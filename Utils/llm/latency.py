@@ -0,0 +1,225 @@
+import csv
+import math
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, TypeVar
+
+from Utils.llm.config import Model, RequestTimeouts
+
+T = TypeVar("T")
+
+# Recent observations kept per model, older ones are dropped so the history follows provider changes
+MAX_SAMPLES = 500
+
+
+def percentile(samples: List[float], q: float) -> float:
+    """Nearest rank percentile, q in 0..100"""
+    ordered = sorted(samples)
+    index = max(math.ceil(q / 100 * len(ordered)) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+
+class LatencyHistory:
+    """
+    Request latencies per model, seeded from the "Time" column of the model's summaries
+    in RESULTS_REPO_PATH and extended with every completed request of the process.
+    """
+
+    def __init__(self, results_path: Optional[Path] = None):
+        self.results_path = results_path
+        self._samples: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, model: Model) -> List[float]:
+        samples = []
+        if self.results_path is None:
+            return samples
+        for summary_path in sorted((self.results_path / "Output" / model.model_id).glob("*/summary.csv")):
+            with open(summary_path, "r", encoding="utf-8", newline="") as file:
+                for row in csv.DictReader(file):
+                    try:
+                        execution_time = float(row["Time"])
+                    except (KeyError, TypeError, ValueError):
+                        continue
+                    if execution_time > 0:
+                        samples.append(execution_time)
+        return samples[-MAX_SAMPLES:]
+
+    def samples(self, model: Model) -> List[float]:
+        with self._lock:
+            if model.model_id not in self._samples:
+                self._samples[model.model_id] = self._load(model)
+            return list(self._samples[model.model_id])
+
+    def record(self, model: Model, seconds: float):
+        self.samples(model)
+        with self._lock:
+            samples = self._samples[model.model_id]
+            samples.append(seconds)
+            del samples[:-MAX_SAMPLES]
+
+    def percentile(self, model: Model, q: float, min_samples: int = 10) -> Optional[float]:
+        """Latency percentile of the model, None until there are at least min_samples observations"""
+        samples = self.samples(model)
+        if len(samples) < min_samples:
+            return None
+        return percentile(samples, q)
+
+
+_history: Optional[LatencyHistory] = None
+_history_lock = threading.Lock()
+
+
+def get_latency_history() -> LatencyHistory:
+    global _history
+    with _history_lock:
+        if _history is None:
+            results_repo_path = os.getenv("RESULTS_REPO_PATH")
+            _history = LatencyHistory(Path(results_repo_path).resolve() if results_repo_path else None)
+        return _history
+
+
+class HedgeStats:
+    requests: int
+    hedged: int
+    hedge_wins: int
+
+    def __init__(self):
+        self.requests = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def report(self) -> str:
+        share = self.hedged / self.requests * 100 if self.requests else 0
+        return (
+            f"Hedging: {self.requests} requests, {self.hedged} hedged ({share:.1f}%), "
+            f"{self.hedge_wins} won by the hedge"
+        )
+
+
+class HedgingPolicy:
+    """
+    Fires a duplicate of a request which takes longer than the model's latency percentile
+    and returns whichever completes first.
+
+    Duplicates are capped to budget (a share of all requests), so a provider that is slow for everyone
+    does not get twice the load. SDK calls cannot be interrupted, so the losing request is only
+    cancelled if it has not started yet, otherwise it runs to completion and its result is discarded.
+    """
+
+    def __init__(self, percentile: float = 95, budget: float = 0.1, min_samples: int = 10):
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.stats = HedgeStats()
+        self._lock = threading.Lock()
+
+    def delay(self, model: Model) -> Optional[float]:
+        return get_latency_history().percentile(model, self.percentile, self.min_samples)
+
+    def _reserve_hedge(self) -> bool:
+        with self._lock:
+            if self.stats.hedged + 1 > self.budget * self.stats.requests:
+                return False
+            self.stats.hedged += 1
+            return True
+
+    def call(self, model: Model, request: Callable[[], T]) -> T:
+        with self._lock:
+            self.stats.requests += 1
+        delay = self.delay(model)
+        if delay is None:
+            return request()
+
+        executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="hedge")
+        try:
+            primary = executor.submit(request)
+            futures = {primary}
+            done, _ = wait(futures, timeout=delay)
+            if not done and self._reserve_hedge():
+                futures.add(executor.submit(request))
+
+            # The first successful completion wins, an error is raised only when every request failed
+            error = None
+            while futures:
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        for loser in futures:
+                            loser.cancel()
+                        if future is not primary:
+                            with self._lock:
+                                self.stats.hedge_wins += 1
+                        return future.result()
+                    error = future.exception()
+            raise error
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_hedging_policy: Optional[HedgingPolicy] = None
+
+
+def enable_hedging(policy: Optional[HedgingPolicy] = None) -> HedgingPolicy:
+    """Hedge every request of ask_model with the policy"""
+    global _hedging_policy
+    _hedging_policy = policy or HedgingPolicy()
+    return _hedging_policy
+
+
+def disable_hedging():
+    global _hedging_policy
+    _hedging_policy = None
+
+
+def get_hedging_policy() -> Optional[HedgingPolicy]:
+    return _hedging_policy
+
+
+DEFAULT_TIMEOUTS = RequestTimeouts(connect=10, first_byte=300, total=1800)
+
+
+class AdaptiveTimeouts:
+    """
+    Derives the total request timeout of a model from its latency history: the p99 latency
+    times multiplier, but never less than min_total. Models with fewer than min_samples
+    recorded requests keep their configured timeouts.
+    """
+
+    def __init__(self, percentile: float = 99, multiplier: float = 2.0, min_samples: int = 20, min_total: float = 60):
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.min_samples = min_samples
+        self.min_total = min_total
+
+    def apply(self, model: Model, timeouts: RequestTimeouts) -> RequestTimeouts:
+        latency = get_latency_history().percentile(model, self.percentile, self.min_samples)
+        if latency is None:
+            return timeouts
+        total = max(latency * self.multiplier, self.min_total)
+        return RequestTimeouts(connect=timeouts.connect, first_byte=min(timeouts.first_byte, total), total=total)
+
+
+_adaptive_timeouts: Optional[AdaptiveTimeouts] = None
+
+
+def enable_adaptive_timeouts(adaptive_timeouts: Optional[AdaptiveTimeouts] = None) -> AdaptiveTimeouts:
+    """Derive request timeouts of every model from its recorded latencies"""
+    global _adaptive_timeouts
+    _adaptive_timeouts = adaptive_timeouts or AdaptiveTimeouts()
+    return _adaptive_timeouts
+
+
+def disable_adaptive_timeouts():
+    global _adaptive_timeouts
+    _adaptive_timeouts = None
+
+
+def get_request_timeouts(model: Model) -> RequestTimeouts:
+    """Timeouts of the model entry, or the defaults, adapted to its latency history in adaptive mode"""
+    timeouts = model.timeouts or DEFAULT_TIMEOUTS
+    if _adaptive_timeouts:
+        return _adaptive_timeouts.apply(model, timeouts)
+    return timeouts
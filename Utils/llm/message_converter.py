@@ -1,23 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Union, Literal
+from typing import TYPE_CHECKING, List, Dict, Any, Union, Literal, Optional
 import json
 from enum import Enum
 
-from anthropic.types import (
-    TextBlockParam,
-    ImageBlockParam,
-    Base64ImageSourceParam,
-    ToolUseBlockParam,
-    ToolResultBlockParam,
-)
-from google.genai import types as genai_types
-from openai.types.responses import (
-    ResponseInputTextParam,
-    ResponseInputImageParam,
-    ResponseFunctionToolCallParam,
-    EasyInputMessageParam,
-)
-from openai.types.responses.response_input_param import FunctionCallOutput
+if TYPE_CHECKING:
+    from google.genai import types as genai_types
+    from openai.types.responses import ResponseFunctionToolCallParam, EasyInputMessageParam
+    from openai.types.responses.response_input_param import FunctionCallOutput
 
 from Utils.llm.ai_message import (
     AIMessage,
@@ -26,11 +15,16 @@ from Utils.llm.ai_message import (
     ToolCallAIMessageContent,
     ToolResponseAIMessageContent,
 )
+from Utils.llm.image_store import ImageStore
 
 
 class MessageConverter(ABC):
     """Abstract base class for converting AIMessage objects to provider-specific formats."""
 
+    def __init__(self, image_store: Optional[ImageStore] = None):
+        # When an image store is given, images are sent as references to files uploaded once
+        self.image_store = image_store
+
     @abstractmethod
     def convert(self, messages: List[AIMessage]) -> Any:
         """Convert list of AIMessage objects to provider-specific format."""
@@ -53,10 +47,16 @@ class OpenAICompletionsConverter(MessageConverter):
                 if isinstance(content, TextAIMessageContent):
                     text_content.append({"type": "text", "text": content.text})
                 elif isinstance(content, ImageAIMessageContent):
+                    uploaded = self.image_store.reference(content) if self.image_store else None
                     text_content.extend(
                         [
                             {"type": "text", "text": f"Next image filename: {content.file_name}"},
-                            {"type": "image_url", "image_url": {"url": content.to_base64_url()}},
+                            {
+                                "type": "image_url",
+                                "image_url": {
+                                    "url": uploaded.uri if uploaded and uploaded.uri else content.to_base64_url()
+                                },
+                            },
                         ]
                     )
                 elif isinstance(content, ToolCallAIMessageContent):
@@ -87,8 +87,17 @@ class OpenAIResponsesConverter(MessageConverter):
 
     def convert(
         self, messages: List[AIMessage]
-    ) -> List[Union[EasyInputMessageParam, ResponseFunctionToolCallParam, FunctionCallOutput]]:
+    ) -> "List[Union[EasyInputMessageParam, ResponseFunctionToolCallParam, FunctionCallOutput]]":
         """Convert to OpenAI Responses API format with mixed message types."""
+        # Provider SDKs are imported on first use, so runs of other providers do not pay for them
+        from openai.types.responses import (
+            ResponseInputTextParam,
+            ResponseInputImageParam,
+            ResponseFunctionToolCallParam,
+            EasyInputMessageParam,
+        )
+        from openai.types.responses.response_input_param import FunctionCallOutput
+
         api_messages = []
 
         for message in messages:
@@ -99,12 +108,18 @@ class OpenAIResponsesConverter(MessageConverter):
                 if isinstance(content, TextAIMessageContent):
                     content_buffer.append(ResponseInputTextParam(type="input_text", text=content.text))
                 elif isinstance(content, ImageAIMessageContent):
+                    if self.image_store:
+                        image = ResponseInputImageParam(
+                            type="input_image", file_id=self.image_store.reference(content).id, detail="auto"
+                        )
+                    else:
+                        image = ResponseInputImageParam(
+                            type="input_image", image_url=content.to_base64_url(), detail="auto"
+                        )
                     content_buffer.extend(
                         [
                             ResponseInputTextParam(type="input_text", text=f"Next image filename: {content.file_name}"),
-                            ResponseInputImageParam(
-                                type="input_image", image_url=content.to_base64_url(), detail="auto"
-                            ),
+                            image,
                         ]
                     )
                 elif isinstance(content, ToolCallAIMessageContent):
@@ -145,6 +160,14 @@ class AnthropicConverter(MessageConverter):
 
     def convert(self, messages: List[AIMessage]) -> List[Dict[str, Any]]:
         """Convert to Anthropic API format."""
+        from anthropic.types import (
+            TextBlockParam,
+            ImageBlockParam,
+            Base64ImageSourceParam,
+            ToolUseBlockParam,
+            ToolResultBlockParam,
+        )
+
         api_messages = []
 
         for message in messages:
@@ -154,15 +177,17 @@ class AnthropicConverter(MessageConverter):
                 if isinstance(item, TextAIMessageContent):
                     content.append(TextBlockParam(type="text", text=item.text))
                 elif isinstance(item, ImageAIMessageContent):
+                    if self.image_store:
+                        # File sources require the files-api beta of the Anthropic API
+                        source = {"type": "file", "file_id": self.image_store.reference(item).id}
+                    else:
+                        source = Base64ImageSourceParam(
+                            type="base64", data=item.to_base64(), media_type=item.media_type()
+                        )
                     content.extend(
                         [
                             TextBlockParam(type="text", text=f"Next image file name: {item.file_name}"),
-                            ImageBlockParam(
-                                type="image",
-                                source=Base64ImageSourceParam(
-                                    type="base64", data=item.to_base64(), media_type=item.media_type()
-                                ),
-                            ),
+                            ImageBlockParam(type="image", source=source),
                         ]
                     )
                 elif isinstance(item, ToolCallAIMessageContent):
@@ -178,8 +203,10 @@ class AnthropicConverter(MessageConverter):
 class GeminiConverter(MessageConverter):
     """Converter for Google Gemini API format."""
 
-    def convert(self, messages: List[AIMessage]) -> List[genai_types.ContentDict]:
+    def convert(self, messages: List[AIMessage]) -> "List[genai_types.ContentDict]":
         """Convert to Gemini API format."""
+        from google.genai import types as genai_types
+
         contents = []
 
         for message in messages:
@@ -189,12 +216,12 @@ class GeminiConverter(MessageConverter):
                 if isinstance(content, TextAIMessageContent):
                     parts.append({"text": content.text})
                 elif isinstance(content, ImageAIMessageContent):
-                    parts.extend(
-                        [
-                            {"text": f"Next image file name: {content.file_name}"},
-                            {"inline_data": {"data": content.binary_content, "mime_type": content.media_type()}},
-                        ]
-                    )
+                    uploaded = self.image_store.reference(content) if self.image_store else None
+                    if uploaded and uploaded.uri:
+                        image = {"file_data": {"file_uri": uploaded.uri, "mime_type": uploaded.media_type}}
+                    else:
+                        image = {"inline_data": {"data": content.binary_content, "mime_type": content.media_type()}}
+                    parts.extend([{"text": f"Next image file name: {content.file_name}"}, image])
                 elif isinstance(content, ToolCallAIMessageContent):
                     part = genai_types.Part.from_function_call(name=content.name, args=content.arguments)
                     # Add thought_signature if present
@@ -264,8 +291,13 @@ class ConverterProvider(Enum):
     AMAZON_NOVA = "amazon_nova"
 
 
-def get_converter(provider: Union[ConverterProvider, str]) -> MessageConverter:
-    """Factory function to get the appropriate message converter."""
+def get_converter(
+    provider: Union[ConverterProvider, str], image_store: Optional[ImageStore] = None
+) -> MessageConverter:
+    """
+    Factory function to get the appropriate message converter.
+    Amazon Nova has no file API, so it always inlines images and ignores the image store.
+    """
     if isinstance(provider, str):
         try:
             provider = ConverterProvider(provider)
@@ -273,13 +305,13 @@ def get_converter(provider: Union[ConverterProvider, str]) -> MessageConverter:
             raise ValueError(f"Unknown converter provider: {provider}")
 
     if provider == ConverterProvider.OPENAI_COMPLETIONS:
-        return OpenAICompletionsConverter()
+        return OpenAICompletionsConverter(image_store)
     elif provider == ConverterProvider.OPENAI_RESPONSES:
-        return OpenAIResponsesConverter()
+        return OpenAIResponsesConverter(image_store)
     elif provider == ConverterProvider.ANTHROPIC:
-        return AnthropicConverter()
+        return AnthropicConverter(image_store)
     elif provider == ConverterProvider.GEMINI:
-        return GeminiConverter()
+        return GeminiConverter(image_store)
     elif provider == ConverterProvider.AMAZON_NOVA:
         return AmazonNovaConverter()
     else:
@@ -7,6 +7,9 @@ from Utils.llm.ai_tool import AIToolSet
 from Utils.llm.config import Model, default_temperature
 from Utils.llm.ai_message import AIMessage
 from Utils.llm.message_converter import get_converter, ConverterProvider
+from Utils.llm.image_store import get_image_store
+from Utils.llm.latency import get_request_timeouts
+from Utils.llm.errors import map_exception
 
 
 def request_data(
@@ -31,13 +34,13 @@ def request_data(
         config = model()
 
         # Initialize OpenAI client with appropriate base URL and API key
-        client_kwargs = {"api_key": config["api_key"]}
+        client_kwargs = {"api_key": config["api_key"], "timeout": get_request_timeouts(model).http_timeout()}
         if "url" in config and config["url"] != "https://api.openai.com/v1":
             client_kwargs["base_url"] = config["url"]
 
         client = OpenAI(**client_kwargs)
     except Exception as e:
-        raise Exception(f"Failed to initialize OpenAI client: {e}")
+        raise map_exception(e, "Failed to initialize OpenAI client") from e
 
     skip_system = config.get("skip_system", False)
     extra_params = config.get("extra_params", {})
@@ -49,7 +52,7 @@ def request_data(
     if not skip_system:
         api_messages.append({"role": system_role_name, "content": system_prompt})
 
-    converter = get_converter(ConverterProvider.OPENAI_COMPLETIONS)
+    converter = get_converter(ConverterProvider.OPENAI_COMPLETIONS, get_image_store(model.provider))
     formatted_messages = converter.convert(messages)
     api_messages.extend(formatted_messages)
 
@@ -76,7 +79,7 @@ def request_data(
     try:
         response = client.chat.completions.create(**request_params)
     except Exception as e:
-        raise Exception(f"OpenAI Completions request failed: {e}")
+        raise map_exception(e, "OpenAI Completions request failed") from e
 
     # Extract response data
     message = response.choices[0].message
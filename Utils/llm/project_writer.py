@@ -0,0 +1,101 @@
+import hashlib
+import json
+import os
+import posixpath
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+
+def serialize_content(content: Any) -> str:
+    """Text content is written as is, structured content (e.g. a parsed package.json) is dumped as JSON"""
+    if isinstance(content, str):
+        return content
+    return json.dumps(content, indent=4)
+
+
+class PartialCommitError(OSError):
+    """A rename failed after some files of the batch were already in place"""
+
+    def __init__(self, written: List[str], error: OSError):
+        super().__init__(f"{len(written)} files were written before the error: {error}")
+        self.written = written
+
+
+class ProjectWriter:
+    """
+    Writes generated project files into output_path.
+
+    All files of a commit are first written to temporary files next to their targets and renamed
+    into place only when every write succeeded, so a failed write leaves no file of the batch behind.
+    The renames themselves are not atomic as a whole: if one fails, the files renamed before it stay,
+    see PartialCommitError. Sizes and hashes of the files in place are recorded in a manifest.
+    """
+
+    MANIFEST_NAME = "files_manifest.json"
+
+    def __init__(self, output_path: Path):
+        self.output_path = Path(output_path)
+        self.manifest: Dict[str, Dict[str, Any]] = {}
+
+    def normalize(self, file_path: str) -> str:
+        path = posixpath.normpath(str(file_path).strip().replace("\\", "/")).lstrip("/")
+        if path in ("", ".", "..") or path.startswith("../"):
+            raise ValueError(f"Invalid file path {file_path}")
+        if path == self.MANIFEST_NAME:
+            raise ValueError(f"{self.MANIFEST_NAME} is reserved")
+        return path
+
+    def commit(self, files: Dict[str, Any]) -> List[str]:
+        """
+        Write a batch of files, returns their normalized paths.
+        Raises ValueError for invalid paths, OSError if no file was written
+        and PartialCommitError if only some of them were.
+        """
+        staged: Dict[str, bytes] = {
+            self.normalize(file_path): serialize_content(content).encode("utf-8")
+            for file_path, content in files.items()
+        }
+
+        temp_files: List[Tuple[Path, Path]] = []
+        try:
+            for path, data in staged.items():
+                target = self.output_path / path
+                target.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+                temp_files.append((temp_path, target))
+                with open(temp_path, "wb") as file:
+                    file.write(data)
+        except OSError:
+            for temp_path, _ in temp_files:
+                temp_path.unlink(missing_ok=True)
+            raise
+
+        written: List[str] = []
+        try:
+            for path, (temp_path, target) in zip(staged, temp_files):
+                os.replace(temp_path, target)
+                written.append(path)
+        except OSError as e:
+            for temp_path, _ in temp_files[len(written) :]:
+                temp_path.unlink(missing_ok=True)
+            if not written:
+                raise
+            self._record(staged, written)
+            raise PartialCommitError(written, e) from e
+
+        self._record(staged, written)
+        return written
+
+    def _record(self, staged: Dict[str, bytes], written: List[str]):
+        for path in written:
+            data = staged[path]
+            self.manifest[path] = {"size": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+        self._write_manifest()
+
+    def _write_manifest(self):
+        manifest_path = self.output_path / self.MANIFEST_NAME
+        temp_path = manifest_path.with_name(f".{manifest_path.name}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump({"files": dict(sorted(self.manifest.items()))}, file, indent=4)
+        os.replace(temp_path, manifest_path)
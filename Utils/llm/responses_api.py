@@ -1,6 +1,6 @@
 import json
 from datetime import datetime
-from time import sleep
+from time import sleep, time
 from typing import List, Dict, Any
 from openai import OpenAI
 from openai.types.shared_params import Reasoning
@@ -16,6 +16,9 @@ from openai.types.responses import (
 from Utils.llm.ai_message import AIMessage, TextAIMessageContent
 from Utils.llm.ai_tool import AIToolSet
 from Utils.llm.message_converter import get_converter, ConverterProvider
+from Utils.llm.image_store import get_image_store
+from Utils.llm.latency import get_request_timeouts
+from Utils.llm.errors import map_exception
 from Utils.llm.config import Model, default_temperature
 
 
@@ -39,15 +42,18 @@ def request_data(
     config = model()
     developer_message: List[ResponseInputItemParam] = [EasyInputMessageParam(role="developer", content=system_prompt)]
 
-    converter = get_converter(ConverterProvider.OPENAI_RESPONSES)
+    converter = get_converter(ConverterProvider.OPENAI_RESPONSES, get_image_store(model.provider))
     input_messages = converter.convert(messages)
 
     verbosity_level = config.get("verbosity")
     verbosity = {"verbosity": verbosity_level} if verbosity_level else None
     background = config.get("background", False)
+    timeouts = get_request_timeouts(model)
+    deadline = time() + timeouts.total
 
     try:
-        client = OpenAI()
+        # A background request returns at once and is polled, so only the polling is bound by the total timeout
+        client = OpenAI(timeout=timeouts.http_timeout(streaming=background))
         resp = client.responses.create(
             text=verbosity,
             tools=tools.to_openai_responses_format() if tools else None,
@@ -59,18 +65,21 @@ def request_data(
             background=background,
         )
     except Exception as e:
-        raise Exception(f"Failed to initialize Responses API client or create response: {e}")
+        raise map_exception(e, "Failed to initialize Responses API client or create response") from e
 
     if background:
         try:
             while resp.status in {"queued", "in_progress"}:
+                if time() > deadline:
+                    client.responses.cancel(resp.id)
+                    raise TimeoutError(f"Response {resp.id} is not ready after {timeouts.total} seconds")
                 print(f"\r\tResponse status: {resp.status} | Last update: {datetime.now()}", end="", flush=True)
                 sleep(10)
                 resp = client.responses.retrieve(resp.id)
 
             print()
         except Exception as e:
-            raise Exception(f"Failed to retrieve response: {e}")
+            raise map_exception(e, "Failed to retrieve response") from e
 
     response = resp.output
 
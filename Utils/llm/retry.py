@@ -0,0 +1,89 @@
+import random
+from typing import Any, Dict, Optional
+
+from Utils.llm.config import ModelProvider
+from Utils.llm.errors import APIException, RateLimitError
+
+
+class RetryPolicy:
+    """
+    When and how long to wait before retrying a failed request.
+
+    Rate limit errors have their own retry budget, so waiting out a quota does not use up the
+    retries of real failures. Delays grow exponentially with random jitter, so workers that failed
+    together do not retry together, and a server Retry-After hint is used instead when given.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 2,
+        max_rate_limit_retries: int = 8,
+        base_delay: float = 5,
+        rate_limit_base_delay: float = 20,
+        max_delay: float = 120,
+        max_retry_after: float = 600,
+        jitter: float = 0.5,
+    ):
+        self.max_retries = max_retries
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self.base_delay = base_delay
+        self.rate_limit_base_delay = rate_limit_base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.jitter = jitter
+
+    def should_retry(self, error: APIException, retries: int, rate_limit_retries: int) -> bool:
+        """retries and rate_limit_retries are the retries already made for each kind of error"""
+        if not error.retryable:
+            return False
+        if isinstance(error, RateLimitError):
+            return rate_limit_retries < self.max_rate_limit_retries
+        return retries < self.max_retries
+
+    def delay(self, error: APIException, retry_number: int) -> float:
+        """Seconds to wait before the retry_number-th retry (starting at 1) of this kind of error"""
+        if error.retry_after is not None:
+            # A small jitter on top of the hint keeps retries of concurrent requests apart
+            return min(error.retry_after, self.max_retry_after) + random.uniform(0, 1)
+        base_delay = self.rate_limit_base_delay if isinstance(error, RateLimitError) else self.base_delay
+        delay = min(base_delay * 2 ** (retry_number - 1), self.max_delay)
+        return delay * (1 - self.jitter * random.random())
+
+
+class RetryRecord:
+    """
+    One retry made by ask_model. Responses carry it as a plain dict (to_dict), so they stay JSON serializable,
+    the record formats it for the log.
+    """
+
+    error: str
+    status_code: Optional[int]
+    delay: float
+
+    def __init__(self, error: str, status_code: Optional[int], delay: float):
+        self.error = error
+        self.status_code = status_code
+        self.delay = delay
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"error": self.error, "status_code": self.status_code, "delay": self.delay}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RetryRecord":
+        return cls(data["error"], data["status_code"], data["delay"])
+
+    def __repr__(self):
+        return f"{self.error}({self.status_code}) retried after {self.delay:.1f}s"
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+# Providers whose quotas refill slowly wait longer between rate limited retries
+provider_retry_policies: Dict[ModelProvider, RetryPolicy] = {
+    ModelProvider.VERTEXAI_ANTHROPIC: RetryPolicy(rate_limit_base_delay=30),
+    ModelProvider.AMAZON: RetryPolicy(rate_limit_base_delay=30),
+}
+
+
+def get_retry_policy(provider: ModelProvider) -> RetryPolicy:
+    return provider_retry_policies.get(provider, DEFAULT_RETRY_POLICY)
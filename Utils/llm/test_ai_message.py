@@ -0,0 +1,99 @@
+"""Tests for the message data model and its serialization."""
+
+import json
+import pickle
+
+import pytest
+
+from Utils.llm.ai_message import (
+    AIMessage,
+    AIMessageContentFactory,
+    ImageAIMessageContent,
+    ModelResponse,
+    TextAIMessageContent,
+    dump_messages,
+    load_messages,
+)
+from Utils.llm.retry import RetryRecord
+
+
+def agent_messages():
+    return [
+        AIMessage.create_user_message(
+            [
+                AIMessageContentFactory.create_text("Convert it"),
+                AIMessageContentFactory.create_image("a.png", b"\x89PNG"),
+            ]
+        ),
+        AIMessage.create_assistant_message(
+            [AIMessageContentFactory.create_tool_call("read_file", {"file_path": "app.js"}, "call_1", b"\x00\xff")],
+            use_model_role=True,
+        ),
+        AIMessage.create_user_message([AIMessageContentFactory.create_tool_response("read_file", "code", "call_1")]),
+    ]
+
+
+class TestMessages:
+    """Tests for immutable, hashable messages."""
+
+    def test_immutable_and_slotted(self):
+        """Test that messages and contents refuse changes and keep no instance dict."""
+        message = AIMessage.create_user_message("Hello")
+
+        with pytest.raises(AttributeError):
+            message.role = "assistant"
+        with pytest.raises(AttributeError):
+            message.content[0].text = "Bye"
+        with pytest.raises(AttributeError):
+            message.content.append(TextAIMessageContent("Bye"))
+        assert not hasattr(message, "__dict__")
+        assert not hasattr(message.content[0], "__dict__")
+
+    def test_equal_messages_deduplicate(self):
+        """Test that equal messages are equal and hash alike."""
+        first, second = agent_messages(), agent_messages()
+
+        assert first == second
+        assert len(set(first + second)) == 3
+        assert first[0] != first[2]
+        assert first[1].with_content(TextAIMessageContent("Done")).content[-1] == TextAIMessageContent("Done")
+        assert len(first[1].content) == 1
+
+    def test_lossless_round_trip(self):
+        """Test that images and signatures survive dumping, loading and pickling."""
+        messages = agent_messages()
+        dumped = dump_messages(messages)
+
+        assert " " not in dumped.replace("Convert it", "")
+        assert load_messages(dumped) == messages
+        assert load_messages(json.loads(dumped))[1].content[0].signature == b"\x00\xff"
+        assert pickle.loads(pickle.dumps(messages)) == messages
+
+    def test_image_encodings_are_cached(self):
+        """Test that the base64 encoding of an immutable image is still computed once."""
+        image = ImageAIMessageContent("a.png", b"\x89PNG")
+
+        assert image.to_base64() is image.to_base64()
+        assert image.to_base64_url().startswith("data:image/png;base64,")
+
+
+class TestModelResponse:
+    """Tests for the typed model response."""
+
+    def test_mapping_compatibility(self):
+        """Test that the response is read both by key and by property."""
+        response = ModelResponse.answer("answer", {"input_tokens": 1, "output_tokens": 2}, 1.5, served_by="model")
+
+        assert response["content"] == response.content == "answer"
+        assert response.ok and "error" not in response
+        assert response.tool_calls == [] and response["thoughts"] is None
+        assert response.served_by == "model"
+        assert json.loads(json.dumps(response))["tokens"] == {"input_tokens": 1, "output_tokens": 2}
+
+    def test_failure_to_dict(self):
+        """Test that errors carry their retries and serialize to JSON."""
+        response = ModelResponse.failure("### Error: Timeout error\n", [RetryRecord("ServerError", 503, 5.0).to_dict()])
+
+        assert not response.ok and response.get("error") == response.error
+        assert response.to_dict()["retries"] == [{"error": "ServerError", "status_code": 503, "delay": 5.0}]
+        assert json.loads(json.dumps(response))["retries"] == response.retries
@@ -0,0 +1,46 @@
+"""Tests for tool schemas."""
+
+from Utils.llm.ai_tool import AITool, AIToolParameter, AIToolSet, ToolProvider
+
+
+def read_file_tool():
+    return AITool(
+        "read_file",
+        "Read a file",
+        [
+            AIToolParameter("file_path", "string", "Path to the file", required=True),
+            AIToolParameter("unit", "string", "Unit of the limit", enum_values=["lines", "bytes"]),
+        ],
+    )
+
+
+class TestToolSchemas:
+    """Tests for memoized provider schemas."""
+
+    def test_formats_are_converted_once(self):
+        """Test that every provider format is built once and rebuilt after a tool is added."""
+        tool_set = AIToolSet([read_file_tool()])
+
+        for provider in ToolProvider:
+            assert tool_set.to_format(provider) is tool_set.to_format(provider)
+
+        anthropic_tools = tool_set.to_anthropic_format()
+        gemini_tools = tool_set.to_gemini_format()
+        tool_set.add_tool(AITool("end_task", "End the task"))
+
+        assert len(tool_set.to_anthropic_format()) == 2 and len(anthropic_tools) == 1
+        assert len(tool_set.to_gemini_format()[0].function_declarations) == 2
+        assert len(gemini_tools[0].function_declarations) == 1
+
+    def test_schema_properties_per_strictness(self):
+        """Test that strict schemas require every parameter and accept null for optional ones."""
+        tool = read_file_tool()
+
+        properties, required = tool.schema_properties()
+        strict_properties, strict_required = tool.schema_properties(strict=True)
+
+        assert tool.schema_properties() == (properties, required) and tool.schema_properties()[0] is properties
+        assert required == ["file_path"]
+        assert strict_required == ["file_path", "unit"]
+        assert strict_properties["unit"]["type"] == ["string", "null"]
+        assert tool.to_openai_responses_format()["parameters"]["required"] == strict_required
@@ -0,0 +1,90 @@
+"""Tests for provider circuit breakers and failover."""
+
+import time
+
+import pytest
+
+from Utils.llm import api, circuit_breaker
+from Utils.llm.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, request_outcome
+from Utils.llm.config import Model
+from Utils.llm.errors import BadRequestError, RateLimitError, ServerError
+
+
+class FakeServerError(Exception):
+    status_code = 503
+
+
+@pytest.fixture(autouse=True)
+def reset_breakers():
+    circuit_breaker.configure_circuit_breakers()
+    yield
+    circuit_breaker.configure_circuit_breakers()
+    circuit_breaker.failover_models.clear()
+
+
+class TestCircuitBreaker:
+    """Tests for circuit states."""
+
+    def test_opens_on_failure_rate_and_recovers(self):
+        """Test that the circuit opens at the threshold and a successful probe closes it."""
+        breaker = CircuitBreaker("test", failure_rate=0.5, min_requests=4, cooldown=0.05)
+        for success in (True, False, True):
+            breaker.record(success)
+        assert breaker.state == CLOSED
+
+        breaker.record(False)
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+
+        time.sleep(0.06)
+        assert breaker.allow()
+        assert breaker.state == HALF_OPEN
+        assert not breaker.allow()
+        breaker.record(True)
+        assert breaker.state == CLOSED
+        assert breaker.allow()
+
+    def test_failed_probe_reopens(self):
+        """Test that a failed probe opens the circuit for another cooldown."""
+        breaker = CircuitBreaker("test", min_requests=1, cooldown=0.05)
+        breaker.record(False)
+        time.sleep(0.06)
+
+        assert breaker.allow()
+        breaker.record(False)
+
+        assert breaker.state == OPEN
+        assert breaker.opened == 2
+
+    def test_request_outcomes(self):
+        """Test that only endpoint health errors count as failures."""
+        assert request_outcome(ServerError(503, "")) is False
+        assert request_outcome(BadRequestError(400, "")) is True
+        assert request_outcome(RateLimitError(429, "")) is None
+
+
+class TestAskModelRouting:
+    """Tests for circuit breakers in ask_model."""
+
+    def test_fail_fast_and_failover(self, monkeypatch):
+        """Test that an open circuit fails fast or fails over to an equivalent model."""
+        circuit_breaker.configure_circuit_breakers(fail_fast_when_open=True, min_requests=1, cooldown=60)
+        requested = []
+
+        def request_model_data(system_prompt, messages, model, tools):
+            requested.append(model)
+            if model is Model.GPT41_0414:
+                raise FakeServerError("unavailable")
+            return {"content": "answer", "tokens": {"input_tokens": 1, "output_tokens": 1}}
+
+        monkeypatch.setattr(api, "request_model_data", request_model_data)
+        monkeypatch.setattr(api.time, "sleep", lambda seconds: None)
+
+        response = api.ask_model([], "", Model.GPT41_0414, verbose=False)
+        assert response["error"] == "### Error: Circuit of openai:https://api.openai.com/v1 is open\n"
+        assert requested == [Model.GPT41_0414]
+
+        circuit_breaker.register_failover(Model.GPT41_0414, Model.Grok4_0709)
+        response = api.ask_model([], "", Model.GPT41_0414, verbose=False)
+        assert response["content"] == "answer"
+        assert requested[-1] is Model.Grok4_0709
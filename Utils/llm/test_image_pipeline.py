@@ -0,0 +1,83 @@
+"""Tests for the multimodal image pipeline."""
+
+import io
+
+import pytest
+
+from Utils.llm.ai_message import ImageAIMessageContent
+from Utils.llm.image_pipeline import ImageBudget, ImagePipeline, fit_to_budget, image_dimensions
+
+
+def make_png(width, height):
+    image_module = pytest.importorskip("PIL.Image")
+    output = io.BytesIO()
+    image_module.new("RGB", (width, height), color=(200, 30, 30)).save(output, format="PNG")
+    return output.getvalue()
+
+
+def make_noise_png(width, height):
+    image_module = pytest.importorskip("PIL.Image")
+    output = io.BytesIO()
+    image_module.effect_noise((width, height), 64).convert("RGB").save(output, format="PNG")
+    return output.getvalue()
+
+
+class TestImageDimensions:
+    """Tests for header based image size detection."""
+
+    def test_png_and_gif_headers(self):
+        """Test that PNG and GIF sizes are read from headers."""
+        png_header = (
+            b"\x89PNG\r\n\x1a\n" + b"\x00\x00\x00\rIHDR" + (1917).to_bytes(4, "big") + (1107).to_bytes(4, "big")
+        )
+        gif_header = b"GIF89a" + (320).to_bytes(2, "little") + (200).to_bytes(2, "little")
+
+        assert image_dimensions(png_header) == (1917, 1107)
+        assert image_dimensions(gif_header) == (320, 200)
+        assert image_dimensions(b"not an image") is None
+
+
+class TestImagePipeline:
+    """Tests for loading and caching task images."""
+
+    def test_images_are_loaded_once(self, tmp_path):
+        """Test that the same folder returns the same image objects."""
+        (tmp_path / "b.png").write_bytes(b"second")
+        (tmp_path / "a.png").write_bytes(b"first")
+        pipeline = ImagePipeline()
+
+        images = pipeline.load(tmp_path)
+
+        assert [image.file_name for image in images] == ["a.png", "b.png"]
+        assert pipeline.load(tmp_path)[0] is images[0]
+        assert pipeline.load(tmp_path / "missing") == []
+
+    def test_encodings_are_cached(self):
+        """Test that base64 forms are computed once."""
+        image = ImageAIMessageContent("test.png", b"binary")
+
+        assert image.to_base64_url() == "data:image/png;base64,YmluYXJ5"
+        assert image.to_base64() is image.to_base64()
+        assert image.to_base64_url() is image.to_base64_url()
+
+    def test_large_images_are_downscaled(self, tmp_path):
+        """Test that images above the budget are resized and their payload is recorded."""
+        (tmp_path / "screenshot.png").write_bytes(make_png(2000, 1000))
+        pipeline = ImagePipeline(ImageBudget(max_long_edge=1000, max_bytes=5 * 1024 * 1024))
+
+        image = pipeline.load(tmp_path)[0]
+
+        assert image_dimensions(image.binary_content) == (1000, 500)
+        stats = pipeline.stats[str((tmp_path / "screenshot.png").resolve())]
+        assert stats.original_size == (2000, 1000)
+        assert stats.payload_size == (1000, 500)
+
+    def test_recompression_to_byte_budget(self):
+        """Test that images whose PNG encoding stays above the byte budget are recompressed as JPEG."""
+        image = ImageAIMessageContent("noise.png", make_noise_png(200, 200))
+
+        result = fit_to_budget(image, ImageBudget(max_long_edge=200, max_bytes=len(image.binary_content) // 2))
+
+        assert result.media_type() == "image/jpeg"
+        assert result.file_name == "noise.jpg"
+        assert len(result.binary_content) <= len(image.binary_content) // 2
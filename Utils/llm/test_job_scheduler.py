@@ -0,0 +1,48 @@
+"""Tests for longest-job-first scheduling."""
+
+from Utils.llm.job_scheduler import DurationModel, longest_first, makespan
+
+HEADER = "Experiment,Type,Category,Language,Models,Dataset,Complexity,Size,Attempt,Input,Reasons,Output,Time,Accuracy,Completeness\n"
+
+
+class FakeJob:
+    def __init__(self, experiment, task_name, estimated_input_tokens=0):
+        self.experiment = experiment
+        self.task_name = task_name
+        self.estimated_input_tokens = estimated_input_tokens
+        self.predicted_duration = 0.0
+
+
+class TestJobScheduler:
+    """Tests for duration prediction and ordering."""
+
+    def test_history_from_summary(self, tmp_path):
+        """Test that task durations are the median of recorded times and failed attempts are ignored."""
+        summary_path = tmp_path / "summary.csv"
+        summary_path.write_text(
+            HEADER
+            + "code_generation,component_generation,Form,React,Sonnet_4,ReactSelect,extra_high,high,1,1000,0,500,300\n"
+            + "code_generation,component_generation,Form,React,Sonnet_4,ReactSelect,extra_high,high,2,1000,0,500,100\n"
+            + "code_generation,component_generation,Form,React,Sonnet_4,ReactSelect,extra_high,high,3,1000,0,500,200\n"
+            + "code_generation,component_generation,Form,React,Sonnet_4,ReactSelect,extra_high,high,4,0,0,0,0\n"
+            + "code_documentation,code_explanation,Intro,none,Sonnet_4,none,none,none,1,3000,0,100,60\n",
+            encoding="utf-8",
+        )
+
+        duration_model = DurationModel.from_summaries([summary_path, tmp_path / "missing.csv"])
+
+        assert duration_model.predict("component_generation", "Form_ReactSelect_extra_high_high.md") == 200
+        assert duration_model.predict("code_explanation", "Intro.md") == 60
+        assert duration_model.predict("test_generation", "Unknown.md", 1000) == 660 / 6000 * 1000
+
+    def test_longest_first_reduces_makespan(self):
+        """Test that jobs are ordered by predicted duration, longest first."""
+        duration_model = DurationModel({("a", "long"): [100.0], ("a", "mid"): [40.0]}, 0.0, 0.01)
+        jobs = [FakeJob("a", "short.md", 1000), FakeJob("a", "mid.md"), FakeJob("a", "short.md", 1000)]
+        jobs.append(FakeJob("a", "long.md"))
+
+        ordered = longest_first(jobs, duration_model)
+
+        assert [job.predicted_duration for job in ordered] == [100.0, 40.0, 10.0, 10.0]
+        assert makespan([job.predicted_duration for job in ordered], 2) == 100.0
+        assert makespan([job.predicted_duration for job in jobs], 2) == 120.0
@@ -0,0 +1,114 @@
+"""Tests for latency history and hedged requests."""
+
+import threading
+import time
+
+import pytest
+
+from Utils.llm import latency
+from Utils.llm.config import Model
+from Utils.llm.latency import (
+    DEFAULT_TIMEOUTS,
+    AdaptiveTimeouts,
+    HedgingPolicy,
+    LatencyHistory,
+    disable_adaptive_timeouts,
+    enable_adaptive_timeouts,
+    get_request_timeouts,
+    percentile,
+)
+
+HEADER = "Experiment,Type,Category,Language,Models,Dataset,Complexity,Size,Attempt,Input,Reasons,Output,Time,Accuracy,Completeness\n"
+
+
+@pytest.fixture
+def history(monkeypatch):
+    history = LatencyHistory()
+    monkeypatch.setattr(latency, "_history", history)
+    return history
+
+
+class TestLatencyHistory:
+    """Tests for latency percentiles."""
+
+    def test_percentile_from_summaries_and_records(self, tmp_path):
+        """Test that summaries seed the history and new requests extend it."""
+        summary_path = tmp_path / "Output" / Model.GPT41_0414.model_id / "JS" / "summary.csv"
+        summary_path.parent.mkdir(parents=True)
+        rows = "".join(f"t,c,Task,React,m,none,none,none,1,100,0,10,{seconds}\n" for seconds in range(1, 10))
+        summary_path.write_text(HEADER + rows + "t,c,Task,React,m,none,none,none,2,0,0,0,0\n", encoding="utf-8")
+        history = LatencyHistory(tmp_path)
+
+        assert history.percentile(Model.GPT41_0414, 95) is None
+        history.record(Model.GPT41_0414, 100)
+
+        assert history.percentile(Model.GPT41_0414, 50) == 5
+        assert history.percentile(Model.GPT41_0414, 95) == 100
+        assert percentile([3, 1, 2], 0) == 1
+
+
+class TestHedgingPolicy:
+    """Tests for hedged requests."""
+
+    def test_slow_request_is_hedged(self, history):
+        """Test that a request slower than the percentile is duplicated and the first answer wins."""
+        for _ in range(10):
+            history.record(Model.GPT41_0414, 0.01)
+        policy = HedgingPolicy(budget=1.0)
+        calls = []
+        lock = threading.Lock()
+
+        def request():
+            with lock:
+                calls.append(len(calls))
+                call = calls[-1]
+            time.sleep(0.5 if call == 0 else 0.01)
+            return f"answer {call}"
+
+        assert policy.call(Model.GPT41_0414, request) == "answer 1"
+        assert (policy.stats.requests, policy.stats.hedged, policy.stats.hedge_wins) == (1, 1, 1)
+
+    def test_budget_and_failures(self, history):
+        """Test that hedges stay within the budget and a failed request falls back to the other one."""
+        for _ in range(10):
+            history.record(Model.GPT41_0414, 0.01)
+        policy = HedgingPolicy(budget=0.0)
+
+        assert policy.call(Model.GPT41_0414, lambda: time.sleep(0.05) or "slow") == "slow"
+        assert policy.stats.hedged == 0
+
+        policy = HedgingPolicy(budget=1.0)
+        calls = []
+
+        def failing_primary():
+            calls.append(1)
+            if len(calls) == 1:
+                time.sleep(0.1)
+                raise RuntimeError("stalled")
+            time.sleep(0.2)
+            return "hedge"
+
+        assert policy.call(Model.GPT41_0414, failing_primary) == "hedge"
+        with pytest.raises(RuntimeError):
+            HedgingPolicy(budget=0.0).call(Model.GPT41_0414, lambda: (_ for _ in ()).throw(RuntimeError("down")))
+
+
+class TestRequestTimeouts:
+    """Tests for configured and adaptive timeouts."""
+
+    def test_configured_and_adaptive_timeouts(self, history):
+        """Test that model entries override defaults and adaptive mode follows the p99 latency."""
+        assert get_request_timeouts(Model.GPT41_0414) is DEFAULT_TIMEOUTS
+        assert get_request_timeouts(Model.GPT5_Pro_1006).total == 4 * 3600
+        assert get_request_timeouts(Model.GPT41_0414).http_timeout().read == DEFAULT_TIMEOUTS.total
+        assert get_request_timeouts(Model.GPT41_0414).http_timeout(streaming=True).read == DEFAULT_TIMEOUTS.first_byte
+
+        for seconds in range(1, 101):
+            history.record(Model.GPT41_0414, seconds)
+        enable_adaptive_timeouts(AdaptiveTimeouts(multiplier=2.0, min_samples=20, min_total=60))
+        try:
+            timeouts = get_request_timeouts(Model.GPT41_0414)
+            assert (timeouts.connect, timeouts.first_byte, timeouts.total) == (10, 198, 198)
+            assert get_request_timeouts(Model.Sonnet_4) is DEFAULT_TIMEOUTS
+        finally:
+            disable_adaptive_timeouts()
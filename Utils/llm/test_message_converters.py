@@ -1,6 +1,10 @@
 """Comprehensive tests for message converters."""
 
+import urllib.request
+
 from Utils.llm.ai_message import AIMessage, AIMessageContentFactory
+from Utils.llm.config import ModelProvider
+from Utils.llm.image_store import ImageStore, LocalFileServer, enable_image_uploads, get_image_store
 from Utils.llm.message_converter import get_converter, ConverterProvider
 
 
@@ -448,6 +452,73 @@ class TestAmazonNovaConverter:
         assert content[2]["image"]["source"]["bytes"] == image_data
 
 
+class TestImageStoreReferences:
+    """Tests for converters sending uploaded image references instead of inline data."""
+
+    def image_messages(self):
+        return [
+            AIMessage.create_user_message(
+                [
+                    AIMessageContentFactory.create_text("Compare these screenshots"),
+                    AIMessageContentFactory.create_image("first.png", b"same_image"),
+                    AIMessageContentFactory.create_image("second.png", b"same_image"),
+                ]
+            )
+        ]
+
+    def test_image_uploaded_once(self):
+        """Test that identical images are uploaded once and served by the local file server."""
+        server = LocalFileServer()
+        try:
+            store = ImageStore(server)
+            get_converter(ConverterProvider.OPENAI_RESPONSES, store).convert(self.image_messages())
+            get_converter(ConverterProvider.ANTHROPIC, store).convert(self.image_messages())
+
+            assert store.uploads == 1
+            assert store.hits == 3
+            uploaded = next(iter(server.files.values()))
+            with urllib.request.urlopen(uploaded.uri) as response:
+                assert response.read() == b"same_image"
+                assert response.headers["Content-Type"] == "image/png"
+        finally:
+            server.close()
+
+    def test_provider_references(self):
+        """Test the reference format of every converter with an image store."""
+        server = LocalFileServer()
+        try:
+            store = ImageStore(server)
+            messages = self.image_messages()
+            uploaded = store.reference(messages[0].content[1])
+
+            completions = get_converter(ConverterProvider.OPENAI_COMPLETIONS, store).convert(messages)
+            assert completions[0]["content"][2]["image_url"]["url"] == uploaded.uri
+
+            responses = get_converter(ConverterProvider.OPENAI_RESPONSES, store).convert(messages)
+            assert responses[0]["content"][2]["file_id"] == uploaded.id
+            assert "image_url" not in responses[0]["content"][2]
+
+            anthropic = get_converter(ConverterProvider.ANTHROPIC, store).convert(messages)
+            assert anthropic[0]["content"][2]["source"] == {"type": "file", "file_id": uploaded.id}
+
+            gemini = get_converter(ConverterProvider.GEMINI, store).convert(messages)
+            assert gemini[0]["parts"][2] == {"file_data": {"file_uri": uploaded.uri, "mime_type": "image/png"}}
+
+            nova = get_converter(ConverterProvider.AMAZON_NOVA, store).convert(messages)
+            assert nova[0]["content"][2]["image"]["source"]["bytes"] == b"same_image"
+        finally:
+            server.close()
+
+    def test_uploads_refused_without_file_api(self):
+        """Test that Claude on Vertex AI keeps inlining images even when an uploader is passed."""
+        server = LocalFileServer()
+        try:
+            assert enable_image_uploads(ModelProvider.VERTEXAI_ANTHROPIC, server) is None
+            assert get_image_store(ModelProvider.VERTEXAI_ANTHROPIC) is None
+        finally:
+            server.close()
+
+
 def run_all_tests():
     """Run all tests manually."""
 
@@ -457,6 +528,7 @@ def run_all_tests():
         TestAnthropicConverter,
         TestGeminiConverter,
         TestAmazonNovaConverter,
+        TestImageStoreReferences,
     ]
 
     total_tests = 0
@@ -0,0 +1,125 @@
+"""Tests for the error taxonomy and the retry policy."""
+
+import json
+
+import pytest
+
+from Utils.llm import api
+from Utils.llm.config import Model
+from Utils.llm.errors import (
+    APIConnectionError,
+    APIException,
+    AuthenticationError,
+    BadRequestError,
+    RateLimitError,
+    RequestTimeoutError,
+    ServerError,
+    map_exception,
+)
+from Utils.llm.retry import RetryPolicy
+
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class FakeStatusError(Exception):
+    """Shaped like the status errors of the OpenAI and Anthropic SDKs"""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"Error code: {status_code}")
+        self.status_code = status_code
+        self.response = FakeResponse(headers or {})
+
+
+class FakeGeminiError(Exception):
+    def __init__(self, code, details):
+        super().__init__(f"{code} RESOURCE_EXHAUSTED")
+        self.code = code
+        self.details = details
+
+
+class APITimeoutError(Exception):
+    pass
+
+
+class TestErrorTaxonomy:
+    """Tests for mapping SDK errors."""
+
+    def test_status_errors(self):
+        """Test that status codes and server hints are kept."""
+        rate_limit = map_exception(FakeStatusError(429, {"retry-after": "12"}), "Request failed")
+
+        assert isinstance(rate_limit, RateLimitError)
+        assert (rate_limit.status_code, rate_limit.retry_after) == (429, 12.0)
+        assert rate_limit.content == "Request failed: Error code: 429"
+        assert map_exception(FakeStatusError(429, {"retry-after-ms": "1500"})).retry_after == 1.5
+        assert isinstance(map_exception(FakeStatusError(529)), ServerError)
+        assert isinstance(map_exception(FakeStatusError(401)), AuthenticationError)
+        assert isinstance(map_exception(FakeStatusError(400)), BadRequestError)
+
+    def test_sdk_specific_errors(self):
+        """Test Gemini retry info, Bedrock throttling, timeouts and connection errors."""
+        gemini_error = FakeGeminiError(429, {"error": {"details": [{"retryDelay": "37s"}]}})
+        boto_error = Exception("throttled")
+        boto_error.response = {"Error": {"Code": "ThrottlingException"}, "ResponseMetadata": {"HTTPStatusCode": 400}}
+
+        assert map_exception(gemini_error).retry_after == 37.0
+        assert isinstance(map_exception(boto_error), RateLimitError)
+        assert isinstance(map_exception(APITimeoutError("timed out")), RequestTimeoutError)
+        assert isinstance(map_exception(ConnectionRefusedError()), APIConnectionError)
+        assert type(map_exception(ValueError("unexpected"))) is APIException
+
+
+class TestRetryPolicy:
+    """Tests for retry decisions and delays."""
+
+    def test_backoff_and_budgets(self):
+        """Test exponential delays, Retry-After hints and separate rate limit budget."""
+        policy = RetryPolicy(max_retries=2, max_rate_limit_retries=3, base_delay=5, max_delay=12, jitter=0)
+        server_error = ServerError(500, "down")
+
+        assert [policy.delay(server_error, retry) for retry in (1, 2, 3)] == [5, 10, 12]
+        assert 7 <= policy.delay(RateLimitError(429, "slow down", retry_after=7), 1) <= 8
+        assert policy.should_retry(server_error, 1, 5)
+        assert not policy.should_retry(server_error, 2, 0)
+        assert policy.should_retry(RateLimitError(429, ""), 2, 2)
+        assert not policy.should_retry(BadRequestError(400, "too long"), 0, 0)
+
+    def test_ask_model_retries_iteratively(self, monkeypatch):
+        """Test that ask_model retries in a loop and reports its retries."""
+        errors = [FakeStatusError(429), FakeStatusError(503)]
+        sleeps = []
+
+        def request_model_data(system_prompt, messages, model, tools):
+            if errors:
+                raise errors.pop(0)
+            return {"content": "answer", "tokens": {"input_tokens": 1, "output_tokens": 1}}
+
+        monkeypatch.setattr(api, "request_model_data", request_model_data)
+        monkeypatch.setattr(api.time, "sleep", sleeps.append)
+
+        response = api.ask_model([], "", Model.GPT41_0414, verbose=False)
+
+        assert response["content"] == "answer"
+        assert json.loads(json.dumps(response))["retries"] == response["retries"]
+        assert [(record["error"], record["status_code"]) for record in response["retries"]] == [
+            ("RateLimitError", 429),
+            ("ServerError", 503),
+        ]
+        assert len(sleeps) == 2
+
+    def test_ask_model_fails_fast_on_bad_request(self, monkeypatch):
+        """Test that non retryable errors are returned without retries."""
+
+        def request_model_data(system_prompt, messages, model, tools):
+            raise FakeStatusError(400)
+
+        monkeypatch.setattr(api, "request_model_data", request_model_data)
+        monkeypatch.setattr(api.time, "sleep", pytest.fail)
+
+        response = api.ask_model([], "", Model.GPT41_0414, verbose=False)
+
+        assert response["error"] == "### Error: Error code: 400\n"
+        assert response["retries"] == []
@@ -0,0 +1,68 @@
+"""Tests for the offline token estimator."""
+
+from Utils.llm.ai_message import ImageAIMessageContent, TextAIMessageContent
+from Utils.llm.config import Model
+from Utils.llm.token_estimator import (
+    TokenEstimator,
+    calibrate,
+    estimate_image_tokens,
+    get_context_window,
+    get_input_token_limit,
+)
+
+
+def write_report(path, prompt, input_tokens):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        f"{prompt}\n\n## Run 1:\n### Answer:\nok\n\n"
+        f"### Tokens: {{'input_tokens': {input_tokens}, 'output_tokens': 10}}\n"
+        f"### Execution time: 1.5\n",
+        encoding="utf-8",
+    )
+
+
+class TestTokenEstimator:
+    """Tests for estimation, trimming and calibration."""
+
+    def test_estimate_text_and_images(self):
+        """Test that text is estimated by length and images by their dimensions."""
+        estimator = TokenEstimator("anthropic", 4.0)
+        png_header = b"\x89PNG\r\n\x1a\n" + b"\x00\x00\x00\rIHDR" + (1000).to_bytes(4, "big") + (750).to_bytes(4, "big")
+        image = ImageAIMessageContent("screen.png", png_header)
+
+        assert estimator.estimate("x" * 40, [TextAIMessageContent("y" * 400)]) == 110
+        assert estimate_image_tokens("anthropic", image) == 1000
+        assert estimate_image_tokens("gemini", image) == 258 * 2
+        assert estimator.estimate("", [image]) == 1000 + 3 + 10
+
+    def test_trim_text(self):
+        """Test that trimmed text fits the token budget and notes the omitted part."""
+        estimator = TokenEstimator("openai", 4.0)
+
+        trimmed = estimator.trim_text("a" * 1000, 100)
+
+        assert trimmed.startswith("a" * 380)
+        assert "620 characters omitted" in trimmed
+        assert estimator.trim_text("short", 100) == "short"
+
+    def test_calibration_from_reports(self, tmp_path):
+        """Test that calibration uses report history of the family and skips reports with images."""
+        tasks_path = tmp_path / "Tasks"
+        (tasks_path / "JS" / "code_fixing").mkdir(parents=True)
+        (tasks_path / "JS" / "code_fixing" / "system.txt").write_text("s" * 100, encoding="utf-8")
+        model_folder = tmp_path / "Output" / Model.GPT41_0414.model_id / "JS" / "code_fixing" / "result_1"
+        for index in range(5):
+            write_report(model_folder / f"task{index}" / f"task{index}_report_1.md", "p" * 900, 200)
+        write_report(model_folder / "images" / "images_report_1.md", "p\n[image: a.png]", 5000)
+
+        estimator = calibrate("openai", tmp_path, tasks_path)
+
+        assert estimator.samples == 5
+        assert estimator.chars_per_token == 5.0
+        assert calibrate("anthropic", tmp_path, tasks_path).samples == 0
+
+    def test_context_windows(self):
+        """Test that the longest model id prefix determines the context window."""
+        assert get_context_window(Model.GPT41_0414) == 1_047_576
+        assert get_context_window(Model.Grok4_0709) == 256_000
+        assert get_input_token_limit(Model.Grok4_0709) <= 256_000
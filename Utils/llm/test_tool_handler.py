@@ -0,0 +1,307 @@
+"""Tests for agent tool handlers and the dataset snapshot they share."""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from Utils.llm.dataset_index import DatasetSearchIndex
+from Utils.llm.dataset_vfs import DatasetFileSystem
+from Utils.llm.tool_handler import ToolHandlerFactory
+
+
+def make_dataset(root):
+    (root / "js" / "controllers").mkdir(parents=True)
+    (root / "index.html").write_text("<html></html>", encoding="utf-8")
+    (root / "js" / "app.js").write_text("angular.module('todo', []);\n", encoding="utf-8")
+    (root / "js" / "controllers" / "todo.js").write_text("function TodoCtrl() {}\n", encoding="utf-8")
+    (root / "logo.png").write_bytes(b"\x89PNG\r\n\x1a\n\xff\xfe")
+    return root
+
+
+class TestDatasetFileSystem:
+    """Tests for the in-memory dataset snapshot."""
+
+    def test_lists_all_files(self, tmp_path):
+        """Test that listing returns sorted posix paths relative to the root."""
+        dataset = DatasetFileSystem(make_dataset(tmp_path / "ToDoApp"))
+
+        assert dataset.list_files() == ["index.html", "js/app.js", "js/controllers/todo.js", "logo.png"]
+
+    def test_path_normalization(self, tmp_path):
+        """Test that model-provided path variants resolve to the same file."""
+        dataset = DatasetFileSystem(make_dataset(tmp_path / "ToDoApp"))
+
+        for path in [
+            "js/app.js",
+            "/js/app.js",
+            "./js/app.js",
+            "js\\app.js",
+            "js/controllers/../app.js",
+            "ToDoApp/js/app.js",
+        ]:
+            assert dataset.read_text(path) == "angular.module('todo', []);\n"
+
+    def test_rejects_paths_outside_root(self, tmp_path):
+        """Test that paths escaping the dataset root are not served."""
+        dataset = DatasetFileSystem(make_dataset(tmp_path / "ToDoApp"))
+
+        assert not dataset.exists("../secret.txt")
+        assert dataset.normalize("js/../../secret.txt") is None
+
+    def test_snapshot_is_not_affected_by_disk_changes(self, tmp_path):
+        """Test that the snapshot stays consistent after files change on disk."""
+        root = make_dataset(tmp_path / "ToDoApp")
+        dataset = DatasetFileSystem(root)
+        (root / "js" / "app.js").write_text("changed", encoding="utf-8")
+        (root / "new.js").write_text("new", encoding="utf-8")
+
+        assert dataset.read_text("js/app.js") == "angular.module('todo', []);\n"
+        assert "new.js" not in dataset
+
+
+class TestDatasetSearchIndex:
+    """Tests for the trigram search index."""
+
+    def test_candidates_are_narrowed_by_index(self, tmp_path):
+        """Test that only files containing the literal trigrams are scanned."""
+        index = DatasetSearchIndex(DatasetFileSystem(make_dataset(tmp_path / "ToDoApp")))
+
+        assert index.candidates("TodoCtrl") == ["js/controllers/todo.js"]
+        assert index.candidates("missing") == []
+        assert len(index.candidates("js")) == 3
+
+    def test_literal_regex_and_glob_search(self, tmp_path):
+        """Test literal, regex and glob filtered searches."""
+        index = DatasetSearchIndex(DatasetFileSystem(make_dataset(tmp_path / "ToDoApp")))
+
+        matches, limited = index.search("angular.MODULE")
+        assert [(m.file_path, m.line_number) for m in matches] == [("js/app.js", 1)]
+        assert not limited
+
+        matches, _ = index.search(r"function \w+Ctrl", regex=True)
+        assert [m.file_path for m in matches] == ["js/controllers/todo.js"]
+
+        assert index.search("html", glob="*.js")[0] == []
+        assert index.search("angular.MODULE", case_sensitive=True)[0] == []
+
+    def test_result_limit(self, tmp_path):
+        """Test that results are limited and the limit is reported."""
+        root = make_dataset(tmp_path / "ToDoApp")
+        (root / "many.js").write_text("const item = 1;\n" * 10, encoding="utf-8")
+        index = DatasetSearchIndex(DatasetFileSystem(root))
+
+        matches, limited = index.search("item", max_results=3)
+
+        assert len(matches) == 3
+        assert limited
+
+
+class TestToolHandlers:
+    """Tests for handlers created by ToolHandlerFactory."""
+
+    def test_handlers_are_reused(self, tmp_path):
+        """Test that the factory returns the same handler instance for every call."""
+        factory = ToolHandlerFactory(make_dataset(tmp_path / "ToDoApp"), tmp_path / "output")
+
+        assert factory.get_handler("read_file") is factory.get_handler("read_file")
+        assert factory.get_handler("list_files").dataset is factory.get_handler("read_file").dataset
+
+    def test_list_files(self, tmp_path):
+        """Test list_files tool response."""
+        factory = ToolHandlerFactory(make_dataset(tmp_path / "ToDoApp"), tmp_path / "output")
+
+        response = factory.get_handler("list_files").handle("list_files", {}, "call_1")
+
+        assert response.id == "call_1"
+        assert response.result.split("\n") == ["index.html", "js/app.js", "js/controllers/todo.js", "logo.png"]
+
+    def test_read_file(self, tmp_path):
+        """Test read_file tool response for existing, missing and binary files."""
+        factory = ToolHandlerFactory(make_dataset(tmp_path / "ToDoApp"), tmp_path / "output")
+        handler = factory.get_handler("read_file")
+
+        assert handler.handle("read_file", {"file_path": "js/app.js"}, "call_1").result == (
+            "[js/app.js: 28 bytes, 1 lines]\nangular.module('todo', []);\n"
+        )
+        assert "not found" in handler.handle("read_file", {"file_path": "missing.js"}, "call_2").result
+        assert "not a text file" in handler.handle("read_file", {"file_path": "logo.png"}, "call_3").result
+
+    def test_read_file_line_range(self, tmp_path):
+        """Test paginated read_file by lines."""
+        root = make_dataset(tmp_path / "ToDoApp")
+        (root / "big.js").write_text("".join(f"line {i}\n" for i in range(1, 11)), encoding="utf-8")
+        handler = ToolHandlerFactory(root, tmp_path / "output").get_handler("read_file")
+
+        result = handler.handle("read_file", {"file_path": "big.js", "offset": 2, "limit": 3}, "call_1").result
+
+        header, content = result.split("\n", 1)
+        assert header == "[big.js: 71 bytes, 10 lines, showing lines 3-5, use offset=5 to continue]"
+        assert content == "line 3\nline 4\nline 5\n"
+
+    def test_read_file_byte_range(self, tmp_path):
+        """Test paginated read_file by bytes."""
+        root = make_dataset(tmp_path / "ToDoApp")
+        handler = ToolHandlerFactory(root, tmp_path / "output").get_handler("read_file")
+
+        result = handler.handle("read_file", {"file_path": "js/app.js", "offset": 8, "limit": 6, "unit": "bytes"}, "1")
+
+        assert result.result == "[js/app.js: 28 bytes, 1 lines, showing bytes 8-14, use offset=14 to continue]\nmodule"
+
+    def test_read_file_byte_range_boundaries(self, tmp_path):
+        """Test that binary files fail as in the line mode and a split character is left for the next read."""
+        root = make_dataset(tmp_path / "ToDoApp")
+        (root / "euro.txt").write_text("a€b", encoding="utf-8")
+        handler = ToolHandlerFactory(root, tmp_path / "output").get_handler("read_file")
+
+        binary = handler.handle("read_file", {"file_path": "logo.png", "offset": 1, "unit": "bytes"}, "1").result
+        split = handler.handle("read_file", {"file_path": "euro.txt", "limit": 3, "unit": "bytes"}, "1").result
+        rest = handler.handle("read_file", {"file_path": "euro.txt", "offset": 2, "unit": "bytes"}, "1").result
+
+        assert binary == "Error: File at logo.png is not a text file."
+        assert split == "[euro.txt: 5 bytes, 1 lines, showing bytes 0-1, use offset=1 to continue]\na"
+        assert rest == "[euro.txt: 5 bytes, 1 lines, showing bytes 4-5]\nb"
+
+    def test_read_file_offset_beyond_end(self, tmp_path):
+        """Test that an offset past the end of the file is reported instead of an empty range."""
+        handler = ToolHandlerFactory(make_dataset(tmp_path / "ToDoApp"), tmp_path / "output").get_handler("read_file")
+
+        lines = handler.handle("read_file", {"file_path": "js/app.js", "offset": 10}, "1").result
+        byte_range = handler.handle("read_file", {"file_path": "js/app.js", "offset": 28, "unit": "bytes"}, "1").result
+
+        assert "offset 10 is beyond the end of js/app.js, it has 1 lines" in lines
+        assert "offset 28 is beyond the end of js/app.js, it has 28 bytes" in byte_range
+
+    def test_read_file_default_cap(self, tmp_path):
+        """Test that reads without limit are capped and keep whole lines."""
+        root = make_dataset(tmp_path / "ToDoApp")
+        (root / "huge.js").write_text(("y" * 99 + "\n") * 2000, encoding="utf-8")
+        handler = ToolHandlerFactory(root, tmp_path / "output").get_handler("read_file")
+
+        result = handler.handle("read_file", {"file_path": "huge.js"}, "call_1").result
+
+        header, content = result.split("\n", 1)
+        assert "showing lines 1-655" in header
+        assert len(content.encode("utf-8")) <= handler.MAX_RESPONSE_BYTES
+        assert content.endswith("\n")
+
+    def test_read_file_invalid_range(self, tmp_path):
+        """Test that invalid pagination arguments are reported to the model."""
+        handler = ToolHandlerFactory(make_dataset(tmp_path / "ToDoApp"), tmp_path / "output").get_handler("read_file")
+
+        result = handler.handle("read_file", {"file_path": "js/app.js", "limit": -1}, "call_1").result
+
+        assert result.startswith("Error: Invalid read_file arguments")
+
+    def test_read_files(self, tmp_path):
+        """Test that read_files returns several files in one response."""
+        handler = ToolHandlerFactory(make_dataset(tmp_path / "ToDoApp"), tmp_path / "output").get_handler("read_files")
+
+        result = handler.handle("read_files", {"file_paths": ["js/app.js", "missing.js", "index.html"]}, "1").result
+
+        assert result == (
+            "[js/app.js: 28 bytes, 1 lines]\nangular.module('todo', []);\n\n\n"
+            "Error: File at missing.js not found or file_path is incorrect.\n\n"
+            "[index.html: 13 bytes, 1 lines]\n<html></html>"
+        )
+
+    def test_read_files_invalid_paths(self, tmp_path):
+        """Test that paths which are not strings are reported to the model instead of raising."""
+        handler = ToolHandlerFactory(make_dataset(tmp_path / "ToDoApp"), tmp_path / "output").get_handler("read_files")
+
+        for file_paths in (["js/app.js", {"path": "index.html"}], [["js/app.js"]], "js/app.js", 42):
+            result = handler.handle("read_files", {"file_paths": file_paths}, "1").result
+
+            assert result.startswith("Error: Invalid read_files arguments"), file_paths
+
+    def test_read_files_byte_budget(self, tmp_path):
+        """Test that read_files stops at the byte budget and reports skipped files."""
+        root = make_dataset(tmp_path / "ToDoApp")
+        (root / "big.js").write_text("".join(f"line {i}\n" for i in range(1, 101)), encoding="utf-8")
+        handler = ToolHandlerFactory(root, tmp_path / "output").get_handler("read_files")
+
+        result = handler.handle("read_files", {"file_paths": ["big.js", "js/app.js"], "max_bytes": 50}, "1").result
+
+        assert result.startswith("[big.js: 792 bytes, 100 lines, showing lines 1-7, use offset=7 to continue]\n")
+        assert result.endswith("[Byte budget exhausted, not read: js/app.js. Request them in another call]")
+
+    def test_search_files(self, tmp_path):
+        """Test search_files tool response."""
+        handler = ToolHandlerFactory(make_dataset(tmp_path / "ToDoApp"), tmp_path / "output").get_handler(
+            "search_files"
+        )
+
+        assert handler.handle("search_files", {"pattern": "todo"}, "1").result == (
+            "js/app.js:1: angular.module('todo', []);\njs/controllers/todo.js:1: function TodoCtrl() {}"
+        )
+        assert handler.handle("search_files", {"pattern": "nothing"}, "2").result == "No matches found for nothing"
+        assert handler.handle("search_files", {"pattern": "(", "regex": True}, "3").result.startswith("Error")
+
+    def test_write_file(self, tmp_path):
+        """Test that write_file writes text and JSON content and records them in the manifest."""
+        output = tmp_path / "output"
+        handler = ToolHandlerFactory(make_dataset(tmp_path / "ToDoApp"), output).get_handler("write_file")
+
+        handler.handle("write_file", {"file_path": "/src/App.tsx", "content": "export {};"}, "1")
+        handler.handle("write_file", {"file_path": "package.json", "content": '{"name": "app"}'}, "2")
+        handler.handle("write_file", {"file_path": "tsconfig.json", "content": {"strict": True}}, "3")
+
+        assert (output / "src" / "App.tsx").read_text() == "export {};"
+        assert (output / "package.json").read_text() == '{"name": "app"}'
+        assert json.loads((output / "tsconfig.json").read_text()) == {"strict": True}
+        manifest = json.loads((output / "files_manifest.json").read_text())["files"]
+        assert list(manifest) == ["package.json", "src/App.tsx", "tsconfig.json"]
+        assert manifest["src/App.tsx"] == {"size": 10, "sha256": hashlib.sha256(b"export {};").hexdigest()}
+
+    def test_write_files(self, tmp_path):
+        """Test that write_files commits all files of the call."""
+        output = tmp_path / "output"
+        handler = ToolHandlerFactory(make_dataset(tmp_path / "ToDoApp"), output).get_handler("write_files")
+        files = [{"file_path": "src/a.ts", "content": "a"}, {"file_path": "src/b/b.ts", "content": "b"}]
+
+        result = handler.handle("write_files", {"files": files}, "1").result
+
+        assert result == "2 files written successfully"
+        assert (output / "src" / "a.ts").read_text() == "a"
+        assert (output / "src" / "b" / "b.ts").read_text() == "b"
+        assert not list(output.rglob("*.tmp"))
+
+    def test_write_files_is_atomic(self, tmp_path):
+        """Test that no file of the batch is written when one of them is invalid."""
+        output = tmp_path / "output"
+        handler = ToolHandlerFactory(make_dataset(tmp_path / "ToDoApp"), output).get_handler("write_files")
+        files = [{"file_path": "src/a.ts", "content": "a"}, {"file_path": "../escape.ts", "content": "b"}]
+
+        result = handler.handle("write_files", {"files": files}, "1").result
+
+        assert result.startswith("Failed to write files, none of them were written")
+        assert not output.exists() or not list(output.rglob("*.ts"))
+
+    def test_write_files_failed_rename(self, tmp_path, monkeypatch):
+        """Test that a rename failing partway removes the remaining temporary files and reports what was written."""
+        output = tmp_path / "output"
+        handler = ToolHandlerFactory(make_dataset(tmp_path / "ToDoApp"), output).get_handler("write_files")
+        files = [{"file_path": name, "content": name} for name in ("a.ts", "b.ts", "c.ts")]
+        replace = os.replace
+
+        def failing_replace(source, target):
+            if Path(target).name == "b.ts":
+                raise OSError("disk full")
+            replace(source, target)
+
+        monkeypatch.setattr("Utils.llm.project_writer.os.replace", failing_replace)
+        result = handler.handle("write_files", {"files": files}, "1").result
+
+        assert result.startswith("Failed to write files, only a.ts were written")
+        assert sorted(path.name for path in output.iterdir()) == ["a.ts", "files_manifest.json"]
+        assert list(json.loads((output / "files_manifest.json").read_text())["files"]) == ["a.ts"]
+
+    def test_unknown_tool(self, tmp_path):
+        """Test that unknown tools raise ValueError."""
+        factory = ToolHandlerFactory(make_dataset(tmp_path / "ToDoApp"), tmp_path / "output")
+
+        try:
+            factory.get_handler("delete_file")
+            assert False, "ValueError expected"
+        except ValueError as e:
+            assert "delete_file" in str(e)
@@ -0,0 +1,75 @@
+"""Tests for the shared work queue."""
+
+import time
+
+from Utils.llm.work_queue import DONE, FAILED, LEASED, PENDING, WorkQueue, run_worker
+
+
+class TestWorkQueue:
+    """Tests for leases, retries and workers."""
+
+    def test_claim_by_priority_once(self, tmp_path):
+        """Test that jobs are claimed highest priority first and only by one worker."""
+        queue = WorkQueue(tmp_path / "queue.sqlite3")
+
+        assert queue.put("short", "answer", {"task": "short"}, priority=10)
+        assert queue.put("long", "answer", {"task": "long"}, priority=100)
+        assert not queue.put("long", "answer", {"task": "long"}, priority=100)
+
+        first = queue.claim("worker-1")
+        second = queue.claim("worker-2")
+
+        assert (first.id, first.payload, first.attempts) == ("long", {"task": "long"}, 1)
+        assert second.id == "short"
+        assert queue.claim("worker-3") is None
+        assert queue.claim("worker-3", ["judge"]) is None
+        assert not queue.complete("long", "worker-2")
+        assert queue.complete("long", "worker-1")
+        assert queue.counts() == {PENDING: 0, LEASED: 1, DONE: 1, FAILED: 0}
+
+    def test_expired_lease_is_retried(self, tmp_path):
+        """Test that jobs of dead workers are handed out again until they run out of attempts."""
+        queue = WorkQueue(tmp_path / "queue.sqlite3", lease_seconds=0.05, max_attempts=2)
+        queue.put("job", "answer", {})
+
+        assert queue.claim("dead-worker").attempts == 1
+        time.sleep(0.1)
+        assert not queue.heartbeat("job", "another-worker")
+        retried = queue.claim("worker-2")
+        assert retried.attempts == 2
+        assert not queue.heartbeat("job", "dead-worker")
+        time.sleep(0.1)
+
+        assert queue.claim("worker-3") is None
+        assert queue.counts()[FAILED] == 1
+
+    def test_worker_retries_failed_jobs(self, tmp_path):
+        """Test that a failing handler releases its job for a retry."""
+        queue = WorkQueue(tmp_path / "queue.sqlite3", max_attempts=3)
+        queue.put("flaky", "answer", {"value": 1})
+        queue.put("broken", "answer", {"value": 2})
+        calls = []
+
+        def handler(payload):
+            calls.append(payload["value"])
+            if payload["value"] == 2 or calls.count(1) < 2:
+                raise RuntimeError("provider unavailable")
+
+        completed = run_worker(queue, {"answer": handler}, "worker", poll_interval=0)
+
+        assert completed == 1
+        assert calls.count(1) == 2
+        assert calls.count(2) == 3
+        assert queue.counts() == {PENDING: 0, LEASED: 0, DONE: 1, FAILED: 1}
+
+    def test_worker_ignores_other_kinds(self, tmp_path):
+        """Test that a worker stops once its own kinds are drained, while jobs of other kinds are pending."""
+        queue = WorkQueue(tmp_path / "queue.sqlite3")
+        queue.put("answer", "answer", {})
+        queue.put("judge", "judge", {})
+
+        completed = run_worker(queue, {"answer": lambda payload: None}, "worker", poll_interval=0)
+
+        assert completed == 1
+        assert queue.counts(["judge"]) == {PENDING: 1, LEASED: 0, DONE: 0, FAILED: 0}
+        assert queue.counts(["answer"])[DONE] == 1
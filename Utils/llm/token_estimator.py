@@ -0,0 +1,204 @@
+import math
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from Utils.llm.ai_message import AIMessageContent, ImageAIMessageContent
+from Utils.llm.config import Model, ModelProvider
+from Utils.llm.image_pipeline import image_dimensions
+
+# Provider family: models of one family share a tokenizer closely enough for estimation
+provider_to_family = {
+    ModelProvider.OPENAI: "openai",
+    ModelProvider.OPENAI_RESPONSES: "openai",
+    ModelProvider.AZURE: "openai",
+    ModelProvider.VERTEXAI_ANTHROPIC: "anthropic",
+    ModelProvider.AISTUDIO: "gemini",
+    ModelProvider.VERTEXAI: "gemini",
+    ModelProvider.XAI: "xai",
+    ModelProvider.FIREWORKS: "fireworks",
+    ModelProvider.AMAZON: "amazon",
+}
+
+# Characters per token for source code heavy prompts, used until enough history is recorded
+default_chars_per_token = {
+    "openai": 3.6,
+    "anthropic": 3.2,
+    "gemini": 3.7,
+    "xai": 3.5,
+    "fireworks": 3.4,
+    "amazon": 3.4,
+}
+
+# Model id prefix: context window in tokens, the longest matching prefix wins
+context_windows = {
+    "gpt-4.1": 1_047_576,
+    "gpt-5": 400_000,
+    "codex-mini": 200_000,
+    "gpt-oss": 131_072,
+    "openai/gpt-oss": 131_072,
+    "claude-": 200_000,
+    "gemini-": 1_048_576,
+    "grok-4-0709": 256_000,
+    "grok-code": 256_000,
+    "grok-4-fast": 2_000_000,
+    "grok-4-1-fast": 2_000_000,
+    "us.amazon.nova-premier": 1_000_000,
+    "accounts/fireworks/models/minimax": 196_608,
+    "accounts/fireworks/models/deepseek": 163_840,
+    "accounts/fireworks/models/kimi": 262_144,
+}
+default_context_window = 128_000
+
+TOKENS_REGEX = re.compile(r"### Tokens: {'input_tokens': (\d+),")
+MIN_CALIBRATION_SAMPLES = 5
+MAX_CALIBRATION_REPORTS = 500
+
+
+def get_context_window(model: Model) -> int:
+    config = model()
+    if config.get("context_window"):
+        return config["context_window"]
+    model_id = config.get("model_id", "")
+    prefixes = [prefix for prefix in context_windows if model_id.startswith(prefix)]
+    return context_windows[max(prefixes, key=len)] if prefixes else default_context_window
+
+
+def get_input_token_limit(model: Model) -> int:
+    """Tokens available for the prompt, the context window minus the reserved output tokens"""
+    config = model()
+    max_tokens = config.get("max_tokens") or 0
+    return get_context_window(model) - max(max_tokens, 0)
+
+
+def estimate_image_tokens(family: str, image: ImageAIMessageContent) -> int:
+    """Approximate image token cost following the providers' documented formulas"""
+    size = image_dimensions(image.binary_content)
+    if size is None:
+        return 1000
+    width, height = size
+
+    if family == "anthropic":
+        # Docs: https://docs.anthropic.com/en/docs/build-with-claude/vision#calculate-image-costs
+        scale = min(1.0, 1568 / max(width, height))
+        return math.ceil(width * scale * height * scale / 750)
+    if family == "gemini":
+        # Docs: https://ai.google.dev/gemini-api/docs/image-understanding#technical-details-image
+        if width <= 384 and height <= 384:
+            return 258
+        return 258 * math.ceil(width / 768) * math.ceil(height / 768)
+
+    # Docs: https://platform.openai.com/docs/guides/images-vision#calculating-costs
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    return 85 + 170 * math.ceil(width * scale / 512) * math.ceil(height * scale / 512)
+
+
+class TokenEstimator:
+    """Offline input token estimator for one provider family"""
+
+    family: str
+    chars_per_token: float
+    samples: int
+
+    def __init__(self, family: str, chars_per_token: float, samples: int = 0):
+        self.family = family
+        self.chars_per_token = chars_per_token
+        self.samples = samples
+
+    def estimate_text(self, text: str) -> int:
+        return math.ceil(len(text) / self.chars_per_token)
+
+    def estimate(self, system_prompt: str, content: List[AIMessageContent]) -> int:
+        """Estimate input tokens of a request with the given system prompt and user message content"""
+        tokens = self.estimate_text(system_prompt or "")
+        for item in content:
+            if isinstance(item, ImageAIMessageContent):
+                tokens += estimate_image_tokens(self.family, item) + self.estimate_text(item.file_name) + 10
+            else:
+                tokens += self.estimate_text(str(item))
+        return tokens
+
+    def trim_text(self, text: str, max_tokens: int) -> str:
+        """Cut the text tail so it takes at most max_tokens, leaving a note about the omitted part"""
+        # Keep a margin for the estimation error, cutting too little only moves the failure to the provider
+        max_chars = max(int(max_tokens * self.chars_per_token * 0.95), 0)
+        if len(text) <= max_chars:
+            return text
+        return (
+            text[:max_chars] + f"\n\n[Truncated: {len(text) - max_chars} characters omitted to fit the context window]"
+        )
+
+
+def read_calibration_sample(report_path: Path, system_prompt_length: int) -> Optional[Tuple[int, int]]:
+    """Prompt length in characters and billed input tokens of a recorded report without images"""
+    try:
+        with open(report_path, "r", encoding="utf-8") as file:
+            data = file.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+    run_position = data.rfind("\n\n## Run ")
+    tokens_match = TOKENS_REGEX.search(data, max(run_position, 0))
+    if run_position == -1 or not tokens_match:
+        return None
+    prompt = data[:run_position]
+    if "[image: " in prompt:
+        return None
+    return len(prompt) + system_prompt_length, int(tokens_match.group(1))
+
+
+def calibrate(family: str, results_path: Path, tasks_path: Path) -> TokenEstimator:
+    """
+    Calibrate characters per token of the family against the "### Tokens:" history
+    of every model of the family found in the results repository.
+    """
+    chars = tokens = samples = 0
+    output_path = results_path / "Output"
+    family_models = {model.model_id for model in Model if provider_to_family.get(model.provider) == family}
+    system_prompt_lengths: Dict[Tuple[str, str], int] = {}
+
+    model_folders = (
+        [folder for folder in output_path.iterdir() if folder.name in family_models] if output_path.is_dir() else []
+    )
+    for model_folder in model_folders:
+        for report_path in model_folder.glob("*/*/result_*/*/*_report_*.md"):
+            if samples >= MAX_CALIBRATION_REPORTS:
+                break
+            lang, category = report_path.relative_to(model_folder).parts[:2]
+            if (lang, category) not in system_prompt_lengths:
+                system_path = tasks_path / lang / category / "system.txt"
+                system_prompt_lengths[(lang, category)] = (
+                    len(system_path.read_text("utf-8")) if system_path.exists() else 0
+                )
+
+            sample = read_calibration_sample(report_path, system_prompt_lengths[(lang, category)])
+            if sample and sample[1] > 0:
+                chars += sample[0]
+                tokens += sample[1]
+                samples += 1
+
+    if samples < MIN_CALIBRATION_SAMPLES:
+        return TokenEstimator(family, default_chars_per_token.get(family, 3.5), samples)
+    return TokenEstimator(family, chars / tokens, samples)
+
+
+_estimators: Dict[str, TokenEstimator] = {}
+_estimators_lock = threading.Lock()
+
+
+def get_token_estimator(model: Model) -> TokenEstimator:
+    """Estimator of the model's provider family, calibrated once per process from recorded reports"""
+    family = provider_to_family.get(model.provider, "openai")
+    with _estimators_lock:
+        if family not in _estimators:
+            results_repo_path = os.getenv("RESULTS_REPO_PATH")
+            tasks_path = Path(__file__).resolve().parent.parent.parent / "Scenarios" / "Tasks"
+            if results_repo_path:
+                _estimators[family] = calibrate(family, Path(results_repo_path).resolve(), tasks_path)
+            else:
+                _estimators[family] = TokenEstimator(family, default_chars_per_token.get(family, 3.5))
+        return _estimators[family]
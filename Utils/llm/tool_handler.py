@@ -1,9 +1,12 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict, Any, List
-import json
+from typing import Dict, Any, List, Tuple
+import re
 
 from Utils.llm.ai_message import AIMessageContentFactory, AIMessageContent
+from Utils.llm.dataset_vfs import DatasetFileSystem
+from Utils.llm.dataset_index import DatasetSearchIndex
+from Utils.llm.project_writer import PartialCommitError, ProjectWriter
 
 
 class ToolHandler(ABC):
@@ -18,72 +21,244 @@ class ToolHandler(ABC):
 class ListFilesHandler(ToolHandler):
     """Handler for list_files tool"""
 
-    def __init__(self, dataset_path: Path):
-        self.dataset_path = dataset_path
+    def __init__(self, dataset: DatasetFileSystem):
+        self.dataset = dataset
+        self._files_content = "\n".join(self._list_files())
 
     def handle(self, tool_name: str, tool_args: Dict[str, Any], tool_id: str, **kwargs) -> "AIMessageContent":
-        try:
-            file_list = self._list_files(self.dataset_path)
-            files_content = "\n".join(file_list)
-            return AIMessageContentFactory.create_tool_response(tool_name, files_content, tool_id)
-        except Exception as e:
-            error_content = f"Error: Could not list files directory files"
-            return AIMessageContentFactory.create_text(error_content)
-
-    def _list_files(self, base_path: Path) -> List[str]:
-        """List all files in the directory"""
-        file_list = []
-        for file_path in base_path.rglob("*"):
-            if file_path.is_file():
-                relative_path = file_path.relative_to(base_path)
-                file_list.append(str(relative_path))
-        return file_list
+        return AIMessageContentFactory.create_tool_response(tool_name, self._files_content, tool_id)
+
+    def _list_files(self) -> List[str]:
+        """List all files in the dataset snapshot"""
+        return self.dataset.list_files()
 
 
 class ReadFileHandler(ToolHandler):
     """Handler for read_file tool"""
 
-    def __init__(self, dataset_path: Path):
-        self.dataset_path = dataset_path
+    DEFAULT_LIMIT = {"lines": 1000, "bytes": 64 * 1024}
+    MAX_RESPONSE_BYTES = 64 * 1024
+
+    def __init__(self, dataset: DatasetFileSystem):
+        self.dataset = dataset
 
     def handle(self, tool_name: str, tool_args: Dict[str, Any], tool_id: str, **kwargs) -> "AIMessageContent":
         file_path = tool_args["file_path"]
-        full_path = self.dataset_path / file_path
 
         try:
-            with open(full_path, "r") as file:
-                file_content = file.read()
-                return AIMessageContentFactory.create_tool_response(tool_name, file_content, tool_id)
+            unit = tool_args.get("unit") or "lines"
+            if unit not in self.DEFAULT_LIMIT:
+                raise ValueError(f"unit must be one of {', '.join(self.DEFAULT_LIMIT)}")
+            offset = int(tool_args.get("offset") or 0)
+            limit = int(tool_args.get("limit") or self.DEFAULT_LIMIT[unit])
+            if offset < 0 or limit <= 0:
+                raise ValueError("offset must be non-negative and limit must be positive")
+
+            if unit == "lines":
+                file_content = self._read_lines(file_path, offset, limit, self.MAX_RESPONSE_BYTES)
+            else:
+                file_content = self._read_bytes(file_path, offset, limit)
+            return AIMessageContentFactory.create_tool_response(tool_name, file_content, tool_id)
         except FileNotFoundError:
             error_content = f"Error: File at {file_path} not found or file_path is incorrect."
             return AIMessageContentFactory.create_tool_response(tool_name, error_content, tool_id)
+        except UnicodeDecodeError:
+            error_content = f"Error: File at {file_path} is not a text file."
+            return AIMessageContentFactory.create_tool_response(tool_name, error_content, tool_id)
+        except (TypeError, ValueError) as e:
+            error_content = f"Error: Invalid read_file arguments: {e}"
+            return AIMessageContentFactory.create_tool_response(tool_name, error_content, tool_id)
+
+    def _read_lines(self, file_path: str, offset: int, limit: int, max_bytes: int) -> str:
+        total_lines = self.dataset.line_count(file_path)
+        if offset > 0 and offset >= total_lines:
+            raise ValueError(f"offset {offset} is beyond the end of {file_path}, it has {total_lines} lines")
+        content, lines_read = self.dataset.read_lines(file_path, offset, limit, max_bytes)
+        text = content.decode("utf-8")
+
+        header = self._header(file_path)
+        if offset > 0 or lines_read < total_lines:
+            header += f", showing lines {offset + 1}-{offset + lines_read}"
+        if offset + lines_read < total_lines:
+            header += f", use offset={offset + lines_read} to continue"
+        return f"[{header}]\n{text}"
+
+    def _read_bytes(self, file_path: str, offset: int, limit: int) -> str:
+        total_bytes = self.dataset.size(file_path)
+        if offset > 0 and offset >= total_bytes:
+            raise ValueError(f"offset {offset} is beyond the end of {file_path}, it has {total_bytes} bytes")
+        content = self.dataset.read_range(file_path, offset, min(limit, self.MAX_RESPONSE_BYTES))
+        text, start, end = self._decode_range(content, offset + len(content) < total_bytes)
+        # A character split at the start belongs to the previous read, one cut at the end is left for the next read
+        start, end = offset + start, offset + end
+
+        header = self._header(file_path)
+        if start > 0 or end < total_bytes:
+            header += f", showing bytes {start}-{end}"
+        if end < total_bytes:
+            header += f", use offset={end} to continue"
+        return f"[{header}]\n{text}"
+
+    @staticmethod
+    def _decode_range(content: bytes, cut: bool) -> Tuple[str, int, int]:
+        """
+        Decode a byte range strictly, so binary files fail as in the line mode, returns the text, the start and
+        the end of the decoded bytes. Only a multibyte character split by the range boundaries is dropped:
+        continuation bytes at the start and a partial character at a cut end.
+        """
+        start = 0
+        while start < min(len(content), 3) and 0x80 <= content[start] <= 0xBF:
+            start += 1
+        try:
+            return content[start:].decode("utf-8"), start, len(content)
+        except UnicodeDecodeError as e:
+            if not cut or e.reason != "unexpected end of data":
+                raise
+            return content[start : start + e.start].decode("utf-8"), start, start + e.start
+
+    def _header(self, file_path: str) -> str:
+        return f"{file_path}: {self.dataset.size(file_path)} bytes, {self.dataset.line_count(file_path)} lines"
+
+
+class ReadFilesHandler(ReadFileHandler):
+    """Handler for read_files tool, returns several files in one response within a byte budget"""
+
+    DEFAULT_MAX_BYTES = 256 * 1024
+    MAX_BYTES = 512 * 1024
+
+    def handle(self, tool_name: str, tool_args: Dict[str, Any], tool_id: str, **kwargs) -> "AIMessageContent":
+        file_paths = tool_args.get("file_paths") or []
+
+        try:
+            if not isinstance(file_paths, (list, tuple)) or not file_paths:
+                raise ValueError("file_paths must be a non-empty list of paths")
+            if not all(isinstance(file_path, str) for file_path in file_paths):
+                raise ValueError("every entry of file_paths must be a path string")
+            budget = min(int(tool_args.get("max_bytes") or self.DEFAULT_MAX_BYTES), self.MAX_BYTES)
+            if budget <= 0:
+                raise ValueError("max_bytes must be positive")
+        except (TypeError, ValueError) as e:
+            error_content = f"Error: Invalid read_files arguments: {e}"
+            return AIMessageContentFactory.create_tool_response(tool_name, error_content, tool_id)
+
+        sections = []
+        skipped = []
+        for file_path in dict.fromkeys(file_paths):
+            if budget <= 0:
+                skipped.append(file_path)
+                continue
+            try:
+                section = self._read_lines(file_path, 0, self.dataset.line_count(file_path), budget)
+            except FileNotFoundError:
+                section = f"Error: File at {file_path} not found or file_path is incorrect."
+            except UnicodeDecodeError:
+                section = f"Error: File at {file_path} is not a text file."
+            budget -= len(section.encode("utf-8"))
+            sections.append(section)
+
+        if skipped:
+            sections.append(f"[Byte budget exhausted, not read: {', '.join(skipped)}. Request them in another call]")
+        return AIMessageContentFactory.create_tool_response(tool_name, "\n\n".join(sections), tool_id)
+
+
+class SearchFilesHandler(ToolHandler):
+    """Handler for search_files tool"""
+
+    DEFAULT_MAX_RESULTS = 50
+    MAX_RESULTS = 200
+    MAX_LINE_LENGTH = 200
+
+    def __init__(self, dataset: DatasetFileSystem):
+        self.index = DatasetSearchIndex(dataset)
+
+    def handle(self, tool_name: str, tool_args: Dict[str, Any], tool_id: str, **kwargs) -> "AIMessageContent":
+        pattern = tool_args.get("pattern") or ""
+
+        try:
+            if not pattern:
+                raise ValueError("pattern must not be empty")
+            max_results = int(tool_args.get("max_results") or self.DEFAULT_MAX_RESULTS)
+            if max_results <= 0:
+                raise ValueError("max_results must be positive")
+
+            matches, limited = self.index.search(
+                pattern,
+                regex=bool(tool_args.get("regex")),
+                glob=tool_args.get("glob"),
+                case_sensitive=bool(tool_args.get("case_sensitive")),
+                max_results=min(max_results, self.MAX_RESULTS),
+            )
+        except re.error as e:
+            error_content = f"Error: Invalid regular expression {pattern}: {e}"
+            return AIMessageContentFactory.create_tool_response(tool_name, error_content, tool_id)
+        except (TypeError, ValueError) as e:
+            error_content = f"Error: Invalid search_files arguments: {e}"
+            return AIMessageContentFactory.create_tool_response(tool_name, error_content, tool_id)
+
+        if not matches:
+            return AIMessageContentFactory.create_tool_response(tool_name, f"No matches found for {pattern}", tool_id)
+
+        lines = []
+        for match in matches:
+            line = match.line.strip()
+            if len(line) > self.MAX_LINE_LENGTH:
+                line = line[: self.MAX_LINE_LENGTH] + "..."
+            lines.append(f"{match.file_path}:{match.line_number}: {line}")
+        if limited:
+            lines.append(f"[Results limited to {len(matches)} matches, narrow the pattern or glob to see more]")
+        return AIMessageContentFactory.create_tool_response(tool_name, "\n".join(lines), tool_id)
 
 
 class WriteFileHandler(ToolHandler):
     """Handler for write_file tool"""
 
-    def __init__(self, output_path: Path):
-        self.output_path = output_path
+    def __init__(self, writer: ProjectWriter):
+        self.writer = writer
 
     def handle(self, tool_name: str, tool_args: Dict[str, Any], tool_id: str, **kwargs) -> "AIMessageContent":
         file_path = tool_args["file_path"]
         content = tool_args["content"]
-        full_path = self.output_path / file_path.lstrip("/")
 
         try:
-            full_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(full_path, "w") as file:
-                if ".json" in file_path:
-                    json.dump(content, file, indent=4)
-                else:
-                    file.write(content)
-
+            self.writer.commit({file_path: content})
             return AIMessageContentFactory.create_tool_response(tool_name, "File written successfully", tool_id)
-        except IOError as e:
+        except (OSError, ValueError) as e:
             print(f"Failed to write file at {file_path}. Error: {e}")
             return AIMessageContentFactory.create_tool_response(tool_name, "Failed to write file", tool_id)
 
 
+class WriteFilesHandler(ToolHandler):
+    """Handler for write_files tool, commits all files of the call at once"""
+
+    def __init__(self, writer: ProjectWriter):
+        self.writer = writer
+
+    def handle(self, tool_name: str, tool_args: Dict[str, Any], tool_id: str, **kwargs) -> "AIMessageContent":
+        try:
+            files = {item["file_path"]: item["content"] for item in tool_args.get("files") or []}
+            if not files:
+                raise ValueError("files must be a non-empty list")
+        except (KeyError, TypeError, ValueError) as e:
+            error_content = f"Error: Invalid write_files arguments, expected a list of file_path and content: {e}"
+            return AIMessageContentFactory.create_tool_response(tool_name, error_content, tool_id)
+
+        try:
+            written = self.writer.commit(files)
+            return AIMessageContentFactory.create_tool_response(
+                tool_name, f"{len(written)} files written successfully", tool_id
+            )
+        except PartialCommitError as e:
+            print(f"Failed to write files {', '.join(files)}. Error: {e}")
+            return AIMessageContentFactory.create_tool_response(
+                tool_name, f"Failed to write files, only {', '.join(e.written)} were written: {e}", tool_id
+            )
+        except (OSError, ValueError) as e:
+            print(f"Failed to write files {', '.join(files)}. Error: {e}")
+            return AIMessageContentFactory.create_tool_response(
+                tool_name, f"Failed to write files, none of them were written: {e}", tool_id
+            )
+
+
 class FileStructureHandler(ToolHandler):
     """Handler for file_structure tool"""
 
@@ -97,19 +272,25 @@ class FileStructureHandler(ToolHandler):
 
 
 class ToolHandlerFactory:
-    """Factory for creating tool handlers"""
+    """Factory holding tool handlers for one agent session"""
 
-    @staticmethod
-    def create_handler(tool_name: str, dataset_path: Path, output_path: Path) -> ToolHandler:
-        """Create appropriate handler for the given tool"""
-        handlers = {
-            "list_files": ListFilesHandler(dataset_path),
-            "read_file": ReadFileHandler(dataset_path),
-            "write_file": WriteFileHandler(output_path),
+    def __init__(self, dataset_path: Path, output_path: Path):
+        # Snapshot the dataset once so every tool call sees the same tree without touching the disk
+        self.dataset = DatasetFileSystem(dataset_path)
+        self.writer = ProjectWriter(output_path)
+        self.handlers: Dict[str, ToolHandler] = {
+            "list_files": ListFilesHandler(self.dataset),
+            "read_file": ReadFileHandler(self.dataset),
+            "read_files": ReadFilesHandler(self.dataset),
+            "search_files": SearchFilesHandler(self.dataset),
+            "write_file": WriteFileHandler(self.writer),
+            "write_files": WriteFilesHandler(self.writer),
             "file_structure": FileStructureHandler(),
         }
 
-        if tool_name not in handlers:
+    def get_handler(self, tool_name: str) -> ToolHandler:
+        """Get appropriate handler for the given tool"""
+        if tool_name not in self.handlers:
             raise ValueError(f"Unknown tool: {tool_name}")
 
-        return handlers[tool_name]
+        return self.handlers[tool_name]
@@ -0,0 +1,226 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+
+class QueuedJob:
+    id: str
+    kind: str
+    payload: Dict[str, Any]
+    attempts: int
+
+    def __init__(self, id: str, kind: str, payload: Dict[str, Any], attempts: int):
+        self.id = id
+        self.kind = kind
+        self.payload = payload
+        self.attempts = attempts
+
+
+class WorkQueue:
+    """
+    Job queue shared by workers on any number of machines through one SQLite file,
+    e.g. next to the results in RESULTS_REPO_PATH on a shared file system with working file locks.
+
+    A claimed job is leased to its worker for lease_seconds and the worker keeps extending the
+    lease with heartbeats. When a worker dies its lease expires and the job is handed to another
+    worker, until it has been attempted max_attempts times.
+    """
+
+    def __init__(self, db_path: Path, lease_seconds: float = 300, max_attempts: int = 3):
+        self.db_path = Path(db_path)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    priority REAL NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    error TEXT,
+                    created REAL NOT NULL,
+                    updated REAL NOT NULL
+                )
+                """
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, priority DESC, created)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode, transactions are opened explicitly with BEGIN IMMEDIATE where a claim must be atomic.
+        # Callers close the connection, sqlite3's context manager would only commit
+        return sqlite3.connect(self.db_path, timeout=60, isolation_level=None)
+
+    @staticmethod
+    def _kind_filter(kinds: Optional[Iterable[str]]) -> tuple[str, list[str]]:
+        kinds = list(kinds or [])
+        return (f" AND kind IN ({', '.join('?' * len(kinds))})" if kinds else ""), kinds
+
+    def put(self, job_id: str, kind: str, payload: Dict[str, Any], priority: float = 0) -> bool:
+        """Enqueue a job, returns False if a job with the same id was already queued"""
+        now = time.time()
+        with closing(self._connect()) as connection:
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO jobs (id, kind, payload, priority, status, created, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), priority, PENDING, now, now),
+            )
+            return cursor.rowcount == 1
+
+    def claim(self, worker_id: str, kinds: Optional[Iterable[str]] = None) -> Optional[QueuedJob]:
+        """Lease the highest priority pending job, or a job whose lease has expired"""
+        kind_filter, kinds = self._kind_filter(kinds)
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            # Jobs of dead workers which used up their attempts are not handed out again
+            connection.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated = ? "
+                "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                (FAILED, "Lease expired", now, LEASED, now, self.max_attempts),
+            )
+            row = connection.execute(
+                "SELECT id, kind, payload, attempts FROM jobs "
+                f"WHERE (status = ? OR (status = ? AND lease_expires < ?)){kind_filter} "
+                "ORDER BY priority DESC, created LIMIT 1",
+                (PENDING, LEASED, now, *kinds),
+            ).fetchone()
+            if row is None:
+                connection.execute("COMMIT")
+                return None
+
+            job_id, kind, payload, attempts = row
+            connection.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, lease_owner = ?, lease_expires = ?, updated = ? "
+                "WHERE id = ?",
+                (LEASED, attempts + 1, worker_id, now + self.lease_seconds, now, job_id),
+            )
+            connection.execute("COMMIT")
+            return QueuedJob(job_id, kind, json.loads(payload), attempts + 1)
+        except BaseException:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
+        finally:
+            connection.close()
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Extend the lease, returns False if the job is no longer leased to the worker"""
+        now = time.time()
+        with closing(self._connect()) as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET lease_expires = ?, updated = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+                (now + self.lease_seconds, now, job_id, LEASED, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str) -> bool:
+        with closing(self._connect()) as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET status = ?, error = NULL, updated = ? WHERE id = ? AND lease_owner = ?",
+                (DONE, time.time(), job_id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        """Release the job for a retry, or mark it failed once it used up its attempts"""
+        with closing(self._connect()) as connection:
+            cursor = connection.execute(
+                "UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, "
+                "lease_owner = NULL, lease_expires = NULL, error = ?, updated = ? "
+                "WHERE id = ? AND lease_owner = ? AND status = ?",
+                (self.max_attempts, FAILED, PENDING, error, time.time(), job_id, worker_id, LEASED),
+            )
+            return cursor.rowcount == 1
+
+    def counts(self, kinds: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """Jobs by status, of the given kinds only if any"""
+        kind_filter, kinds = self._kind_filter(kinds)
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                f"SELECT status, COUNT(*) FROM jobs WHERE 1 = 1{kind_filter} GROUP BY status", kinds
+            ).fetchall()
+        return {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0, **dict(rows)}
+
+
+class Heartbeat:
+    """Keeps the lease of a job alive from a background thread while the job runs"""
+
+    def __init__(self, queue: WorkQueue, job_id: str, worker_id: str):
+        self.queue = queue
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.queue.lease_seconds / 3):
+            if not self.queue.heartbeat(self.job_id, self.worker_id):
+                print(f"[{self.worker_id}] Lost the lease of {self.job_id}")
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop.set()
+        self._thread.join()
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+def run_worker(
+    queue: WorkQueue,
+    handlers: Dict[str, Callable[[Dict[str, Any]], None]],
+    worker_id: Optional[str] = None,
+    poll_interval: float = 5,
+    stop_when_empty: bool = True,
+) -> int:
+    """
+    Claim and run jobs of the handled kinds until the queue is drained.
+    A handler raising an exception releases its job for a retry. Returns the number of completed jobs.
+    """
+    worker_id = worker_id or default_worker_id()
+    completed = 0
+    while True:
+        job = queue.claim(worker_id, handlers.keys())
+        if job is None:
+            # Jobs of other kinds are left to the workers handling them
+            counts = queue.counts(handlers.keys())
+            if stop_when_empty and counts[PENDING] == 0 and counts[LEASED] == 0:
+                return completed
+            # Leases held by other workers may still expire and come back
+            time.sleep(poll_interval)
+            continue
+
+        print(f"[{worker_id}] Running {job.id} (attempt #{job.attempts})")
+        try:
+            with Heartbeat(queue, job.id, worker_id):
+                handlers[job.kind](job.payload)
+        except Exception as e:
+            print(f"[{worker_id}] Job {job.id} failed: {e}")
+            queue.fail(job.id, worker_id, str(e))
+            continue
+        queue.complete(job.id, worker_id)
+        completed += 1
@@ -0,0 +1,122 @@
+import os
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+from Utils.constants import repo_to_complexity
+from Utils.llm.config import Model
+
+load_dotenv()
+
+PERCENTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+
+
+def load_summaries(
+    results_path: Optional[Path] = None,
+    models: Optional[List[Model]] = None,
+    langs: Optional[List[str]] = None,
+    summary_filename: str = "summary.csv",
+) -> pd.DataFrame:
+    """Concatenate the summaries of every model and language found in the results repository"""
+    results_path = Path(results_path or os.getenv("RESULTS_REPO_PATH")).resolve()
+    model_ids = {model.model_id for model in models} if models else None
+
+    frames = []
+    for summary_path in sorted((results_path / "Output").glob(f"*/*/{summary_filename}")):
+        model_id, lang = summary_path.parent.parent.name, summary_path.parent.name
+        if (model_ids and model_id not in model_ids) or (langs and lang not in langs):
+            continue
+        frame = pd.read_csv(summary_path)
+        frame["Models"] = model_id
+        frame["Lang"] = lang
+        frames.append(frame)
+
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
+
+def prepare(summaries: pd.DataFrame) -> pd.DataFrame:
+    """
+    Keep answered attempts and add derived columns: output tokens per second, reasoning share of
+    the output tokens (providers count reasoning tokens as output) and complexity and size buckets
+    of the dataset repository from constants.repo_to_complexity.
+    """
+    data = summaries.copy()
+    for column in ("Input", "Reasons", "Output", "Time"):
+        data[column] = pd.to_numeric(data[column], errors="coerce").fillna(0)
+    # Failed attempts are recorded with zero time and tokens
+    data = data[data["Time"] > 0].copy()
+
+    data["TokensPerSecond"] = data["Output"] / data["Time"]
+    data["ReasoningShare"] = (data["Reasons"] / data["Output"].where(data["Output"] > 0)).fillna(0).clip(0, 1)
+
+    buckets = data["Dataset"].map(repo_to_complexity).str.extract(r"^((?:extra_)?[a-z]+)_((?:extra_)?[a-z]+)")
+    data["ComplexityBucket"] = buckets[0].fillna(data["Complexity"])
+    data["SizeBucket"] = buckets[1].fillna(data["Size"].astype(str).str.replace(r"_\d+$", "", regex=True))
+    return data
+
+
+def latency_table(data: pd.DataFrame, by: List[str]) -> pd.DataFrame:
+    """Latency percentiles, throughput and reasoning share per group"""
+    grouped = data.groupby(by)
+    table = grouped["Time"].quantile(list(PERCENTILES.values())).unstack()
+    table.columns = [f"Time_{name}" for name in PERCENTILES]
+    table.insert(0, "Attempts", grouped.size())
+    table["TokensPerSecond_p50"] = grouped["TokensPerSecond"].median()
+    # Share of all output tokens of the group, so long answers weigh more than short ones
+    table["ReasoningShare"] = grouped["Reasons"].sum() / grouped["Output"].sum().replace(0, np.nan)
+    return table.round(3)
+
+
+def bucket_table(data: pd.DataFrame, bucket: str) -> pd.DataFrame:
+    """Mean answer time per model for every value of the bucket column"""
+    table = data.pivot_table(index="Models", columns=bucket, values="Time", aggfunc="mean")
+    table.columns = [f"Time_{bucket.removesuffix('Bucket').lower()}_{value}" for value in table.columns]
+    return table.round(2)
+
+
+def compare_models(data: pd.DataFrame) -> pd.DataFrame:
+    """One row per model: latency percentiles, throughput, reasoning share and time per complexity and size"""
+    return pd.concat(
+        [
+            latency_table(data, ["Models"]),
+            bucket_table(data, "ComplexityBucket"),
+            bucket_table(data, "SizeBucket"),
+        ],
+        axis=1,
+    ).sort_values("Time_p50")
+
+
+def main(
+    models: Optional[List[Model]] = None,
+    langs: Optional[List[str]] = None,
+    summary_filename: str = "summary.csv",
+    output_filename: str = "performance_report.csv",
+):
+    """
+    Write the comparison of all models and a per model and category breakdown
+    next to the model folders in RESULTS_REPO_PATH/Output.
+    """
+    results_path = Path(str(os.getenv("RESULTS_REPO_PATH"))).resolve()
+    summaries = load_summaries(results_path, models, langs, summary_filename)
+    if summaries.empty:
+        print(f"No {summary_filename} found in {results_path / 'Output'}")
+        return
+
+    data = prepare(summaries)
+    comparison = compare_models(data)
+    by_category = latency_table(data, ["Models", "Type"])
+
+    output_path = results_path / "Output" / output_filename
+    comparison.to_csv(output_path)
+    by_category.to_csv(output_path.with_name(f"{output_path.stem}_by_category.csv"))
+    print(comparison.to_string())
+    print(f"Performance report written to {output_path}")
+
+
+if __name__ == "__main__":
+    main(langs=["JS"])
@@ -0,0 +1,229 @@
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from Utils.constants import type_mapper
+from Utils.create_files import answer_lines, iter_code_blocks
+
+# Decisions of the pre-judge
+JUDGE = "judge"  # the output looks sound, send it to the judges
+SCORE = "score"  # the output is scored by the rules, no judge calls
+RERUN = "rerun"  # the answer failed or was cut off, generate it again instead of judging it
+
+SIDECAR_SUFFIX = "_prejudge.json"
+
+# Categories whose answers must contain code, the others are documentation answers in prose
+CODE_CATEGORIES = {
+    category for category, experiment in type_mapper.items() if experiment in ("code_generation", "code_translation")
+}
+MIN_LOC = 5
+MIN_ANSWER_CHARS = 200
+
+ERROR_MARKER = "### Error:"
+PLACEHOLDER_REGEX = re.compile(
+    r"(?:\.\.\.\s*(?:rest|remaining|existing|other)\b|\b(?:rest|remainder) of (?:the )?(?:code|file|implementation)\b"
+    r"|\bremains? (?:the )?(?:same|unchanged)\b|\bTODO\b)",
+    re.IGNORECASE,
+)
+BRACKETED_TYPES = {"js", "jsx", "ts", "tsx", "javascript", "typescript", "java", "css", "scss", "less"}
+BRACKETS = {")": "(", "]": "[", "}": "{"}
+
+
+def bracket_error(code: str) -> Optional[str]:
+    """
+    Unbalanced brackets of C-like code outside strings and comments. A cheap stand-in for a parser:
+    regex literals and nested template literals are not understood, so it only reports, it does not score.
+    """
+    stack: List[str] = []
+    quote: Optional[str] = None
+    i, length = 0, len(code)
+    while i < length:
+        char = code[i]
+        if quote:
+            if char == "\\":
+                i += 1
+            elif char == quote or (char == "\n" and quote != "`"):
+                quote = None
+        elif code.startswith("//", i):
+            newline = code.find("\n", i)
+            i = length if newline < 0 else newline
+            continue
+        elif code.startswith("/*", i):
+            end = code.find("*/", i + 2)
+            i = length if end < 0 else end + 2
+            continue
+        elif char in "'\"`":
+            quote = char
+        elif char in "([{":
+            stack.append(char)
+        elif char in BRACKETS:
+            if not stack or stack.pop() != BRACKETS[char]:
+                return f"unexpected '{char}' at line {code.count(chr(10), 0, i) + 1}"
+        i += 1
+    if stack:
+        return f"unclosed '{stack[-1]}'"
+    return None
+
+
+def syntax_error(file_type: str, code: str) -> Optional[str]:
+    if file_type == "json":
+        try:
+            json.loads(code)
+        except ValueError as e:
+            return str(e)
+        return None
+    if file_type in BRACKETED_TYPES:
+        return bracket_error(code)
+    return None
+
+
+class OutputMetrics:
+    """Cheap structural metrics of an answer report, computed without any model call"""
+
+    error: bool
+    answer_chars: int
+    code_blocks: int
+    files: int
+    loc: int
+    truncated: bool
+    placeholders: int
+    parse_errors: List[str]
+
+    def __init__(self):
+        self.error = False
+        self.answer_chars = 0
+        self.code_blocks = 0
+        self.files = 0
+        self.loc = 0
+        self.truncated = False
+        self.placeholders = 0
+        self.parse_errors = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__annotations__}
+
+
+def measure_output(report_path: Path) -> OutputMetrics:
+    with open(report_path, "r", encoding="utf-8") as report:
+        return measure_text(report.read())
+
+
+def measure_text(text: str) -> OutputMetrics:
+    """Metrics of a report text, or of the run part of it before it is written"""
+    metrics = OutputMetrics()
+    lines = text.splitlines(keepends=True)
+    metrics.error = ERROR_MARKER in text and "### Answer:" not in text
+
+    answer = list(answer_lines(lines))
+    metrics.answer_chars = len("".join(answer).strip())
+    metrics.placeholders = sum(len(PLACEHOLDER_REGEX.findall(line)) for line in answer)
+
+    names = set()
+    for block in iter_code_blocks(answer):
+        metrics.code_blocks += 1
+        # Only the last block of an answer stopped by the token limit is left open
+        metrics.truncated = not block.closed
+        metrics.loc += sum(1 for line in block.content.splitlines() if line.strip())
+        if block.file_name:
+            names.add(block.file_name)
+        error = syntax_error(block.file_type, block.content)
+        if error:
+            metrics.parse_errors.append(f"{block.file_name or block.file_type or 'block'}: {error}")
+    metrics.files = len(names)
+    return metrics
+
+
+class PreJudgeVerdict:
+    decision: str
+    accuracy: Optional[float]
+    completeness: Optional[float]
+    reasons: List[str]
+
+    def __init__(
+        self,
+        decision: str,
+        reasons: Optional[List[str]] = None,
+        accuracy: Optional[float] = None,
+        completeness: Optional[float] = None,
+    ):
+        self.decision = decision
+        self.reasons = reasons or []
+        self.accuracy = accuracy
+        self.completeness = completeness
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "decision": self.decision,
+            "accuracy": self.accuracy,
+            "completeness": self.completeness,
+            "reasons": self.reasons,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PreJudgeVerdict":
+        return cls(data["decision"], data.get("reasons"), data.get("accuracy"), data.get("completeness"))
+
+
+def decide(metrics: OutputMetrics, experiment_type: str) -> PreJudgeVerdict:
+    """Rules for outputs not worth judging, everything else goes to the judges"""
+    if metrics.error or metrics.answer_chars == 0:
+        return PreJudgeVerdict(RERUN, ["the request failed, there is no answer"])
+    if metrics.truncated:
+        return PreJudgeVerdict(RERUN, ["the answer stops inside a code block"])
+
+    if experiment_type in CODE_CATEGORIES:
+        if metrics.code_blocks == 0:
+            return PreJudgeVerdict(SCORE, ["the answer contains no code"], accuracy=0, completeness=0)
+        if metrics.loc < MIN_LOC:
+            return PreJudgeVerdict(
+                SCORE, [f"the answer has only {metrics.loc} lines of code"], accuracy=0, completeness=0
+            )
+    elif metrics.answer_chars < MIN_ANSWER_CHARS:
+        return PreJudgeVerdict(
+            SCORE, [f"the answer has only {metrics.answer_chars} characters"], accuracy=0, completeness=0
+        )
+
+    # Judged anyway, the notes help reading the judge reports
+    notes = [f"parse error in {error}" for error in metrics.parse_errors]
+    if metrics.placeholders:
+        notes.append(f"{metrics.placeholders} placeholders for omitted code")
+    return PreJudgeVerdict(JUDGE, notes)
+
+
+def get_sidecar_path(category_path: Path, category_name: str) -> Path:
+    return Path(category_path) / f"{category_name}{SIDECAR_SUFFIX}"
+
+
+def get_report_path(category_path: Path, category_name: str) -> Path:
+    return Path(category_path) / f"{category_name}_report_1.md"
+
+
+def pre_judge(category_path: Path, category_name: str, experiment_type: str) -> PreJudgeVerdict:
+    """Check the first attempt of the scenario and save its metrics and verdict next to the judge reports"""
+    metrics = OutputMetrics()
+    try:
+        metrics = measure_output(get_report_path(category_path, category_name))
+        verdict = decide(metrics, experiment_type)
+    except (OSError, UnicodeDecodeError) as e:
+        verdict = PreJudgeVerdict(RERUN, [f"the report can't be read: {e}"])
+    with open(get_sidecar_path(category_path, category_name), "w", encoding="utf-8") as sidecar:
+        json.dump({"metrics": metrics.to_dict(), "verdict": verdict.to_dict()}, sidecar, indent=4)
+    return verdict
+
+
+def read_verdict(category_path: Path, category_name: str) -> Optional[PreJudgeVerdict]:
+    """Verdict of the current answer, None when there is none or the answer was generated again since"""
+    sidecar_path = get_sidecar_path(category_path, category_name)
+    if not sidecar_path.exists():
+        return None
+    report_path = get_report_path(category_path, category_name)
+    if report_path.exists() and report_path.stat().st_mtime > sidecar_path.stat().st_mtime:
+        return None
+    with open(sidecar_path, "r", encoding="utf-8") as sidecar:
+        return PreJudgeVerdict.from_dict(json.load(sidecar)["verdict"])
+
+
+def remove_verdict(category_path: Path, category_name: str):
+    """Forget the verdict of the scenario, so grade relies on the judges only"""
+    get_sidecar_path(category_path, category_name).unlink(missing_ok=True)
@@ -0,0 +1,35 @@
+"""Tests for the harness benchmarks."""
+
+import os
+
+from Utils.benchmark import build_benchmarks, compare, read_results, run_benchmarks
+
+
+class TestBenchmarks:
+    """Tests for running and storing benchmarks."""
+
+    def test_results_are_stored_per_commit(self, tmp_path):
+        """Test that every run is appended with its commit and compared with other commits."""
+        results_path = tmp_path / "harness.jsonl"
+
+        record = run_benchmarks(["convert_", "process_directory"], results_path, repeat=1, scale=0.01, min_time=0)
+
+        assert set(record["results"]) >= {"convert_anthropic", "convert_gemini", "process_directory_20_reports"}
+        assert all(timing["median"] > 0 for timing in record["results"].values())
+        assert read_results(results_path) == [record]
+
+    def test_only_selected_inputs_are_built(self, tmp_path, monkeypatch):
+        """Test that filtered out inputs are not prepared and the work dir does not leak into the environment."""
+        monkeypatch.delenv("RESULTS_REPO_PATH", raising=False)
+
+        benchmarks = build_benchmarks(tmp_path, scale=0.01, names=["tools_", "process_directory"])
+
+        assert {name.split("_")[0] for name in benchmarks} == {"tools", "process"}
+        assert "RESULTS_REPO_PATH" not in os.environ
+
+    def test_compare(self):
+        """Test that only changes above the threshold are reported."""
+        baseline = {"results": {"a": {"median": 1.0}, "b": {"median": 1.0}, "c": {"median": 1.0}}}
+        record = {"results": {"a": {"median": 1.5}, "b": {"median": 1.05}, "c": {"median": 0.5}, "d": {"median": 1}}}
+
+        assert compare(record, baseline) == ["a: slower by 50%", "c: faster by 50%"]
@@ -0,0 +1,72 @@
+"""Tests for judging several criteria sets in one request."""
+
+import json
+
+import pytest
+
+from Utils.combined_judge import OUTPUT_PLACEHOLDER, build_combined_prompt, calibration_summary, evaluate_combined
+
+OUTPUT = "export const App = () => <div>Hello</div>;"
+STEPS = {"accuracy": "Is it correct?", "completeness": "Is it complete?"}
+SCORES = {"Is it correct?": 4, "Is it complete?": 3}
+
+
+def evaluate_output(evaluation_steps, output, execute_prompt):
+    """Evaluator sending one prompt per criteria set and parsing the JSON answer of the judge"""
+    answer = json.loads(execute_prompt(f"Evaluate the output:\n{output}\nCriteria: {evaluation_steps}"))
+    return json.dumps({"steps": evaluation_steps, "score": answer["score"]})
+
+
+class Judge:
+    """Judge answering every request of a prompt with the score of its criteria"""
+
+    def __init__(self):
+        self.prompts = []
+
+    def __call__(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        if "independent evaluation requests" not in prompt:
+            criteria = prompt.rsplit("Criteria: ", 1)[1]
+            return json.dumps({"score": SCORES[criteria]})
+        return json.dumps({name: {"score": SCORES[criteria]} for name, criteria in STEPS.items()})
+
+
+class TestCombinedRequest:
+    """Tests for joining the criteria sets into one judge request."""
+
+    def test_one_request_gives_the_separate_reports(self):
+        """Test that a single judge request carrying the output once gives the reports of the two-call mode."""
+        judge = Judge()
+
+        reports = evaluate_combined(evaluate_output, STEPS, OUTPUT, judge)
+
+        assert len(judge.prompts) == 1 and judge.prompts[0].count(OUTPUT) == 1
+        assert reports == {name: evaluate_output(steps, OUTPUT, Judge()) for name, steps in STEPS.items()}
+
+    def test_output_not_shared_is_kept(self):
+        """Test that prompts are sent whole when the output can not be found in all of them."""
+        prompt = build_combined_prompt({"accuracy": f"Check {OUTPUT}", "completeness": "Check the other"}, OUTPUT)
+
+        assert OUTPUT_PLACEHOLDER not in prompt and prompt.count(OUTPUT) == 1
+
+    def test_incomplete_answer_fails(self):
+        """Test that an answer missing a criteria set raises, so the caller falls back to the two-call mode."""
+        with pytest.raises(ValueError, match="completeness"):
+            evaluate_combined(evaluate_output, STEPS, OUTPUT, lambda prompt: json.dumps({"accuracy": {"score": 1}}))
+
+
+class TestCalibration:
+    """Tests for the check of the combined mode against the two-call mode."""
+
+    def test_calibration_summary(self):
+        """Test that the combined mode is calibrated when it moves scores less than the judges disagree."""
+        records = [
+            {"scenario": "s", "judge": "a", "metric": "accuracy", "separate": 4.0, "combined": 4.5},
+            {"scenario": "s", "judge": "b", "metric": "accuracy", "separate": 3.0, "combined": 3.0},
+        ]
+
+        summary = calibration_summary(records)
+
+        assert (summary["mean_abs_difference"], summary["bias"], summary["judge_disagreement"]) == (0.25, 0.25, 1.0)
+        assert summary["calibrated"]
+        assert not calibration_summary([])["calibrated"]
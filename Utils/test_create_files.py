@@ -0,0 +1,101 @@
+"""Tests for extracting code from answer reports."""
+
+import json
+
+from Utils.create_files import extract_files, extract_run
+
+REACT_ANSWER = """### Thoughts:
+Some thoughts with ```inline``` fences.
+
+### Answer:
+Here is the converted application.
+
+```tsx
+// src/App.tsx
+export const App = () => <div />;
+```
+
+```css
+/* src/App.css */
+.app {}
+```
+
+```html
+<!-- public/index.html -->
+<div id="root"></div>
+```
+
+```bash
+npm install
+```
+
+### Tokens: {'input_tokens': 1, 'output_tokens': 2}
+### Execution time: 3.0
+"""
+
+ANGULAR_ANSWER = """### Answer:
+**src/app/app.component.ts**
+```typescript
+@Component({selector: 'app-root'})
+export class AppComponent {}
+```
+
+### `src/main.ts`
+```ts
+bootstrapApplication(AppComponent);
+```
+
+**../outside.ts**
+```ts
+escape();
+```
+
+```ts
+// src/app/app.component.ts
+export class AppComponent { title = 'app'; }
+"""
+
+
+class TestExtractFiles:
+    """Tests for detecting the block layouts."""
+
+    def test_react_layout(self):
+        """Test file names from first line comments, skipped types and unnamed blocks."""
+        files, stats = extract_files(REACT_ANSWER.split("### Answer:\n")[1].splitlines(keepends=True))
+
+        assert files == {
+            "src/App.tsx": "export const App = () => <div />;",
+            "public/index.html": '<div id="root"></div>',
+        }
+        assert stats == {"comment": 2, "heading": 0, "unnamed": 1, "skipped": 1}
+
+    def test_angular_layout_and_cut_off_answer(self):
+        """Test file names from headings and that a later block of a file wins."""
+        files, stats = extract_files(ANGULAR_ANSWER.splitlines(keepends=True))
+
+        assert files["src/main.ts"] == "bootstrapApplication(AppComponent);"
+        assert files["src/app/app.component.ts"] == "export class AppComponent { title = 'app'; }"
+        assert (stats["heading"], stats["comment"]) == (3, 1)
+
+
+class TestExtractRun:
+    """Tests for extracting all reports of a run."""
+
+    def test_project_trees_and_manifest(self, tmp_path):
+        """Test that every report gets its project tree, files manifest and an entry in the run manifest."""
+        reports_path = tmp_path / "Output" / "component_generation" / "ReactTask"
+        reports_path.mkdir(parents=True)
+        (reports_path / "task_report_1.md").write_text(REACT_ANSWER)
+        (reports_path / "task_report_2.md").write_text("### Answer:\n" + ANGULAR_ANSWER.split("### Answer:\n")[1])
+        output_path = tmp_path / "extracted"
+
+        summaries = extract_run(tmp_path / "Output", output_path, workers=2)
+
+        project_path = output_path / "component_generation" / "ReactTask" / "task_report_1"
+        assert (project_path / "src" / "App.tsx").read_text() == "export const App = () => <div />;"
+        assert "src/App.tsx" in json.loads((project_path / "files_manifest.json").read_text())["files"]
+        assert not (output_path / "outside.ts").exists()
+        angular = next(summary for summary in summaries if summary["report"].endswith("task_report_2.md"))
+        assert sorted(angular["files"]) == ["src/app/app.component.ts", "src/main.ts"]
+        assert angular["unnamed"] == 1
+        assert len(json.loads((output_path / "extraction_manifest.json").read_text())["reports"]) == 2
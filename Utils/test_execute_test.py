@@ -0,0 +1,119 @@
+"""Tests for the report status and the detection of failed answers."""
+
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+from Utils.execute_test import (
+    REPORT_EMPTY,
+    REPORT_ERROR,
+    REPORT_OK,
+    REPORT_TRUNCATED,
+    TaskJob,
+    find_failed_reports,
+    get_answer_from_model,
+    generate_report,
+    get_output_folder_name,
+    get_run_datetime,
+    preflight_jobs,
+    read_report_status,
+)
+from Utils.llm.ai_message import ModelResponse, TextAIMessageContent
+from Utils.llm.config import Model
+
+RUN_DATETIME = datetime(2025, 6, 1, 12, 30, 5, 123456)
+TOKENS = "### Tokens: {'input_tokens': 1, 'output_tokens': 2}\n### Execution time: 1.5\n"
+
+
+def answer(text: str, attempt: int = 1) -> str:
+    return f"## Run {attempt}:\n### Answer:\n{text}\n\n{TOKENS}"
+
+
+def write(output_dir: Path, task_name: str, attempt: int, data: str) -> Path:
+    generate_report(output_dir, [TextAIMessageContent("Task prompt")], data, task_name, attempt, RUN_DATETIME)
+    report_name = f"{task_name.split('.')[0]}_report_{attempt}.md"
+    return Path(get_output_folder_name(output_dir, RUN_DATETIME, task_name.split(".")[0])) / report_name
+
+
+class TestReportStatus:
+    """Tests for the status marker of the reports."""
+
+    def test_status_of_written_reports(self, tmp_path):
+        """Test that ok, failed, empty and cut off answers get their status line."""
+        reports = {
+            REPORT_OK: write(tmp_path, "ok.md", 1, answer("```js\nconst a = 1;\n```")),
+            REPORT_ERROR: write(tmp_path, "error.md", 1, "## Run 1:\n### Error: Timeout error\n"),
+            REPORT_EMPTY: write(tmp_path, "empty.md", 1, answer("")),
+            REPORT_TRUNCATED: write(tmp_path, "cut.md", 1, answer("```js\nconst a = 1;")),
+        }
+
+        for status, report_path in reports.items():
+            assert report_path.read_text(encoding="utf-8").endswith(f"### Status: {status}\n")
+            assert read_report_status(report_path) == status
+
+    def test_reports_without_marker(self, tmp_path):
+        """Test that the status of reports written before the marker is derived from their content."""
+        report_path = tmp_path / "task_report_1.md"
+        report_path.write_text("Task prompt\n\n## Run 1:\n### Error: Rate limit\n", encoding="utf-8")
+
+        assert read_report_status(report_path) == REPORT_ERROR
+
+
+class TestFailedReports:
+    """Tests for finding the attempts to generate again."""
+
+    def test_find_and_overwrite_in_place(self, tmp_path):
+        """Test that only failed attempts are found and a new answer replaces the report in place."""
+        write(tmp_path, "task.md", 1, answer("Some documentation"))
+        failed = write(tmp_path, "task.md", 2, "## Run 2:\n### Error: Timeout error\n")
+        write(tmp_path, "other.md", 1, answer(""))
+        run_path = failed.parent.parent
+
+        assert find_failed_reports(run_path) == [("other", 1, REPORT_EMPTY), ("task", 2, REPORT_ERROR)]
+
+        assert write(tmp_path, "task.md", 2, answer("Some documentation", 2)) == failed
+        assert find_failed_reports(run_path) == [("other", 1, REPORT_EMPTY)]
+
+    def test_run_datetime_round_trip(self, tmp_path):
+        """Test that the run datetime is recovered from the run folder name."""
+        for run_datetime in (RUN_DATETIME, RUN_DATETIME.replace(microsecond=0)):
+            run_folder = Path(get_output_folder_name(tmp_path, run_datetime, "")).name
+
+            assert get_run_datetime(run_folder) == run_datetime
+
+
+class TestPreflight:
+    """Tests for the check of the prompt size before sending it."""
+
+    def test_oversized_prompts_are_sent_by_default(self):
+        """Test that the default only warns about the offline estimate and reject keeps the job back."""
+        job = TaskJob("task.md", 1, [TextAIMessageContent("word " * 3_000_000)])
+
+        accepted, rejected = preflight_jobs([job], "", Model.Gemini_25_Flash, "warn")
+        assert (accepted, rejected) == ([job], [])
+
+        accepted, rejected = preflight_jobs([job], "", Model.Gemini_25_Flash, "reject")
+        assert (accepted, rejected) == ([], [job])
+
+    def test_unknown_mode_fails(self):
+        """Test that a misspelled mode raises instead of silently rejecting every oversized prompt."""
+        job = TaskJob("task.md", 1, [TextAIMessageContent("Task")])
+
+        with pytest.raises(ValueError, match="trimm"):
+            preflight_jobs([job], "", Model.Gemini_25_Flash, "trimm")
+
+
+class TestAnswer:
+    """Tests for the run part of the report."""
+
+    def test_failover_is_reported(self, monkeypatch):
+        """Test that an answer of a failover deployment names it in the report."""
+        model, alternative = Model.Gemini_25_Flash, Model.Gemini_25_Pro
+        for served_by, expected in ((model, ""), (alternative, f"### Served by: {alternative.model_id}\n")):
+            response = ModelResponse.answer("Done", {"input_tokens": 1}, 1.5, served_by=served_by.model_id)
+            monkeypatch.setattr("Utils.execute_test.ask_model", lambda **kwargs: response)
+
+            data = get_answer_from_model("task.md", [TextAIMessageContent("Task")], "", model)
+
+            assert data.endswith(f"### Execution time: 1.5\n{expected}")
@@ -0,0 +1,42 @@
+"""Import time budget of the entry points."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+repo_path = Path(__file__).resolve().parent.parent
+
+# Seconds, generous for slow machines; importing a provider SDK alone takes about half a second
+IMPORT_TIME_BUDGET = 1.0
+PROVIDER_SDKS = ["anthropic", "openai", "google.genai", "boto3", "botocore", "pandas", "epam"]
+
+
+def import_in_subprocess(module: str, tmp_path: Path) -> dict:
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(json.dumps({{'time': elapsed, 'loaded': [sdk for sdk in {PROVIDER_SDKS!r} if sdk in sys.modules]}}))\n"
+    )
+    env = {**os.environ, "RESULTS_REPO_PATH": str(tmp_path)}
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=repo_path, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestImportTime:
+    """Tests for the import cost of the entry points."""
+
+    @pytest.mark.parametrize("module", ["Utils.get_tokens_and_time", "Utils.execute_test", "Utils.llm.api"])
+    def test_entry_point_imports_no_provider_sdk(self, module, tmp_path):
+        """Test that provider SDKs are loaded on first use only and the import stays within budget."""
+        result = import_in_subprocess(module, tmp_path)
+
+        assert result["loaded"] == []
+        assert result["time"] < IMPORT_TIME_BUDGET
@@ -0,0 +1,46 @@
+"""Tests for the adaptive judge ensemble."""
+
+from types import SimpleNamespace
+
+from Utils.judge_ensemble import find_disagreement, order_judges, read_judges, remove_judges, write_judges
+
+
+class TestEnsemble:
+    """Tests for the order of the judges and the early stop."""
+
+    def test_order_judges(self):
+        """Test that judges follow the configured order and unknown ones go last."""
+        judges = [SimpleNamespace(name=name) for name in ("GPT-5", "Sonnet-4", "Gemini-2.5-Pro", "Other")]
+
+        assert [judge.name for judge in order_judges(judges)] == ["Gemini-2.5-Pro", "GPT-5", "Sonnet-4", "Other"]
+        assert [judge.name for judge in order_judges(judges, ["Sonnet-4"])][:2] == ["Sonnet-4", "GPT-5"]
+
+    def test_find_disagreement(self):
+        """Test that relative differences above the threshold and missing scores ask for another judge."""
+        assert find_disagreement({"accuracy": [4.0, 3.8], "completeness": [0.0, 0.0]}) == []
+        assert find_disagreement({"accuracy": [4.0, 3.0], "completeness": [3.0, None]}) == [
+            "accuracy scores differ by 25%",
+            "completeness is missing a score",
+        ]
+        assert find_disagreement({"accuracy": [4.0, 3.0]}, threshold=0.3) == []
+
+
+class TestJudgesSidecar:
+    """Tests for the record of the judges that ran."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that the judges that ran are read back and scenarios without a sidecar use all judges."""
+        assert read_judges(tmp_path, "scenario") is None
+
+        write_judges(tmp_path, "scenario", ["Gemini-2.5-Pro", "GPT-5"], [])
+
+        assert read_judges(tmp_path, "scenario") == ["Gemini-2.5-Pro", "GPT-5"]
+
+    def test_removed_when_all_judges_run(self, tmp_path):
+        """Test that a later run of all judges drops the judges of the adaptive run."""
+        write_judges(tmp_path, "scenario", ["Gemini-2.5-Pro", "GPT-5"], [])
+
+        remove_judges(tmp_path, "scenario")
+        remove_judges(tmp_path, "scenario")
+
+        assert read_judges(tmp_path, "scenario") is None
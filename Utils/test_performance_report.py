@@ -0,0 +1,68 @@
+"""Tests for the performance report."""
+
+import pytest
+
+from Utils.performance_report import compare_models, latency_table, load_summaries, prepare
+
+HEADER = "Experiment,Type,Category,Language,Models,Dataset,Complexity,Size,Attempt,Input,Reasons,Output,Time,Accuracy,Completeness\n"
+
+
+def write_summary(results_path, model_id, rows):
+    summary_path = results_path / "Output" / model_id / "JS" / "summary.csv"
+    summary_path.parent.mkdir(parents=True)
+    lines = [
+        f"code_generation,component_generation,Task,React,{model_id},{repo},{ci},{size},1,1000,{reasons},{output},{time}\n"
+        for repo, ci, size, reasons, output, time in rows
+    ]
+    summary_path.write_text(HEADER + "".join(lines))
+
+
+@pytest.fixture
+def data(tmp_path):
+    write_summary(
+        tmp_path,
+        "fast",
+        [
+            ("ReactNavbar", "low", "low", 0, 100, 1),
+            ("ReactNavbar", "low", "low", 0, 300, 3),
+            ("AngularJSCosmoMenu", "avg", "avg", 0, 200, 2),
+        ],
+    )
+    write_summary(
+        tmp_path,
+        "thinking",
+        [
+            ("ReactNavbar", "low", "low", 500, 1000, 10),
+            ("AngularJSCosmoMenu", "avg", "avg", 1500, 2000, 20),
+            ("AngularJSCosmoMenu", "avg", "avg", 0, 0, 0),
+        ],
+    )
+    return prepare(load_summaries(tmp_path))
+
+
+class TestPerformanceReport:
+    """Tests for latency and throughput metrics."""
+
+    def test_failed_attempts_and_buckets(self, data):
+        """Test that failed attempts are dropped and repositories get their complexity and size."""
+        assert len(data) == 5
+        navbar = data[data["Dataset"] == "ReactNavbar"].iloc[0]
+        assert (navbar["ComplexityBucket"], navbar["SizeBucket"]) == ("low", "low")
+
+    def test_latency_table(self, data):
+        """Test percentiles, throughput and reasoning share per model."""
+        table = latency_table(data, ["Models"])
+
+        assert table.loc["fast", "Time_p50"] == 2
+        assert table.loc["fast", "Time_p99"] == pytest.approx(2.98)
+        assert table.loc["fast", "TokensPerSecond_p50"] == 100
+        assert table.loc["thinking", "ReasoningShare"] == pytest.approx(2000 / 3000, abs=1e-3)
+        assert table.loc["thinking", "Attempts"] == 2
+
+    def test_compare_models(self, data):
+        """Test that the comparison has one row per model with time per complexity, fastest first."""
+        comparison = compare_models(data)
+
+        assert list(comparison.index) == ["fast", "thinking"]
+        assert comparison.loc["fast", "Time_complexity_low"] == 2
+        assert comparison.loc["thinking", "Time_size_avg"] == 20
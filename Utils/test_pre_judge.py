@@ -0,0 +1,97 @@
+"""Tests for the static pre-judge of generated outputs."""
+
+import json
+import os
+
+from Utils.pre_judge import (
+    JUDGE,
+    RERUN,
+    SCORE,
+    bracket_error,
+    measure_output,
+    pre_judge,
+    read_verdict,
+    remove_verdict,
+)
+
+COMPONENT = """```tsx
+// src/App.tsx
+import React from 'react';
+
+export const App = () => {
+  const items = ['a', 'b'];
+  return <ul>{items.map((item) => <li key={item}>{item}</li>)}</ul>;
+};
+```
+"""
+
+
+def write_report(path, answer=None, error=None):
+    body = f"### Answer:\n{answer}\n\n### Tokens: {{'input_tokens': 1, 'output_tokens': 1}}\n" if answer else error
+    path.write_text(f"Task prompt\n\n{body}")
+    return path
+
+
+class TestMetrics:
+    """Tests for the structural metrics."""
+
+    def test_measure_output(self, tmp_path):
+        """Test code blocks, files, lines of code, placeholders and parse errors."""
+        answer = COMPONENT + '```json\n// package.json\n{"name": }\n```\n// ... rest of the code\n'
+        metrics = measure_output(write_report(tmp_path / "task_report_1.md", answer))
+
+        assert (metrics.code_blocks, metrics.files, metrics.loc) == (2, 2, 6)
+        assert metrics.placeholders == 1
+        assert len(metrics.parse_errors) == 1 and metrics.parse_errors[0].startswith("package.json")
+        assert not metrics.truncated and not metrics.error
+
+    def test_bracket_error(self):
+        """Test that brackets in strings and comments are ignored."""
+        assert bracket_error("const a = ['(', \"}\"]; // )\n/* { */ f(a);") is None
+        assert bracket_error("function f() { return [1, 2); }") == "unexpected ')' at line 1"
+        assert bracket_error("if (a) {") == "unclosed '{'"
+
+
+class TestVerdicts:
+    """Tests for the pre-judge rules and the sidecar file."""
+
+    def test_verdicts(self, tmp_path):
+        """Test re-runs for failed and cut off answers, zero scores for missing code and judging the rest."""
+        cases = {
+            "error": (None, "### Error: Timeout error\n", "component_generation", RERUN),
+            "cut": (COMPONENT[:-5], None, "component_generation", RERUN),
+            "prose": ("The component renders a list. " * 20, None, "component_generation", SCORE),
+            "short": ("It is a list.", None, "code_explanation", SCORE),
+            "good": (COMPONENT, None, "component_generation", JUDGE),
+        }
+        for name, (answer, error, experiment_type, decision) in cases.items():
+            category_path = tmp_path / name
+            category_path.mkdir()
+            write_report(category_path / f"{name}_report_1.md", answer, error)
+
+            verdict = pre_judge(category_path, name, experiment_type)
+
+            assert verdict.decision == decision, name
+            assert read_verdict(category_path, name).to_dict() == verdict.to_dict()
+
+        sidecar = json.loads((tmp_path / "prose" / "prose_prejudge.json").read_text())
+        assert sidecar["verdict"]["accuracy"] == 0 and sidecar["metrics"]["code_blocks"] == 0
+
+    def test_missing_report_is_rerun(self, tmp_path):
+        """Test that a scenario without its first attempt is left for a re-run instead of failing."""
+        verdict = pre_judge(tmp_path, "scenario", "component_generation")
+
+        assert verdict.decision == RERUN and "can't be read" in verdict.reasons[0]
+
+    def test_stale_and_removed_verdicts(self, tmp_path):
+        """Test that a verdict is ignored once the answer is generated again and can be removed."""
+        report_path = write_report(tmp_path / "scenario_report_1.md", "It is a list.")
+        pre_judge(tmp_path, "scenario", "code_explanation")
+        assert read_verdict(tmp_path, "scenario").decision == SCORE
+
+        sidecar_mtime = (tmp_path / "scenario_prejudge.json").stat().st_mtime
+        os.utime(report_path, (sidecar_mtime + 10, sidecar_mtime + 10))
+        assert read_verdict(tmp_path, "scenario") is None
+
+        remove_verdict(tmp_path, "scenario")
+        assert not (tmp_path / "scenario_prejudge.json").exists()